@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark tweet extraction strategies against the saved fixture timeline.
+
+Serves ``fixtures/timeline.html`` from a local HTTP server and runs
+``XComScraper.scrape_tweet_links`` once per extraction mode, counting the
+DevTools commands sent and the wall time spent.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_extraction.py [--tweets 30] [--headless]
+"""
+
+import argparse
+import asyncio
+import http.server
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from pydoll.connection import ConnectionHandler
+
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+FIXTURE_ACCOUNT = "fixture"
+
+# Recorded UserTweets response; later pages reuse it with shifted status IDs
+USER_TWEETS_FIXTURE = FIXTURES_DIR / "user_tweets.json"
+USER_TWEETS_PAGE_OFFSET = 10**9
+
+
+def _shift_status_ids(node, offset: int):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("rest_id", "id_str", "conversation_id_str") and int(value) > 10**17:
+                node[key] = str(int(value) - offset)
+            else:
+                _shift_status_ids(value, offset)
+    elif isinstance(node, list):
+        for value in node:
+            _shift_status_ids(value, offset)
+
+
+def user_tweets_page(page: int, max_pages: int) -> dict:
+    """The recorded response as page ``page``; pages past ``max_pages`` are empty"""
+    payload = json.loads(USER_TWEETS_FIXTURE.read_text(encoding="utf-8"))
+    instructions = payload["data"]["user"]["result"]["timeline_v2"]["timeline"]["instructions"]
+    for instruction in list(instructions):
+        if instruction["type"] == "TimelinePinEntry" and page > 0:
+            instructions.remove(instruction)
+        for entry in instruction.get("entries", []):
+            if entry["content"].get("cursorType") == "Bottom":
+                entry["content"]["value"] = f"page-{page + 1}"
+        if "entries" in instruction and page >= max_pages:
+            instruction["entries"] = [
+                entry for entry in instruction["entries"] if "cursorType" in entry["content"]
+            ]
+
+    _shift_status_ids(payload, page * USER_TWEETS_PAGE_OFFSET)
+    return payload
+
+
+class FixtureHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves the timeline fixture for any ``/<account>`` path
+
+    ``timeline_page`` is the HTML served for the account; UserTweets API calls
+    are answered from the recorded response after ``api_latency`` seconds.
+    """
+
+    timeline_page = "timeline.html"
+    api_latency = 0.3
+    max_pages = 20
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith("/UserTweets"):
+            return self._serve_user_tweets(url.query)
+        if url.path.strip("/") == FIXTURE_ACCOUNT:
+            self.path = "/" + self.timeline_page
+        return super().do_GET()
+
+    def _serve_user_tweets(self, query: str):
+        variables = json.loads(parse_qs(query).get("variables", ["{}"])[0])
+        cursor = variables.get("cursor") or "page-0"
+        page = int(cursor.rsplit("-", 1)[-1]) if cursor.startswith("page-") else 0
+
+        time.sleep(self.api_latency)
+        body = json.dumps(user_tweets_page(page, self.max_pages)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def fixture_server(timeline_page: str = "timeline.html"):
+    handler_class = type("Handler", (FixtureHandler,), {"timeline_page": timeline_page})
+    handler = partial(handler_class, directory=str(FIXTURES_DIR))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+
+
+@contextmanager
+def count_cdp_calls():
+    """Count every command sent over any DevTools connection"""
+    counter = {"calls": 0}
+    original = ConnectionHandler.execute_command
+
+    async def counting_execute_command(self, command, timeout=10):
+        counter["calls"] += 1
+        return await original(self, command, timeout=timeout)
+
+    ConnectionHandler.execute_command = counting_execute_command
+    try:
+        yield counter
+    finally:
+        ConnectionHandler.execute_command = original
+
+
+async def run_strategy(base_url: str, extraction: str, tweets: int, headless: bool) -> dict:
+    scraper = XComScraper(
+        FIXTURE_ACCOUNT, headless=headless, extraction=extraction, base_url=base_url
+    )
+    with count_cdp_calls() as counter:
+        start = time.perf_counter()
+        links = await scraper.scrape_tweet_links(total_tweets=tweets)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "extraction": extraction,
+        "tweets": len(links),
+        "cdp_calls": counter["calls"],
+        "wall_time_s": round(elapsed, 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tweets", type=int, default=30, help="Tweets to collect per run")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    args = parser.parse_args()
+
+    with fixture_server() as base_url:
+        results = [
+            await run_strategy(base_url, extraction, args.tweets, args.headless)
+            for extraction in ("dom", "script")
+        ]
+
+    print(f"{'strategy':<10}{'tweets':>8}{'cdp calls':>12}{'wall time':>12}")
+    for result in results:
+        print(
+            f"{result['extraction']:<10}{result['tweets']:>8}"
+            f"{result['cdp_calls']:>12}{result['wall_time_s']:>11.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
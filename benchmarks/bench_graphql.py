@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Benchmark GraphQL response interception against DOM-based extraction.
+
+Serves ``fixtures/graphql_timeline.html``, which renders its timeline from the
+recorded ``fixtures/user_tweets.json`` UserTweets response as the web app
+does, and runs ``XComScraper.scrape_tweet_links`` once per extraction mode.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_graphql.py [--tweets 100] [--headless]
+"""
+
+import argparse
+import asyncio
+
+from bench_extraction import fixture_server, run_strategy
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tweets", type=int, default=100, help="Tweets to collect per run")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    args = parser.parse_args()
+
+    with fixture_server("graphql_timeline.html") as base_url:
+        results = [
+            await run_strategy(base_url, extraction, args.tweets, args.headless)
+            for extraction in ("dom", "script", "graphql")
+        ]
+
+    print(f"{'strategy':<10}{'tweets':>8}{'cdp calls':>12}{'wall time':>12}")
+    for result in results:
+        print(
+            f"{result['extraction']:<10}{result['tweets']:>8}"
+            f"{result['cdp_calls']:>12}{result['wall_time_s']:>11.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
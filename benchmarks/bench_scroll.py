@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark scroll scheduling against the infinite-scroll fixture timeline.
+
+Runs ``XComScraper.scrape_tweet_links`` with the legacy fixed scroll and sleep
+and with the adaptive scheduler, reporting tweets collected and time-to-N.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_scroll.py [--tweets 150] [--headless]
+"""
+
+import argparse
+import asyncio
+import time
+
+from bench_extraction import FIXTURE_ACCOUNT, count_cdp_calls, fixture_server
+
+from pydoll_scraper.core.scroll import ScrollConfig
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+
+async def run_schedule(base_url: str, name: str, config: ScrollConfig, tweets: int, headless: bool):
+    scraper = XComScraper(
+        FIXTURE_ACCOUNT, headless=headless, base_url=base_url, scroll_config=config
+    )
+    with count_cdp_calls() as counter:
+        start = time.perf_counter()
+        links = await scraper.scrape_tweet_links(total_tweets=tweets)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "schedule": name,
+        "tweets": len(links),
+        "cdp_calls": counter["calls"],
+        "wall_time_s": round(elapsed, 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tweets", type=int, default=150, help="Tweets to collect per run")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    args = parser.parse_args()
+
+    schedules = {"legacy": ScrollConfig.legacy(), "adaptive": ScrollConfig()}
+    with fixture_server() as base_url:
+        results = [
+            await run_schedule(base_url, name, config, args.tweets, args.headless)
+            for name, config in schedules.items()
+        ]
+
+    print(f"{'schedule':<10}{'tweets':>8}{'cdp calls':>12}{'time-to-N':>12}")
+    for result in results:
+        print(
+            f"{result['schedule']:<10}{result['tweets']:>8}"
+            f"{result['cdp_calls']:>12}{result['wall_time_s']:>11.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
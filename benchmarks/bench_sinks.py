@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark output sink throughput and the event-loop stalls writing causes.
+
+Parses the synthetic timeline of ``fake_xcom.py`` into tweet rows and writes
+them to every output format, once directly from the event loop and once
+through an ``OutputSink``, which batches the writes in a worker thread. A
+ticker task meanwhile measures how late the loop runs it: the longest stall
+is what CDP traffic would have waited behind the disk.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_sinks.py [--rows 50000] [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List
+
+from fake_xcom import TimelineConfig, synthetic_page
+
+from pydoll_scraper.core.graphql import parse_user_tweets
+from pydoll_scraper.core.sinks import OutputSink
+from pydoll_scraper.core.writers import open_writer, pyarrow
+from pydoll_scraper.core.xcom_scraper import TweetData
+
+TICK = 0.001
+# Rows handed to the writer per event-loop step when writing directly, like a
+# scrape yielding a page of tweets at a time
+PAGE_ROWS = 20
+FORMATS = {
+    "jsonl": "tweets.jsonl",
+    "jsonl-rotating": "tweets.jsonl",
+    "sqlite": "tweets.sqlite",
+    "parquet": "tweets.parquet",
+}
+
+
+def tweet_rows(count: int) -> List[Dict]:
+    """``count`` tweet rows as the API writes them, from the synthetic timeline"""
+    config = TimelineConfig(tweets=count, page_size=100, pinned=0)
+    rows = []
+    for page in range(config.pages):
+        for entry in parse_user_tweets(synthetic_page(config, page), config.account):
+            rows.append({"account": config.account, **asdict(TweetData.from_extracted(entry))})
+    return rows[:count]
+
+
+class StallMeter:
+    """Longest delay of a ticker task that wants to run every ``TICK`` seconds"""
+
+    def __init__(self):
+        self.longest = 0.0
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            self.longest = max(self.longest, time.perf_counter() - started - TICK)
+
+    def __enter__(self) -> "StallMeter":
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._task.cancel()
+
+
+def open_format(directory: Path, name: str):
+    rotate_bytes = 8 * 1024 * 1024 if name == "jsonl-rotating" else None
+    return open_writer(directory / FORMATS[name], rotate_bytes=rotate_bytes)
+
+
+async def write_direct(directory: Path, name: str, rows: List[Dict], batch_size: int) -> Dict:
+    """Write and flush on the event loop, as often as the sink flushes"""
+    with StallMeter() as meter:
+        started = time.perf_counter()
+        with open_format(directory, name) as writer:
+            for offset in range(0, len(rows), PAGE_ROWS):
+                writer.write_all(rows[offset : offset + PAGE_ROWS])
+                if writer.count % batch_size < PAGE_ROWS:
+                    writer.flush()
+                await asyncio.sleep(0)
+            writer.flush()
+        elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "stall": meter.longest}
+
+
+async def write_sink(directory: Path, name: str, rows: List[Dict], batch_size: int) -> Dict:
+    with StallMeter() as meter:
+        started = time.perf_counter()
+        async with OutputSink(open_format(directory, name), batch_size=batch_size) as sink:
+            for offset in range(0, len(rows), PAGE_ROWS):
+                await sink.write_all(rows[offset : offset + PAGE_ROWS])
+                await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "stall": meter.longest}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000, help="Tweet rows to write")
+    parser.add_argument("--batch-size", type=int, default=500, help="Sink batch size")
+    args = parser.parse_args()
+
+    rows = tweet_rows(args.rows)
+    names = [name for name in FORMATS if name != "parquet" or pyarrow is not None]
+
+    print(f"{'format':<16}{'mode':<8}{'rows/s':>12}{'longest stall':>16}")
+    for name in names:
+        for mode in ("direct", "sink"):
+            with tempfile.TemporaryDirectory() as directory:
+                if mode == "direct":
+                    result = await write_direct(Path(directory), name, rows, args.batch_size)
+                else:
+                    result = await write_sink(Path(directory), name, rows, args.batch_size)
+            print(
+                f"{name:<16}{mode:<8}{len(rows) / result['elapsed']:>12,.0f}"
+                f"{result['stall'] * 1000:>14.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Local fake X.com server for offline benchmarks.
+
+Serves an infinite-scroll profile timeline at ``/<account>`` that renders
+itself from UserTweets API responses like the web app does, so every
+``XComScraper`` extraction mode works against it, plus plain article pages at
+``/articles/<n>`` for ``WebScraper``. Timelines are synthetic, with a
+configurable number of tweets, page size, page latency and pinned tweets, or
+paged from the recorded ``fixtures/user_tweets.json`` response.
+
+Usage:
+    PYTHONPATH=src python benchmarks/fake_xcom.py [--timeline-tweets 500] \\
+        [--latency-ms 300] [--port 8080]
+"""
+
+import argparse
+import http.server
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from bench_extraction import FIXTURES_DIR, user_tweets_page
+
+WORDS = (
+    "release latency browser tab network async tweet profile scroll timeline render batch "
+    "cursor cache pool worker queue parser fixture"
+).split()
+FIRST_STATUS_ID = 1790000000000000000
+STATUS_ID_STEP = 7919
+FIRST_CREATED_AT = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@dataclass
+class TimelineConfig:
+    """Shape of the served timeline"""
+
+    account: str = "fixture"
+    tweets: int = 500
+    page_size: int = 20
+    latency_ms: int = 300
+    # Every stall_every-th page takes stall_factor times as long; 0 disables stalls
+    stall_every: int = 5
+    stall_factor: float = 3.0
+    pinned: int = 1
+    # "synthetic" or "recorded" (pages of fixtures/user_tweets.json)
+    source: str = "synthetic"
+    article_latency_ms: int = 200
+    seed: int = 7
+
+    @property
+    def pages(self) -> int:
+        return -(-self.tweets // self.page_size)
+
+    def page_delay(self, page: int) -> float:
+        delay = self.latency_ms / 1000
+        if self.stall_every and page % self.stall_every == self.stall_every - 1:
+            delay *= self.stall_factor
+        return delay
+
+
+def _user(account: str) -> Dict:
+    name = f"{account.title()} Account"
+    return {
+        "__typename": "User",
+        "rest_id": "1500000000",
+        "core": {"screen_name": account, "name": name},
+        "legacy": {"screen_name": account, "name": name},
+    }
+
+
+def synthetic_tweet(config: TimelineConfig, index: int, rng: random.Random) -> Dict:
+    """``tweet_results.result`` of the ``index``-th newest tweet"""
+    status_id = str(FIRST_STATUS_ID - index * STATUS_ID_STEP)
+    created_at = FIRST_CREATED_AT - timedelta(hours=index * 3)
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+    hashtags = []
+    if index % 3 == 0:
+        tag = rng.choice(WORDS)
+        hashtags.append({"indices": [len(text) + 1, len(text) + len(tag) + 2], "text": tag})
+        text += f" #{tag}"
+
+    return {
+        "__typename": "Tweet",
+        "rest_id": status_id,
+        "core": {"user_results": {"result": _user(config.account)}},
+        "views": {"count": str(rng.randint(1_000, 90_000)), "state": "EnabledWithCount"},
+        "legacy": {
+            "id_str": status_id,
+            "created_at": created_at.strftime("%a %b %d %H:%M:%S +0000 %Y"),
+            "full_text": text,
+            "display_text_range": [0, len(text)],
+            "entities": {"hashtags": hashtags, "urls": [], "user_mentions": [], "symbols": []},
+            "reply_count": rng.randint(0, 100),
+            "retweet_count": rng.randint(0, 400),
+            "favorite_count": rng.randint(100, 5_000),
+            "bookmark_count": rng.randint(0, 50),
+            "lang": "en",
+        },
+    }
+
+
+def _item(result: Dict) -> Dict:
+    return {
+        "entryId": f"tweet-{result['rest_id']}",
+        "sortIndex": result["rest_id"],
+        "content": {
+            "entryType": "TimelineTimelineItem",
+            "itemContent": {"itemType": "TimelineTweet", "tweet_results": {"result": result}},
+        },
+    }
+
+
+def synthetic_page(config: TimelineConfig, page: int) -> Dict:
+    """Page ``page`` of the synthetic timeline as a UserTweets response"""
+    rng = random.Random(config.seed * 1_000_003 + page)
+    first = page * config.page_size
+    last = min(first + config.page_size, config.tweets)
+    # Pinned tweets are the oldest ones, shown on top of the first page
+    pinned_indexes = range(config.tweets, config.tweets + config.pinned) if page == 0 else []
+
+    instructions: List[Dict] = [{"type": "TimelineClearCache"}]
+    for index in pinned_indexes:
+        entry = _item(synthetic_tweet(config, index, rng))
+        entry["content"]["socialContext"] = {"contextType": "Pin", "text": "Pinned"}
+        instructions.append({"type": "TimelinePinEntry", "entry": entry})
+
+    entries = [_item(synthetic_tweet(config, index, rng)) for index in range(first, last)]
+    entries.append(
+        {
+            "entryId": f"cursor-bottom-{page}",
+            "content": {
+                "entryType": "TimelineTimelineCursor",
+                "cursorType": "Bottom",
+                "value": f"page-{page + 1}",
+            },
+        }
+    )
+    instructions.append({"type": "TimelineAddEntries", "entries": entries})
+
+    return {
+        "data": {
+            "user": {
+                "result": {
+                    "__typename": "User",
+                    "timeline_v2": {"timeline": {"instructions": instructions}},
+                }
+            }
+        }
+    }
+
+
+def article_page(index: int) -> str:
+    """A plain article for ``WebScraper``, with images that resource blocking can drop"""
+    rng = random.Random(index)
+    paragraphs = "".join(
+        f"<p>{' '.join(rng.choice(WORDS) for _ in range(60))}</p>" for _ in range(12)
+    )
+    images = "".join(f'<img src="/static/article-{index}-{i}.png" alt="">' for i in range(4))
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Fixture article {index}</title>
+  <meta name="description" content="Synthetic article {index} for scraper benchmarks">
+  <meta name="keywords" content="benchmark,fixture,article-{index}">
+</head>
+<body><main><h1>Fixture article {index}</h1>{images}{paragraphs}</main></body>
+</html>"""
+
+
+class FakeXComHandler(http.server.SimpleHTTPRequestHandler):
+    config = TimelineConfig()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.strip("/")
+
+        if url.path.endswith("/UserTweets"):
+            return self._serve_user_tweets(url.query)
+        if path == self.config.account:
+            self.path = "/graphql_timeline.html"
+            return super().do_GET()
+        if path.startswith("articles/"):
+            time.sleep(self.config.article_latency_ms / 1000)
+            return self._send(200, "text/html; charset=utf-8", article_page(int(path[9:])))
+        if path.startswith("static/") and path.endswith(".png"):
+            return self._send(200, "image/png", b"\x89PNG\r\n\x1a\n" + bytes(48_000))
+        return self._send(404, "text/plain", "Not found")
+
+    def _serve_user_tweets(self, query: str):
+        variables = json.loads(parse_qs(query).get("variables", ["{}"])[0])
+        cursor = variables.get("cursor") or "page-0"
+        page = int(cursor.rsplit("-", 1)[-1]) if cursor.startswith("page-") else 0
+
+        time.sleep(self.config.page_delay(page))
+        if self.config.source == "recorded":
+            payload = user_tweets_page(page, self.config.pages)
+        elif page < self.config.pages:
+            payload = synthetic_page(self.config, page)
+        else:
+            payload = synthetic_page(TimelineConfig(tweets=0, pinned=0), page)
+        return self._send(200, "application/json", json.dumps(payload))
+
+    def _send(self, status: int, content_type: str, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def fake_xcom_server(config: Optional[TimelineConfig] = None, port: int = 0) -> Iterator[str]:
+    """Run the fake server in a background thread and yield its base URL"""
+    handler_class = type("Handler", (FakeXComHandler,), {"config": config or TimelineConfig()})
+    handler = partial(handler_class, directory=str(FIXTURES_DIR))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+
+
+def add_timeline_arguments(parser: argparse.ArgumentParser):
+    defaults = TimelineConfig()
+    parser.add_argument("--account", default=defaults.account, help="Served account handle")
+    parser.add_argument("--timeline-tweets", type=int, default=defaults.tweets)
+    parser.add_argument("--page-size", type=int, default=defaults.page_size)
+    parser.add_argument("--latency-ms", type=int, default=defaults.latency_ms)
+    parser.add_argument("--stall-every", type=int, default=defaults.stall_every)
+    parser.add_argument("--pinned", type=int, default=defaults.pinned)
+    parser.add_argument("--source", choices=("synthetic", "recorded"), default=defaults.source)
+    parser.add_argument("--article-latency-ms", type=int, default=defaults.article_latency_ms)
+
+
+def timeline_config_from_args(args: argparse.Namespace) -> TimelineConfig:
+    return TimelineConfig(
+        account=args.account,
+        tweets=args.timeline_tweets,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        stall_every=args.stall_every,
+        pinned=args.pinned,
+        source=args.source,
+        article_latency_ms=args.article_latency_ms,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_timeline_arguments(parser)
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    config = timeline_config_from_args(args)
+    with fake_xcom_server(config, args.port) as base_url:
+        print(f"Serving {config.tweets} tweets at {base_url}/{config.account}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
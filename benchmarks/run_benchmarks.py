@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite against the local fake X.com server.
+
+Drives ``XComScraper`` in every extraction mode and ``WebScraper`` against
+``fake_xcom.py`` and reports, per scenario, time-to-N, throughput, DevTools
+commands sent and peak RSS of this process plus its browsers. Results are
+written as JSON so runs can be compared across releases.
+
+Usage:
+    PYTHONPATH=src python benchmarks/run_benchmarks.py [--tweets 200] [--headless] \\
+        [--output benchmarks/results/latest.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bench_extraction import count_cdp_calls
+from fake_xcom import (
+    TimelineConfig,
+    add_timeline_arguments,
+    fake_xcom_server,
+    timeline_config_from_args,
+)
+
+from pydoll_scraper import __version__
+from pydoll_scraper.core.scraper import WebScraper
+from pydoll_scraper.core.xcom_scraper import EXTRACTION_MODES, XComScraper
+
+RESULTS_DIR = Path(__file__).parent / "results"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_tree_rss(root_pid: int) -> Optional[int]:
+    """Resident memory of ``root_pid`` and all its descendants, from /proc (Linux only)"""
+    try:
+        pids = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except FileNotFoundError:
+        return None
+
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as stat_file:
+                parents[pid] = int(stat_file.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{pid}/statm") as statm_file:
+                rss[pid] = int(statm_file.read().split()[1]) * PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue
+
+    tree = {root_pid}
+    grew = True
+    while grew:
+        children = {pid for pid, parent in parents.items() if parent in tree} - tree
+        tree |= children
+        grew = bool(children)
+    return sum(rss.get(pid, 0) for pid in tree)
+
+
+class PeakRssSampler:
+    """Samples the process tree's RSS in a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(os.getpid())
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+
+async def measure(name: str, run) -> Dict:
+    """Run ``run()`` (returning the number of items scraped) and collect its metrics"""
+    with PeakRssSampler() as sampler, count_cdp_calls() as counter:
+        start = time.perf_counter()
+        items = await run()
+        elapsed = time.perf_counter() - start
+
+    result = {
+        "scenario": name,
+        "items": items,
+        "time_to_n_s": round(elapsed, 3),
+        "items_per_s": round(items / elapsed, 2) if elapsed > 0 else None,
+        "cdp_calls": counter["calls"],
+        "peak_rss_mb": round(sampler.peak / 2**20, 1) if sampler.peak else None,
+    }
+    print(
+        f"{name:<22}{items:>7}{result['time_to_n_s']:>10.2f}s{result['items_per_s'] or 0:>10.1f}"
+        f"{result['cdp_calls']:>11}{result['peak_rss_mb'] or 0:>11.1f}"
+    )
+    return result
+
+
+async def run_suite(
+    base_url: str,
+    config: TimelineConfig,
+    tweets: int,
+    modes: List[str],
+    urls: int,
+    concurrency: int,
+    headless: bool,
+) -> List[Dict]:
+    print(f"{'scenario':<22}{'items':>7}{'time':>11}{'items/s':>10}{'cdp calls':>11}{'rss MB':>11}")
+    results = []
+
+    for mode in modes:
+
+        async def scrape_timeline(mode=mode) -> int:
+            scraper = XComScraper(
+                config.account, headless=headless, extraction=mode, base_url=base_url
+            )
+            return len(await scraper.scrape_tweet_links(total_tweets=tweets))
+
+        results.append(await measure(f"xcom_links[{mode}]", scrape_timeline))
+
+    async def scrape_articles() -> int:
+        scraper = WebScraper(headless=headless)
+        pages = [f"{base_url}/articles/{i}" for i in range(urls)]
+        return len(await scraper.scrape_multiple_urls(pages, max_concurrency=concurrency))
+
+    results.append(await measure("web_scrape_multiple", scrape_articles))
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tweets", type=int, default=200, help="Tweets to collect per run (N)")
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=EXTRACTION_MODES,
+        default=list(EXTRACTION_MODES),
+        help="XComScraper extraction modes to run",
+    )
+    parser.add_argument("--urls", type=int, default=20, help="Article pages for WebScraper")
+    parser.add_argument("--concurrency", type=int, default=5, help="WebScraper tab concurrency")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    parser.add_argument("--output", type=Path, help="Result file (default: results/<time>.json)")
+    add_timeline_arguments(parser)
+    args = parser.parse_args()
+
+    config = timeline_config_from_args(args)
+    started_at = datetime.now(timezone.utc)
+    with fake_xcom_server(config) as base_url:
+        results = await run_suite(
+            base_url,
+            config,
+            args.tweets,
+            args.modes,
+            args.urls,
+            args.concurrency,
+            args.headless,
+        )
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "version": __version__,
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {
+            "tweets": args.tweets,
+            "urls": args.urls,
+            "concurrency": args.concurrency,
+            "headless": args.headless,
+            "timeline": asdict(config),
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{started_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+#!/bin/bash
+
+# Sourced by the run scripts. Browsers run headless unless SCRAPER_HEADLESS
+# is false; only then is a virtual display started (and, with --vnc, a VNC
+# server on it), waiting until the display accepts connections.
+start_display() {
+    case "${SCRAPER_HEADLESS:-true}" in
+        0 | [Ff]alse | [Nn]o | [Oo]ff) ;;
+        *) return 0 ;;
+    esac
+
+    export DISPLAY="${DISPLAY:-:99}"
+    Xvfb "$DISPLAY" -screen 0 1920x1080x24 > /dev/null 2>&1 &
+
+    local socket="/tmp/.X11-unix/X${DISPLAY#:}"
+    for _ in $(seq 100); do
+        [ -S "$socket" ] && break
+        sleep 0.1
+    done
+    if [ ! -S "$socket" ]; then
+        echo "Virtual display $DISPLAY did not start" >&2
+        exit 1
+    fi
+
+    if [ "$1" = "--vnc" ]; then
+        x11vnc -display "$DISPLAY" -nopw -forever -shared -bg > /dev/null 2>&1
+    fi
+}
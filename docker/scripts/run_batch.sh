@@ -0,0 +1,7 @@
+#!/bin/bash
+
+source "$(dirname "$0")/display.sh"
+start_display
+
+# Run a batch scrape; arguments are passed to the CLI
+exec uv run python -m src.pydoll_scraper.cli "$@"
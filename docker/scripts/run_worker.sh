@@ -0,0 +1,7 @@
+#!/bin/bash
+
+source "$(dirname "$0")/display.sh"
+start_display
+
+# Run a scrape worker consuming jobs from the Redis queue
+exec uv run python -m src.pydoll_scraper.worker
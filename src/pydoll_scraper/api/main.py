@@ -1,18 +1,230 @@
-from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel
+import asyncio
+import json
+import logging
+import math
+from contextlib import aclosing, asynccontextmanager, nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Dict, List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+from ..config import Settings
+from ..core.batch import write_result
+from ..core.browser_pool import BrowserPool
+from ..core.cache import ScrapeCache, create_scrape_cache
+from ..core.concurrency import map_bounded
+from ..core.cursor import CursorStore, create_cursor_store
+from ..core.errors import AccountUnavailableError, OverloadedError, RateLimitedError, error_kind
+from ..core.faults import COMPLETE
+from ..core.jobs import Job, JobQueue, create_job_queue
+from ..core.metrics import REGISTRY, collect_timings
+from ..core.ratelimit import create_rate_limiter
+from ..core.resources import ResourcePolicy
+from ..core.scheduler import (
+    BULK,
+    INTERACTIVE,
+    Admission,
+    ScrapeScheduler,
+    create_scheduler,
+    default_deadline,
+)
+from ..core.sinks import OutputSink, create_output_sink
+from ..core.supervisor import ProcessSupervisor
+from ..core.tasks import iter_content, links_result
+from ..core.worker import JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the shared browser pool, or the worker processes that own the
+    browsers, the scheduler in front of them, the result cache and the job
+    queue for the lifetime of the app
+    """
+    settings = Settings.from_env()
+    app.state.settings = settings
+    app.state.browser_pool = None
+    app.state.supervisor = None
+
+    if settings.worker_processes > 0:
+        supervisor = ProcessSupervisor.from_settings(settings)
+        await supervisor.start()
+        app.state.supervisor = supervisor
+    elif settings.pool_browsers > 0:
+        pool = BrowserPool.from_settings(settings)
+        await pool.start()
+        app.state.browser_pool = pool
+
+    app.state.scheduler = create_scheduler(settings)
+
+    app.state.cache = create_scrape_cache(settings)
+
+    app.state.cursor_store = create_cursor_store(settings)
+    app.state.rate_limiter = create_rate_limiter(settings)
+
+    # Results of every scrape, written as they arrive when an output is set
+    app.state.sink = create_output_sink(settings)
+    if app.state.sink is not None:
+        app.state.sink.start()
+
+    # Without a shared queue, jobs run on this process's pool or worker processes
+    app.state.job_queue = create_job_queue(settings)
+    worker_task = None
+    if settings.job_backend == "memory":
+        worker = JobWorker(
+            app.state.job_queue,
+            app.state.browser_pool,
+            concurrency=settings.worker_concurrency,
+            cursor_store=app.state.cursor_store,
+            resource_policy=ResourcePolicy.from_settings(settings),
+            rate_limiter=app.state.rate_limiter,
+            supervisor=app.state.supervisor,
+            sink=app.state.sink,
+            scheduler=app.state.scheduler,
+            cache=app.state.cache,
+        )
+        worker_task = asyncio.create_task(worker.run())
+
+    try:
+        yield
+    finally:
+        if worker_task is not None:
+            worker.stop()
+            await worker_task
+        await app.state.job_queue.close()
+        await app.state.cursor_store.close()
+        await app.state.rate_limiter.close()
+        if app.state.sink is not None:
+            await app.state.sink.close()
+        if app.state.cache is not None:
+            await app.state.cache.close()
+        if app.state.browser_pool is not None:
+            await app.state.browser_pool.close()
+        if app.state.supervisor is not None:
+            await app.state.supervisor.close()
 
-from ..core.xcom_scraper import XComScraper
 
 app = FastAPI(
     title="Web Scraper API",
     description="FastAPI endpoints for web scraping and social media data extraction",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
 class XComScrapeRequest(BaseModel):
     account_name: str
     total_tweets: int = 25
+    # Only return tweets newer than the last incremental scrape of this account
+    incremental: bool = False
+    # Include a per-stage timing breakdown in the response
+    timings: bool = False
+    # Browser mode for this scrape, SCRAPER_HEADLESS when unset; the other mode
+    # than the pool's launches a browser just for this request
+    headless: Optional[bool] = None
+    # Scheduling class: interactive requests are served before bulk ones and
+    # keep SCRAPER_SCHEDULER_RESERVED slots to themselves. Unset means
+    # interactive, or bulk for batch items and jobs
+    priority: Optional[Literal["interactive", "bulk"]] = None
+    # Seconds the scrape should finish in; a request that would have to queue
+    # past it is rejected with 429. Unset uses the priority's default
+    deadline: Optional[float] = Field(default=None, gt=0)
+
+
+class XComBatchScrapeRequest(BaseModel):
+    requests: List[XComScrapeRequest] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+def _task_payload(state: Any, request: XComScrapeRequest, *fields: str) -> Dict[str, Any]:
+    """Task payload of ``request``'s ``fields``, with its browser mode resolved"""
+    payload = request.model_dump(include=set(fields) if fields else None)
+    payload["headless"] = _headless(state, request)
+    return payload
+
+
+def _headless(state: Any, request: XComScrapeRequest) -> bool:
+    return state.settings.headless if request.headless is None else request.headless
+
+
+def _priority(request: XComScrapeRequest, default: str) -> str:
+    return request.priority or default
+
+
+def _deadline(state: Any, request: XComScrapeRequest, priority: str) -> Optional[float]:
+    return request.deadline or default_deadline(state.settings, priority)
+
+
+def _slot(state: Any, request: XComScrapeRequest, priority: str) -> AsyncContextManager[Any]:
+    """Scheduler slot for scraping ``request``; unscheduled without a scheduler"""
+    scheduler: Optional[ScrapeScheduler] = state.scheduler
+    if scheduler is None:
+        return nullcontext()
+    deadline = _deadline(state, request, priority)
+    return scheduler.slot(priority, request.total_tweets, deadline)
+
+
+async def _scrape_links(
+    state: Any, request: XComScrapeRequest, priority: str = INTERACTIVE
+) -> Dict[str, Any]:
+    """
+    Scrape links into an ``xcom_links`` task result, through the result cache
+    when one is configured
+
+    Incremental requests bypass the cache, since their result depends on the
+    account's cursor, and partial results are not cached. Cache misses wait
+    for a scheduler slot of ``priority``, unless the request sets its own.
+    With worker processes the scrape runs in one of them. Freshly scraped
+    links are written to the output sink.
+    """
+    cache: Optional[ScrapeCache] = state.cache
+    cursor_store: Optional[CursorStore] = state.cursor_store if request.incremental else None
+    supervisor: Optional[ProcessSupervisor] = state.supervisor
+    sink: Optional[OutputSink] = state.sink
+
+    async def scrape() -> Dict[str, Any]:
+        async with _slot(state, request, _priority(request, priority)):
+            result = await collect()
+        if sink is not None:
+            await write_result(sink, "xcom_links", result)
+        return result
+
+    async def collect() -> Dict[str, Any]:
+        if supervisor is not None:
+            payload = _task_payload(state, request, "account_name", "total_tweets", "incremental")
+            return await supervisor.run_task("xcom_links", payload)
+        return await links_result(
+            state.browser_pool,
+            request.account_name,
+            request.total_tweets,
+            cursor_store=cursor_store,
+            resource_policy=ResourcePolicy.from_settings(state.settings),
+            rate_limiter=state.rate_limiter,
+            headless=_headless(state, request),
+        )
+
+    if cache is None or cursor_store is not None:
+        return await scrape()
+    return await cache.tweet_links_result(request.account_name, request.total_tweets, scrape)
+
+
+def _links_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Response fields of an ``xcom_links`` result; partial ones carry their error"""
+    response = {
+        "success": True,
+        "account": result["account"],
+        "count": len(result["links"]),
+        "links": result["links"],
+        "status": result["status"],
+    }
+    if result["status"] != COMPLETE:
+        response["error"] = f"X.com scraping error: {result['error']}"
+        response["error_type"] = result["error_type"]
+    return response
 
 
 @app.get("/")
@@ -23,27 +235,241 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "xcom_links": "/xcom/links",
+            "xcom_links_batch": "/xcom/links/batch",
             "xcom_content": "/xcom/content",
+            "xcom_links_job": "/xcom/links/jobs",
+            "xcom_content_job": "/xcom/content/jobs",
+            "job_status": "/jobs/{job_id}",
+            "metrics": "/metrics",
+            "health": "/health",
         },
     }
 
 
 @app.post("/xcom/links")
-async def scrape_xcom_links(request: XComScrapeRequest):
-    """Scrape tweet links from an X.com account"""
+async def scrape_xcom_links(request: XComScrapeRequest, http_request: Request):
+    """
+    Scrape tweet links from an X.com account
+
+    An account without tweets is a success with no links; a throttled or shed
+    scrape fails with 429 and a missing, suspended or protected account with
+    404. A scrape whose tabs failed after its first link returns the links so
+    far with ``"status": "partial"`` and the error.
+    """
     try:
-        scraper = XComScraper(request.account_name)
-        links = await scraper.scrape_tweet_links(request.total_tweets)
+        with collect_timings() as timings:
+            result = await _scrape_links(http_request.app.state, request)
 
-        return {
-            "success": True,
-            "account": request.account_name,
-            "count": len(links),
-            "links": links,
-        }
+        response = _links_response(result)
+        if request.timings:
+            response["timings"] = timings.to_dict()
+        return response
 
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"X.com scraping error: {str(e)}",
+        raise _scrape_http_error(e) from e
+
+
+def _scrape_http_error(error: Exception) -> HTTPException:
+    """HTTP error for a failed scrape, with the status telling its kind apart"""
+    detail = f"X.com scraping error: {str(error)}"
+    if isinstance(error, (RateLimitedError, OverloadedError)):
+        headers = None
+        if error.retry_after is not None:
+            headers = {"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+        return HTTPException(status.HTTP_429_TOO_MANY_REQUESTS, detail=detail, headers=headers)
+    if isinstance(error, AccountUnavailableError):
+        return HTTPException(status.HTTP_404_NOT_FOUND, detail=detail)
+    return HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+
+
+@app.post("/xcom/links/batch")
+async def scrape_xcom_links_batch(request: XComBatchScrapeRequest, http_request: Request):
+    """
+    Scrape tweet links from many X.com accounts with bounded concurrency, at
+    bulk priority unless an item sets its own
+    """
+    state = http_request.app.state
+    concurrency = request.concurrency or state.settings.batch_concurrency
+
+    async def scrape(item: XComScrapeRequest) -> "tuple[Dict[str, Any], Dict[str, Any]]":
+        with collect_timings() as timings:
+            result = await _scrape_links(state, item, BULK)
+        return result, timings.to_dict()
+
+    outcomes = await map_bounded(scrape, request.requests, concurrency)
+
+    results = []
+    for item, outcome in zip(request.requests, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            results.append(
+                {
+                    "success": False,
+                    "account": item.account_name,
+                    "count": 0,
+                    "links": [],
+                    "error": f"X.com scraping error: {str(outcome)}",
+                    "error_type": error_kind(outcome),
+                }
+            )
+        else:
+            scraped, timings = outcome
+            result = _links_response(scraped)
+            if item.timings:
+                result["timings"] = timings
+            results.append(result)
+
+    failed = sum(1 for result in results if not result["success"])
+    return {
+        "success": failed == 0,
+        "total": len(results),
+        "failed": failed,
+        "results": results,
+    }
+
+
+@app.post("/xcom/content")
+async def scrape_xcom_content(request: XComScrapeRequest, http_request: Request):
+    """
+    Stream tweet content from an X.com account as NDJSON, one tweet per line
+
+    The scheduler slot is taken before the response starts, so a shed
+    request still fails with 429, and held until the stream ends.
+    """
+    state = http_request.app.state
+    supervisor: Optional[ProcessSupervisor] = state.supervisor
+    sink: Optional[OutputSink] = state.sink
+    scheduler: Optional[ScrapeScheduler] = state.scheduler
+
+    admission: Optional[Admission] = None
+    if scheduler is not None:
+        priority = _priority(request, INTERACTIVE)
+        deadline = _deadline(state, request, priority)
+        try:
+            admission = await scheduler.acquire(priority, request.total_tweets, deadline)
+        except OverloadedError as e:
+            raise _scrape_http_error(e) from e
+
+    def release(succeeded: bool = False):
+        if admission is not None:
+            scheduler.release(admission, succeeded)
+
+    def tweets() -> AsyncIterator[Dict[str, Any]]:
+        if supervisor is not None:
+            payload = _task_payload(state, request, "account_name", "total_tweets")
+            return supervisor.iter_task("xcom_content", payload)
+        return iter_content(
+            state.browser_pool,
+            request.account_name,
+            request.total_tweets,
+            ResourcePolicy.from_settings(state.settings),
+            state.rate_limiter,
+            _headless(state, request),
         )
+
+    async def ndjson() -> AsyncIterator[str]:
+        succeeded = False
+        try:
+            async with aclosing(tweets()) as stream:
+                async for tweet in stream:
+                    if sink is not None:
+                        result = {"account": request.account_name, "tweets": [tweet]}
+                        await write_result(sink, "xcom_content", result)
+                    yield json.dumps(tweet, ensure_ascii=False) + "\n"
+            succeeded = True
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming tweet content: {e}")
+            error = {"error": f"X.com scraping error: {str(e)}", "error_type": error_kind(e)}
+            yield json.dumps(error) + "\n"
+        finally:
+            release(succeeded)
+
+    async def released():
+        # Also frees the slot of a stream the client dropped before it started
+        release()
+
+    return StreamingResponse(
+        ndjson(), media_type="application/x-ndjson", background=BackgroundTask(released)
+    )
+
+
+def _job_response(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "error_type": job.error_type,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+async def _submit_job(http_request: Request, kind: str, request: XComScrapeRequest):
+    queue: JobQueue = http_request.app.state.job_queue
+    job = await queue.submit(kind, _task_payload(http_request.app.state, request))
+    logger.info(f"Queued job {job.id} ({kind}) for {request.account_name}")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"},
+    )
+
+
+@app.post("/xcom/links/jobs")
+async def submit_xcom_links_job(request: XComScrapeRequest, http_request: Request):
+    """Queue a tweet-link scrape and return its job ID immediately"""
+    return await _submit_job(http_request, "xcom_links", request)
+
+
+@app.post("/xcom/content/jobs")
+async def submit_xcom_content_job(request: XComScrapeRequest, http_request: Request):
+    """Queue a tweet-content scrape and return its job ID immediately"""
+    return await _submit_job(http_request, "xcom_content", request)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    http_request: Request,
+    wait: float = Query(default=0, ge=0, le=60, description="Seconds to long-poll for"),
+):
+    """Job status and, once finished, its result; waits up to ``wait`` seconds for it"""
+    queue: JobQueue = http_request.app.state.job_queue
+    job = await queue.wait(job_id, wait) if wait else await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _job_response(job)
+
+
+@app.get("/health")
+async def health(http_request: Request):
+    """
+    Liveness of the browser pool or worker processes, with the scheduler's
+    running and queued requests; 503 while a worker process is down or
+    restarting
+    """
+    state = http_request.app.state
+    supervisor: Optional[ProcessSupervisor] = state.supervisor
+    scheduler: Optional[ScrapeScheduler] = state.scheduler
+    extra = {"scheduler": scheduler.stats()} if scheduler is not None else {}
+    if supervisor is None:
+        return {"status": "ok", "browser_pool": state.browser_pool is not None, **extra}
+
+    workers = supervisor.health()
+    if workers["ready"] < workers["processes"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "degraded", "worker_processes": workers, **extra},
+        )
+    return {"status": "ok", "worker_processes": workers, **extra}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Scrape stage timings, browser and tab counts, scheduler queue depth and
+    wait times in the Prometheus text format
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,139 @@
+"""
+Batch scrape command line.
+
+Reads X.com accounts (``handle``, ``@handle`` or profile URLs) or page URLs,
+one per line, from a file or stdin and scrapes them on a shared browser pool,
+writing rows to JSONL, msgpack, Parquet or SQLite as each input finishes::
+
+    uv run pydoll-scraper accounts.txt -o output/tweets.jsonl --kind xcom_content --workers 8
+    cat urls.txt | uv run pydoll-scraper - -o output/pages.parquet --kind page
+
+Finished inputs are recorded in ``<output>.checkpoint``; rerunning the same
+command after an interruption skips them and appends to the output.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import logging
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional
+
+from .config import Settings
+from .core.batch import BatchRunner, BatchStats, Checkpoint, read_inputs
+from .core.browser_pool import BrowserPool
+from .core.ratelimit import create_rate_limiter
+from .core.resources import ResourcePolicy
+from .core.tasks import TASK_KINDS
+from .core.writers import WRITER_FORMATS, open_writer
+
+logger = logging.getLogger(__name__)
+
+# Finished inputs per checkpoint: each Parquet checkpoint writes a part file
+# and each SQLite one commits a transaction
+CHECKPOINT_EVERY = {"jsonl": 1, "msgpack": 1, "parquet": 100, "sqlite": 10}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pydoll-scraper",
+        description="Scrape a list of X.com accounts or web pages on a shared browser pool",
+    )
+    parser.add_argument("input", help="File with one account or URL per line, or - for stdin")
+    parser.add_argument(
+        "-o", "--output", required=True, help="Output file: .jsonl, .msgpack, .parquet or .sqlite"
+    )
+    parser.add_argument("--format", choices=WRITER_FORMATS, help="Output format (default: suffix)")
+    parser.add_argument(
+        "--kind", choices=TASK_KINDS, default="xcom_links", help="What to scrape per input"
+    )
+    parser.add_argument("--total-tweets", type=int, default=25, help="Tweets per account")
+    parser.add_argument("--workers", type=int, help="Concurrent scrapes (default: pool capacity)")
+    parser.add_argument("--browsers", type=int, help="Pooled browsers (default: settings)")
+    parser.add_argument("--tabs-per-browser", type=int, help="Tabs per browser (default: settings)")
+    parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        help="Run the browsers headless, or with --no-headless visible (default: settings)",
+    )
+    parser.add_argument(
+        "--rotate-bytes", type=int, help="Start a new JSONL file every this many bytes"
+    )
+    parser.add_argument(
+        "--checkpoint", help="Checkpoint file (default: the output path plus .checkpoint)"
+    )
+    parser.add_argument(
+        "--checkpoint-every", type=int, help="Finished inputs per checkpoint (default: per format)"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Ignore the checkpoint and overwrite the output"
+    )
+    return parser.parse_args(argv)
+
+
+async def run_batch(args: argparse.Namespace, settings: Settings) -> BatchStats:
+    """Scrape every input of ``args`` and return the counts"""
+    overrides = {}
+    if args.headless is not None:
+        overrides["headless"] = args.headless
+    if args.browsers is not None:
+        overrides["pool_browsers"] = args.browsers
+    if args.tabs_per_browser is not None:
+        overrides["pool_tabs_per_browser"] = args.tabs_per_browser
+    settings = dataclasses.replace(settings, **overrides)
+
+    output = Path(args.output)
+    checkpoint_path = Path(args.checkpoint or f"{output}.checkpoint")
+    if args.fresh:
+        checkpoint_path.unlink(missing_ok=True)
+    checkpoint = Checkpoint(checkpoint_path)
+    if len(checkpoint):
+        logger.info(f"Resuming: {len(checkpoint)} input(s) already in {output}")
+
+    pool = BrowserPool.from_settings(settings) if settings.pool_browsers > 0 else None
+    workers = args.workers or (
+        settings.pool_browsers * settings.pool_tabs_per_browser if pool else 1
+    )
+    rate_limiter = create_rate_limiter(settings)
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+
+    try:
+        with open_writer(
+            output, args.format, append=len(checkpoint) > 0, rotate_bytes=args.rotate_bytes
+        ) as writer:
+            format = args.format or output.suffix.lstrip(".").lower()
+            runner = BatchRunner(
+                args.kind,
+                writer,
+                checkpoint,
+                pool,
+                workers=workers,
+                total_tweets=args.total_tweets,
+                checkpoint_every=args.checkpoint_every or CHECKPOINT_EVERY.get(format, 1),
+                resource_policy=ResourcePolicy.from_settings(settings),
+                rate_limiter=rate_limiter,
+            )
+            async with pool if pool is not None else nullcontext():
+                return await runner.run(read_inputs(stream))
+    finally:
+        checkpoint.close()
+        await rate_limiter.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    stats = asyncio.run(run_batch(args, Settings.from_env()))
+    logger.info(
+        f"Done: {stats.done} scraped, {stats.rows} row(s), {stats.skipped} skipped, "
+        f"{stats.unavailable} unavailable, {stats.failed} failed, {stats.partial} partial"
+    )
+    sys.exit(1 if stats.failed or stats.partial else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Runtime configuration loaded from environment variables."""
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} must be an integer, got {value!r}") from None
+
+
+def _env_str(name: str, default: Optional[str]) -> Optional[str]:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Comma-separated values; set but empty means an empty list"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _env_processes(name: str, default: int) -> int:
+    """Process count; ``auto`` means one per CPU"""
+    if os.environ.get(name, "").strip().lower() == "auto":
+        return os.cpu_count() or 1
+    return _env_int(name, default)
+
+
+@dataclass
+class Settings:
+    """Service settings, overridable through ``SCRAPER_*`` environment variables"""
+
+    # Headless Chrome, with the tells x.com checks for masked; requests may
+    # still ask for a visible browser, which then needs a display
+    headless: bool = True
+
+    # Resource blocking: URL blocklist for images, media, fonts and trackers,
+    # optional interception by resource type, and memory-saving Chrome flags
+    block_resources: bool = True
+    block_by_type: bool = False
+    lightweight_browser: bool = True
+
+    # Browser pool
+    pool_browsers: int = 1
+    pool_tabs_per_browser: int = 4
+    pool_max_tab_uses: int = 50
+
+    # Persistent Chrome profiles (HTTP cache, service workers, cookies), one
+    # per pooled browser, under profile_dir; and pages loaded into each pooled
+    # browser at startup to warm its cache
+    persistent_profiles: bool = True
+    profile_dir: str = "output/profiles"
+    warm_urls: Tuple[str, ...] = ("https://x.com/",)
+
+    # Per-host rate limit on timeline loads, shared in process ("memory") or
+    # across processes ("redis", at redis_url). Throttled loads halve the rate
+    # and block the host for throttle_backoff seconds, doubling per repeat up
+    # to throttle_max_backoff, and are retried throttle_retries times
+    rate_limit_backend: str = "memory"
+    host_rate_per_minute: int = 30
+    host_burst: int = 5
+    throttle_backoff: int = 30
+    throttle_max_backoff: int = 600
+    throttle_retries: int = 2
+
+    # Batch endpoints
+    batch_concurrency: int = 4
+
+    # Scheduling of API scrapes onto the scraping capacity: scheduler_slots
+    # scrapes run at once (0: one per pooled tab of every pool), of which
+    # scheduler_reserved are never taken by bulk scrapes. At most
+    # scheduler_max_queue requests per priority wait for a slot. Requests
+    # without a deadline get interactive_deadline or bulk_deadline seconds
+    # (0: none). A scrape is estimated to take scrape_setup_seconds plus
+    # scrape_ms_per_tweet per tweet, the latter learned from finished scrapes
+    scheduler_slots: int = 0
+    scheduler_reserved: int = 1
+    scheduler_max_queue: int = 64
+    interactive_deadline: int = 60
+    bulk_deadline: int = 0
+    scrape_setup_seconds: int = 5
+    scrape_ms_per_tweet: int = 200
+
+    # Result cache, disabled when cache_ttl is 0. Without a Redis URL only the
+    # in-process LRU tier is used.
+    redis_url: Optional[str] = None
+    cache_ttl: int = 60
+    cache_local_size: int = 256
+
+    # Per-account cursors for incremental scrapes: "sqlite" stores them in
+    # cursor_db_path, "redis" in the Redis at redis_url
+    cursor_backend: str = "sqlite"
+    cursor_db_path: str = "output/cursors.sqlite3"
+
+    # Job queue: "memory" runs jobs on the API's own pool, "redis" hands them
+    # to separate worker processes (python -m pydoll_scraper.worker). A redis
+    # worker without a heartbeat for job_visibility_timeout seconds counts as
+    # dead and its jobs are requeued, up to job_max_attempts claims per job
+    job_backend: str = "memory"
+    job_ttl: int = 86400
+    job_visibility_timeout: int = 60
+    job_max_attempts: int = 3
+    worker_concurrency: int = 4
+
+    # Where scrape results are written as they arrive: a .jsonl, .sqlite,
+    # .parquet or .msgpack path (output_format overrides the suffix), unset
+    # to write nothing. Records are written off the event loop in batches of
+    # output_batch_size, or after output_flush_interval seconds; JSONL moves
+    # on to a new file every output_rotate_bytes when that is set
+    output_path: Optional[str] = None
+    output_format: Optional[str] = None
+    output_batch_size: int = 500
+    output_flush_interval: int = 1
+    output_rotate_bytes: int = 0
+
+    # Worker processes for the API, each with its own browser pool and event
+    # loop; 0 scrapes in the API process. A worker that dies or sends no
+    # heartbeat for worker_heartbeat_timeout seconds is restarted
+    worker_processes: int = 0
+    worker_heartbeat_timeout: int = 30
+    worker_start_timeout: int = 120
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from the current environment"""
+        defaults = cls()
+        return cls(
+            headless=_env_bool("SCRAPER_HEADLESS", defaults.headless),
+            block_resources=_env_bool("SCRAPER_BLOCK_RESOURCES", defaults.block_resources),
+            block_by_type=_env_bool("SCRAPER_BLOCK_BY_TYPE", defaults.block_by_type),
+            lightweight_browser=_env_bool(
+                "SCRAPER_LIGHTWEIGHT_BROWSER", defaults.lightweight_browser
+            ),
+            pool_browsers=_env_int("SCRAPER_POOL_BROWSERS", defaults.pool_browsers),
+            pool_tabs_per_browser=_env_int(
+                "SCRAPER_POOL_TABS_PER_BROWSER", defaults.pool_tabs_per_browser
+            ),
+            pool_max_tab_uses=_env_int("SCRAPER_POOL_MAX_TAB_USES", defaults.pool_max_tab_uses),
+            persistent_profiles=_env_bool(
+                "SCRAPER_PERSISTENT_PROFILES", defaults.persistent_profiles
+            ),
+            profile_dir=_env_str("SCRAPER_PROFILE_DIR", defaults.profile_dir),
+            warm_urls=_env_list("SCRAPER_WARM_URLS", defaults.warm_urls),
+            rate_limit_backend=_env_str("SCRAPER_RATE_LIMIT_BACKEND", defaults.rate_limit_backend),
+            host_rate_per_minute=_env_int(
+                "SCRAPER_HOST_RATE_PER_MINUTE", defaults.host_rate_per_minute
+            ),
+            host_burst=_env_int("SCRAPER_HOST_BURST", defaults.host_burst),
+            throttle_backoff=_env_int("SCRAPER_THROTTLE_BACKOFF", defaults.throttle_backoff),
+            throttle_max_backoff=_env_int(
+                "SCRAPER_THROTTLE_MAX_BACKOFF", defaults.throttle_max_backoff
+            ),
+            throttle_retries=_env_int("SCRAPER_THROTTLE_RETRIES", defaults.throttle_retries),
+            batch_concurrency=_env_int("SCRAPER_BATCH_CONCURRENCY", defaults.batch_concurrency),
+            scheduler_slots=_env_int("SCRAPER_SCHEDULER_SLOTS", defaults.scheduler_slots),
+            scheduler_reserved=_env_int("SCRAPER_SCHEDULER_RESERVED", defaults.scheduler_reserved),
+            scheduler_max_queue=_env_int(
+                "SCRAPER_SCHEDULER_MAX_QUEUE", defaults.scheduler_max_queue
+            ),
+            interactive_deadline=_env_int(
+                "SCRAPER_INTERACTIVE_DEADLINE", defaults.interactive_deadline
+            ),
+            bulk_deadline=_env_int("SCRAPER_BULK_DEADLINE", defaults.bulk_deadline),
+            scrape_setup_seconds=_env_int(
+                "SCRAPER_SCRAPE_SETUP_SECONDS", defaults.scrape_setup_seconds
+            ),
+            scrape_ms_per_tweet=_env_int(
+                "SCRAPER_SCRAPE_MS_PER_TWEET", defaults.scrape_ms_per_tweet
+            ),
+            redis_url=_env_str("SCRAPER_REDIS_URL", defaults.redis_url),
+            cache_ttl=_env_int("SCRAPER_CACHE_TTL", defaults.cache_ttl),
+            cache_local_size=_env_int("SCRAPER_CACHE_LOCAL_SIZE", defaults.cache_local_size),
+            cursor_backend=_env_str("SCRAPER_CURSOR_BACKEND", defaults.cursor_backend),
+            cursor_db_path=_env_str("SCRAPER_CURSOR_DB_PATH", defaults.cursor_db_path),
+            job_backend=_env_str("SCRAPER_JOB_BACKEND", defaults.job_backend),
+            job_ttl=_env_int("SCRAPER_JOB_TTL", defaults.job_ttl),
+            job_visibility_timeout=_env_int(
+                "SCRAPER_JOB_VISIBILITY_TIMEOUT", defaults.job_visibility_timeout
+            ),
+            job_max_attempts=_env_int("SCRAPER_JOB_MAX_ATTEMPTS", defaults.job_max_attempts),
+            worker_concurrency=_env_int("SCRAPER_WORKER_CONCURRENCY", defaults.worker_concurrency),
+            output_path=_env_str("SCRAPER_OUTPUT_PATH", defaults.output_path),
+            output_format=_env_str("SCRAPER_OUTPUT_FORMAT", defaults.output_format),
+            output_batch_size=_env_int("SCRAPER_OUTPUT_BATCH_SIZE", defaults.output_batch_size),
+            output_flush_interval=_env_int(
+                "SCRAPER_OUTPUT_FLUSH_INTERVAL", defaults.output_flush_interval
+            ),
+            output_rotate_bytes=_env_int(
+                "SCRAPER_OUTPUT_ROTATE_BYTES", defaults.output_rotate_bytes
+            ),
+            worker_processes=_env_processes("SCRAPER_WORKER_PROCESSES", defaults.worker_processes),
+            worker_heartbeat_timeout=_env_int(
+                "SCRAPER_WORKER_HEARTBEAT_TIMEOUT", defaults.worker_heartbeat_timeout
+            ),
+            worker_start_timeout=_env_int(
+                "SCRAPER_WORKER_START_TIMEOUT", defaults.worker_start_timeout
+            ),
+        )
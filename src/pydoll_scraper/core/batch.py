@@ -0,0 +1,239 @@
+"""
+Batch scraping of account or URL lists, with resumable output.
+
+``BatchRunner`` streams inputs into a fixed number of concurrent scrapes,
+writes each result's rows as soon as it finishes and records finished inputs
+in a ``Checkpoint``, so a rerun after an interruption skips them.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+from urllib.parse import urlparse
+
+from .browser_pool import BrowserPool
+from .errors import AccountUnavailableError, error_kind
+from .faults import COMPLETE
+from .ratelimit import HostRateLimiter
+from .resources import ResourcePolicy
+from .sinks import OutputSink
+from .tasks import TASK_KINDS, run_task
+from .writers import RecordWriter
+
+logger = logging.getLogger(__name__)
+
+HANDLE_PATTERN = re.compile(r"\w{1,15}")
+
+
+def read_inputs(stream: IO[str]) -> Iterator[str]:
+    """Non-blank lines of ``stream``, stripped, skipping ``#`` comments"""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def account_name(item: str) -> str:
+    """
+    Handle named by ``handle``, ``@handle`` or a profile URL such as
+    ``https://x.com/handle``
+
+    Raises:
+        ValueError: If ``item`` does not name a valid handle
+    """
+    name = urlparse(item).path.strip("/").split("/")[0] if "://" in item else item
+    name = name.lstrip("@")
+    if not HANDLE_PATTERN.fullmatch(name):
+        raise ValueError(f"Not an X.com account: {item!r}")
+    return name
+
+
+def task_payload(kind: str, item: str, total_tweets: int = 25) -> Dict[str, Any]:
+    """``run_task`` payload scraping ``item``"""
+    if kind == "page":
+        return {"url": item}
+    return {"account_name": account_name(item), "total_tweets": total_tweets}
+
+
+def result_rows(kind: str, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Output rows of a task result: one per link, tweet or page"""
+    if kind == "xcom_links":
+        return [{"account": result["account"], "link": link} for link in result["links"]]
+    if kind == "xcom_content":
+        return [{"account": result["account"], **tweet} for tweet in result["tweets"]]
+    return [result]
+
+
+async def write_result(sink: OutputSink, kind: str, result: Dict[str, Any]):
+    """Queue the rows of a task result on ``sink``; a failed write is logged, not raised"""
+    try:
+        await sink.write_all(result_rows(kind, result))
+    except Exception as e:
+        logger.error(f"Could not write {kind} result to {sink.writer.path}: {e}")
+
+
+class Checkpoint:
+    """Inputs whose results are in the output, one per line"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.done: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.done = set(read_inputs(f))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def record(self, items: Iterable[str]):
+        for item in items:
+            self._file.write(item + "\n")
+            self.done.add(item)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+@dataclass
+class BatchStats:
+    done: int = 0
+    skipped: int = 0
+    unavailable: int = 0
+    failed: int = 0
+    partial: int = 0
+    rows: int = 0
+
+
+class BatchRunner:
+    """
+    Scrapes inputs with ``workers`` concurrent tasks on a shared pool
+
+    Inputs are pulled from the iterable as workers free up, so a long list
+    or a pipe starts scraping before it has been read to the end. Rows are
+    queued for ``writer`` as each input finishes; every ``checkpoint_every``
+    finished inputs they are written and flushed in a worker thread, off the
+    event loop, and the inputs are added to ``checkpoint``. Inputs already in the
+    checkpoint are skipped. Unavailable accounts count as finished, since
+    rerunning them would not help; other failures are left out of the
+    checkpoint so the next run retries them. So are partial results, whose
+    tabs failed midway: their rows are written, and scraped again next run.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        writer: RecordWriter,
+        checkpoint: Checkpoint,
+        pool: Optional[BrowserPool] = None,
+        workers: int = 4,
+        total_tweets: int = 25,
+        checkpoint_every: int = 1,
+        resource_policy: Optional[ResourcePolicy] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        run: Callable[..., Awaitable[Dict[str, Any]]] = run_task,
+    ):
+        if kind not in TASK_KINDS:
+            raise ValueError(f"kind must be one of {TASK_KINDS}, got {kind!r}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.kind = kind
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.pool = pool
+        self.workers = workers
+        self.total_tweets = total_tweets
+        self.checkpoint_every = checkpoint_every
+        self.resource_policy = resource_policy
+        self.rate_limiter = rate_limiter
+        self.stats = BatchStats()
+        self._sink = OutputSink(writer, batch_size=max(checkpoint_every, 100))
+        self._run = run
+        self._pending: List[str] = []
+
+    async def run(self, inputs: Iterable[str]) -> BatchStats:
+        """Scrape every input not in the checkpoint and return the counts"""
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=self.workers * 2)
+        iterator = iter(inputs)
+        queued: Set[str] = set()
+
+        async def produce():
+            # Reading runs in a thread, since the inputs may be a pipe on stdin
+            while (item := await asyncio.to_thread(next, iterator, None)) is not None:
+                if item in self.checkpoint or item in queued:
+                    self.stats.skipped += 1
+                    continue
+                queued.add(item)
+                await queue.put(item)
+            for _ in range(self.workers):
+                await queue.put(None)
+
+        async def work():
+            while (item := await queue.get()) is not None:
+                await self._scrape(item)
+
+        try:
+            await asyncio.gather(produce(), *(work() for _ in range(self.workers)))
+        finally:
+            await self._commit()
+        return self.stats
+
+    async def _scrape(self, item: str):
+        try:
+            payload = task_payload(self.kind, item, self.total_tweets)
+            result = await self._run(
+                self.kind, payload, self.pool, None, self.resource_policy, self.rate_limiter
+            )
+        except AccountUnavailableError as e:
+            logger.warning(f"Skipping {item}: {e}")
+            self.stats.unavailable += 1
+            await self._finished(item)
+        except Exception as e:
+            logger.error(f"Failed {item} ({error_kind(e)}): {e}")
+            self.stats.failed += 1
+        else:
+            rows = result_rows(self.kind, result)
+            await self._sink.write_all(rows)
+            self.stats.rows += len(rows)
+            if result.get("status", COMPLETE) != COMPLETE:
+                reason = result.get("error") or "page did not finish loading"
+                logger.warning(f"Partial result for {item} ({len(rows)} row(s)): {reason}")
+                self.stats.partial += 1
+                return
+            self.stats.done += 1
+            await self._finished(item)
+            logger.info(f"Finished {item} ({self.stats.done} done, {self.stats.failed} failed)")
+
+    async def _finished(self, item: str):
+        self._pending.append(item)
+        if len(self._pending) >= self.checkpoint_every:
+            await self._commit()
+
+    async def _commit(self):
+        """Flush the output, then checkpoint the inputs it now holds"""
+        if not self._pending:
+            return
+        finished, self._pending = self._pending, []
+        await self._sink.flush()
+        self.checkpoint.record(finished)
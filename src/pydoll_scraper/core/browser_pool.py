@@ -0,0 +1,325 @@
+import asyncio
+import functools
+import logging
+import os
+import re
+import shutil
+import subprocess
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from pydoll.browser import Chrome
+from pydoll.browser.options import ChromiumOptions
+from pydoll.browser.tab import Tab
+
+from ..config import Settings
+from .metrics import BROWSERS_LIVE, TABS_LEASED, span
+from .profiles import Profile, ProfileManager, warm_up
+from .resources import ResourcePolicy, add_lightweight_arguments
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_TIMEOUT = 2.0
+
+# Headless Chrome gives itself away with "HeadlessChrome" in its user agent,
+# navigator.webdriver set and an 800x600 window; x.com answers such browsers
+# with an error page or a login wall, so headless launches mask all three
+HEADLESS_WINDOW_SIZE = "1920,1080"
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/{major}.0.0.0 Safari/537.36"
+)
+
+
+@functools.cache
+def chrome_major_version(binary: Optional[str] = None) -> Optional[int]:
+    """Major version of the Chrome at ``binary`` (or on the PATH), None if unknown"""
+    binary = binary or shutil.which("google-chrome") or shutil.which("chromium")
+    if not binary:
+        return None
+    try:
+        output = subprocess.run(
+            [binary, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Could not read the Chrome version of {binary}: {e}")
+        return None
+    match = re.search(r"(\d+)\.\d+\.\d+", output)
+    return int(match.group(1)) if match else None
+
+
+def add_headless_arguments(options: ChromiumOptions):
+    """Run Chrome headless, looking like a regular desktop Chrome to the page"""
+    options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={HEADLESS_WINDOW_SIZE}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    major = chrome_major_version(options.binary_location or None)
+    if major is not None:
+        options.add_argument(f"--user-agent={USER_AGENT.format(major=major)}")
+
+
+def create_chrome_options(
+    headless: bool = True, resource_policy: Optional[ResourcePolicy] = None
+) -> ChromiumOptions:
+    """Chrome options shared by every pooled browser"""
+    options = ChromiumOptions()
+
+    chrome_bin = os.environ.get("CHROME_BIN")
+    if chrome_bin and os.path.exists(chrome_bin):
+        options.binary_location = chrome_bin
+
+    if headless:
+        add_headless_arguments(options)
+
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-web-security")
+    add_lightweight_arguments(options, resource_policy or ResourcePolicy())
+
+    return options
+
+
+@dataclass
+class _BrowserSlot:
+    index: int
+    browser: Optional[Chrome] = None
+    profile: Optional[Profile] = None
+    idle_tabs: List[Tab] = field(default_factory=list)
+    tab_uses: Dict[int, int] = field(default_factory=dict)
+    leased: int = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.browser is not None
+
+
+class BrowserPool:
+    """
+    A fixed set of long-lived Chrome instances handing out tabs on lease.
+
+    Each browser keeps one blank anchor tab open so that closing a leased tab
+    never closes the last window. Leased tabs are returned to their browser
+    and closed once they reach ``max_tab_uses`` or fail a health check, and a
+    browser that stops responding is relaunched on the next lease.
+
+    With ``profiles`` each browser runs on its own persistent profile, kept
+    across relaunches and locked against every other browser, and on start
+    its anchor tab loads ``warm_urls`` to fill the profile's cache.
+    """
+
+    def __init__(
+        self,
+        browsers: int = 1,
+        tabs_per_browser: int = 4,
+        max_tab_uses: int = 50,
+        headless: bool = True,
+        browser_factory: Optional[Callable[[], Chrome]] = None,
+        resource_policy: Optional[ResourcePolicy] = None,
+        profiles: Optional[ProfileManager] = None,
+        warm_urls: Sequence[str] = (),
+    ):
+        if browsers < 1:
+            raise ValueError("browsers must be at least 1")
+        if tabs_per_browser < 1:
+            raise ValueError("tabs_per_browser must be at least 1")
+
+        self.browsers = browsers
+        self.tabs_per_browser = tabs_per_browser
+        self.max_tab_uses = max_tab_uses
+        self.headless = headless
+        self.resource_policy = resource_policy or ResourcePolicy()
+        self.profiles = profiles
+        self.warm_urls = list(warm_urls)
+        self._browser_factory = browser_factory
+
+        self._slots = [_BrowserSlot(index=i) for i in range(browsers)]
+        self._capacity = asyncio.Semaphore(browsers * tabs_per_browser)
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "BrowserPool":
+        return cls(
+            browsers=settings.pool_browsers,
+            tabs_per_browser=settings.pool_tabs_per_browser,
+            max_tab_uses=settings.pool_max_tab_uses,
+            headless=settings.headless,
+            resource_policy=ResourcePolicy.from_settings(settings),
+            profiles=ProfileManager.from_settings(settings),
+            warm_urls=settings.warm_urls,
+        )
+
+    @property
+    def size(self) -> int:
+        """Maximum number of tabs that can be leased at once"""
+        return self.browsers * self.tabs_per_browser
+
+    @property
+    def leased(self) -> int:
+        return sum(slot.leased for slot in self._slots)
+
+    async def start(self):
+        """Launch every browser in the pool"""
+        await asyncio.gather(*(self._launch(slot, warm=True) for slot in self._slots))
+        self._started = True
+        logger.info(f"Browser pool started with {self.browsers} browser(s), {self.size} tab(s)")
+
+    async def close(self):
+        """Stop every browser in the pool"""
+        self._started = False
+        await asyncio.gather(*(self._shutdown(slot, release_profile=True) for slot in self._slots))
+        logger.info("Browser pool closed")
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Tab]:
+        """Lease a tab for the duration of the ``async with`` block"""
+        if not self._started:
+            raise RuntimeError("Browser pool is not started")
+
+        with span("pool", "lease_wait"):
+            await self._capacity.acquire()
+        healthy = False
+        try:
+            with span("pool", "acquire_tab"):
+                slot, tab = await self._acquire_tab()
+            TABS_LEASED.inc()
+            try:
+                yield tab
+                healthy = True
+            finally:
+                TABS_LEASED.dec()
+                await self._release_tab(slot, tab, healthy)
+        finally:
+            self._capacity.release()
+
+    async def _acquire_tab(self) -> "tuple[_BrowserSlot, Tab]":
+        async with self._lock:
+            slot = min(self._slots, key=lambda s: (not s.alive, s.leased))
+            if not slot.alive:
+                await self._launch(slot)
+            slot.leased += 1
+
+        try:
+            if slot.idle_tabs:
+                tab = slot.idle_tabs.pop()
+            else:
+                tab = await slot.browser.new_tab()
+                slot.tab_uses[id(tab)] = 0
+        except Exception as e:
+            logger.error(f"Browser {slot.index} failed to open a tab, relaunching: {e}")
+            try:
+                await self._restart(slot)
+                tab = await slot.browser.new_tab()
+            except Exception:
+                slot.leased -= 1
+                raise
+            slot.tab_uses[id(tab)] = 0
+
+        return slot, tab
+
+    async def _release_tab(self, slot: _BrowserSlot, tab: Tab, healthy: bool):
+        slot.leased -= 1
+        if id(tab) not in slot.tab_uses:
+            # The browser was relaunched while this tab was out on lease
+            return
+
+        uses = slot.tab_uses[id(tab)] + 1
+        slot.tab_uses[id(tab)] = uses
+
+        if healthy:
+            healthy = await self._is_tab_healthy(tab)
+
+        if healthy and uses < self.max_tab_uses and self._started:
+            slot.idle_tabs.append(tab)
+            return
+
+        reason = "unhealthy" if not healthy else f"used {uses} times"
+        logger.info(f"Recycling tab on browser {slot.index} ({reason})")
+        slot.tab_uses.pop(id(tab), None)
+        try:
+            await asyncio.wait_for(tab.close(), timeout=HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Error closing tab: {e}")
+
+        if not healthy and not await self._is_browser_healthy(slot):
+            logger.warning(f"Browser {slot.index} is unresponsive, relaunching")
+            await self._restart(slot)
+
+    @staticmethod
+    async def _is_tab_healthy(tab: Tab) -> bool:
+        try:
+            await asyncio.wait_for(tab.execute_script("1"), timeout=HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _is_browser_healthy(slot: _BrowserSlot) -> bool:
+        if slot.browser is None:
+            return False
+        try:
+            await asyncio.wait_for(slot.browser.get_version(), timeout=HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    def _create_browser(self, slot: _BrowserSlot) -> Chrome:
+        if self._browser_factory is not None:
+            return self._browser_factory()
+        options = create_chrome_options(self.headless, self.resource_policy)
+        if slot.profile is not None:
+            slot.profile.apply(options)
+        return Chrome(options=options)
+
+    async def _launch(self, slot: _BrowserSlot, warm: bool = False):
+        if self.profiles is not None and slot.profile is None:
+            slot.profile = await self.profiles.acquire(prefix="pool")
+
+        browser = self._create_browser(slot)
+        # The initial tab stays open as an anchor and is never leased
+        with span("pool", "browser_launch"):
+            anchor = await browser.start()
+        BROWSERS_LIVE.inc()
+        slot.browser = browser
+        slot.idle_tabs = []
+        slot.tab_uses = {}
+
+        profile_name = "a throwaway profile"
+        if slot.profile is not None:
+            profile_name = f"profile {slot.profile.name}"
+            await slot.profile.load_cookies(browser)
+        logger.info(f"Launched browser {slot.index} on {profile_name}")
+
+        if warm:
+            await warm_up(anchor, self.warm_urls)
+
+    async def _shutdown(self, slot: _BrowserSlot, release_profile: bool = False):
+        browser, slot.browser = slot.browser, None
+        slot.idle_tabs = []
+        slot.tab_uses = {}
+        if browser is not None:
+            BROWSERS_LIVE.dec()
+            if slot.profile is not None:
+                await slot.profile.save_cookies(browser)
+            try:
+                await browser.__aexit__(None, None, None)
+            except Exception as e:
+                logger.debug(f"Error stopping browser {slot.index}: {e}")
+
+        if release_profile and slot.profile is not None:
+            slot.profile.release()
+            slot.profile = None
+
+    async def _restart(self, slot: _BrowserSlot):
+        async with self._lock:
+            await self._shutdown(slot)
+            await self._launch(slot)
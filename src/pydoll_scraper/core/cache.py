@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import Settings
+from .faults import COMPLETE
+from .scraper import ScrapedData
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Shared storage for cached scrape results, holding JSON strings with a TTL"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        """Release the backend's connections"""
+
+
+class MemoryCache(CacheBackend):
+    """In-process backend, used in tests and when no Redis is configured"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: int):
+        self._entries[key] = (self._clock() + ttl, value)
+
+    async def close(self):
+        pass
+
+
+class RedisCache(CacheBackend):
+    """Backend shared by every API worker through Redis"""
+
+    def __init__(self, url: str, prefix: str = "pydoll-scraper:cache:"):
+        if redis is None:
+            raise ImportError("RedisCache requires the 'redis' package: pip install redis")
+        self.prefix = prefix
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self._client.set(self.prefix + key, value, ex=ttl)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class LRUCache:
+    """Bounded in-process tier holding decoded values with a TTL"""
+
+    def __init__(self, max_size: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(hit, value)``"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def tweet_links_result_key(account_name: str, total_tweets: int) -> str:
+    return f"xcom:links-result:{account_name.lower()}:{total_tweets}"
+
+
+def page_key(url: str, selectors: Optional[Dict[str, str]] = None) -> str:
+    params = json.dumps(selectors or {}, sort_keys=True)
+    digest = hashlib.sha1(f"{url}\n{params}".encode("utf-8")).hexdigest()
+    return f"page:{digest}"
+
+
+class ScrapeCache:
+    """
+    Result cache in front of the scrapers.
+
+    Lookups go through the in-process LRU tier, then the shared backend, and
+    only then run the scrape. Concurrent misses for the same key share a
+    single scrape, run as a task that every caller awaits; it keeps running
+    while anyone still waits, even if the caller that started it is
+    cancelled, and is cancelled with the last one.
+    Empty and partial results are returned but not cached, so a failed scrape
+    is retried on the next request.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: int = 60,
+        local_size: int = 256,
+        local_ttl: Optional[int] = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.local = LRUCache(local_size)
+        self.local_ttl = ttl if local_ttl is None else min(local_ttl, ttl)
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+        cacheable: Callable[[Any], bool] = bool,
+    ) -> Any:
+        """
+        Return the cached value for ``key`` or compute, cache and return it
+
+        Args:
+            key: Cache key
+            compute: Coroutine factory running the actual scrape
+            encode: Converts the computed value to JSON-serializable data
+            decode: Converts JSON data back into the value type
+            cacheable: Whether a computed value may be cached; non-empty ones by default
+        """
+        hit, value = self.local.get(key)
+        if hit:
+            return value
+
+        # The scrape runs as a task of its own, so a caller that is cancelled
+        # (e.g. its client disconnected) does not cancel it for the others
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, compute, encode, decode, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Nobody is left to want the result
+            if self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    async def _compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], Any],
+        decode: Callable[[Any], Any],
+        cacheable: Callable[[Any], bool],
+    ) -> Any:
+        value = await self._load(key, decode)
+        if value is None:
+            value = await compute()
+            if cacheable(value):
+                await self._store(key, encode(value))
+                self.local.set(key, value, self.local_ttl)
+        return value
+
+    async def tweet_links_result(
+        self,
+        account_name: str,
+        total_tweets: int,
+        scrape: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Cached ``xcom_links`` task result; only its links are stored"""
+        return await self.get_or_compute(
+            tweet_links_result_key(account_name, total_tweets),
+            scrape,
+            encode=lambda result: result["links"],
+            decode=lambda links: {
+                "account": account_name,
+                "count": len(links),
+                "links": links,
+                "status": COMPLETE,
+            },
+            cacheable=lambda result: bool(result["links"]) and result["status"] == COMPLETE,
+        )
+
+    async def page(
+        self,
+        url: str,
+        selectors: Optional[Dict[str, str]],
+        scrape: Callable[[], Awaitable[Optional[ScrapedData]]],
+    ) -> Optional[ScrapedData]:
+        """Cached ``WebScraper.scrape_url`` result"""
+        return await self.get_or_compute(
+            page_key(url, selectors),
+            scrape,
+            encode=asdict,
+            decode=lambda data: ScrapedData(**data),
+            cacheable=lambda page: page is not None and page.status == COMPLETE,
+        )
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    async def _load(self, key: str, decode: Callable[[Any], Any]) -> Any:
+        if self.backend is None:
+            return None
+        try:
+            raw = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = decode(json.loads(raw))
+        self.local.set(key, value, self.local_ttl)
+        return value
+
+    async def _store(self, key: str, data: Any):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, json.dumps(data, ensure_ascii=False), self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def create_scrape_cache(settings: Settings) -> Optional[ScrapeCache]:
+    """Result cache of ``settings``, shared through Redis when configured; None when disabled"""
+    if settings.cache_ttl <= 0:
+        return None
+    backend = RedisCache(settings.redis_url) if settings.redis_url else None
+    return ScrapeCache(backend, ttl=settings.cache_ttl, local_size=settings.cache_local_size)
@@ -0,0 +1,36 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def map_bounded(
+    func: Callable[[T], Awaitable[R]], items: Iterable[T], limit: int
+) -> List[Union[R, BaseException]]:
+    """
+    Run ``func`` over ``items`` with at most ``limit`` calls in flight
+
+    Unlike a bare ``asyncio.gather``, only ``limit`` coroutines are ever
+    started at once. Results keep the order of ``items``; an exception raised
+    for one item is returned in its place instead of cancelling the rest.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    items = list(items)
+    results: List[Union[R, BaseException]] = [None] * len(items)  # type: ignore[list-item]
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(items):
+            index = next_index
+            next_index += 1
+            try:
+                results[index] = await func(items[index])
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*(worker() for _ in range(min(limit, len(items)))))
+    return results
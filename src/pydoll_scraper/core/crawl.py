@@ -0,0 +1,142 @@
+"""
+Parallel page fetching over reusable tabs of one running browser.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar, Union
+
+from pydoll.browser.tab import Tab
+
+from .errors import TabFailedError
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+TAB_CLOSE_TIMEOUT = 2.0
+
+
+class TabCrawler:
+    """
+    Fetches URLs in parallel, one per tab, over at most ``tabs`` tabs of ``browser``
+
+    Tabs are opened on first use and reused for later URLs and later
+    ``map`` calls instead of relaunching anything. A fetch that exceeds
+    ``page_timeout`` is cancelled and its tab, which may be stuck mid-load,
+    is closed and replaced by a fresh one. A fetch raising ``TabFailedError``
+    has its tab replaced too, and runs again in the fresh tab up to
+    ``tab_retries`` times.
+    """
+
+    def __init__(
+        self,
+        browser,
+        tabs: int = 5,
+        page_timeout: float = 30.0,
+        first_tab: Optional[Tab] = None,
+        tab_retries: int = 0,
+    ):
+        """
+        Args:
+            browser: Started browser to open tabs in
+            tabs: Maximum number of pages loading at the same time
+            page_timeout: Seconds one fetch may take before it is cancelled
+            first_tab: Already open tab to use as one of the ``tabs``, e.g. the
+                browser's start tab; it is never closed, only set aside if it hangs
+            tab_retries: Fresh tabs a URL is fetched in again after its tab failed
+        """
+        if tabs < 1:
+            raise ValueError("tabs must be at least 1")
+
+        self.browser = browser
+        self.tabs = tabs
+        self.page_timeout = page_timeout
+        self.tab_retries = tab_retries
+        self.opened = 0
+        self._first_tab = first_tab
+        self._idle: List[Tab] = [first_tab] if first_tab is not None else []
+
+    async def __aenter__(self) -> "TabCrawler":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def map(
+        self, fetch: Callable[[Tab, str], Awaitable[R]], urls: Iterable[str]
+    ) -> List[Union[R, BaseException]]:
+        """
+        Run ``fetch(tab, url)`` for every URL and return the results in URL order
+
+        An exception raised for one URL, including ``asyncio.TimeoutError`` for
+        a fetch over ``page_timeout``, is returned in its place.
+        """
+        urls = list(urls)
+        results: List[Union[R, BaseException]] = [None] * len(urls)  # type: ignore[list-item]
+        next_index = 0
+
+        async def worker():
+            nonlocal next_index
+            tab: Optional[Tab] = None
+            try:
+                while next_index < len(urls):
+                    index = next_index
+                    next_index += 1
+                    url = urls[index]
+                    for attempt in range(self.tab_retries + 1):
+                        try:
+                            if tab is None:
+                                tab = await self._take_tab()
+                            results[index] = await asyncio.wait_for(
+                                fetch(tab, url), timeout=self.page_timeout
+                            )
+                        except asyncio.TimeoutError:
+                            message = f"Timed out after {self.page_timeout}s loading {url}"
+                            logger.warning(message)
+                            results[index] = asyncio.TimeoutError(message)
+                            await self._discard(tab)
+                            tab = None
+                        except TabFailedError as e:
+                            results[index] = e
+                            await self._discard(tab)
+                            tab = None
+                            if attempt < self.tab_retries:
+                                logger.warning(f"{e}; retrying {url} in a fresh tab")
+                                continue
+                        except Exception as e:
+                            results[index] = e
+                        break
+            finally:
+                if tab is not None:
+                    self._idle.append(tab)
+
+        workers = min(self.tabs, len(urls))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def close(self):
+        """Close the tabs this crawler opened"""
+        idle, self._idle = self._idle, []
+        for tab in idle:
+            if tab is not self._first_tab:
+                await self._close_tab(tab)
+
+    async def _take_tab(self) -> Tab:
+        if self._idle:
+            return self._idle.pop()
+        tab = await self.browser.new_tab()
+        self.opened += 1
+        return tab
+
+    async def _discard(self, tab: Optional[Tab]):
+        # The first tab is never closed, so the browser always keeps a window
+        if tab is not None and tab is not self._first_tab:
+            await self._close_tab(tab)
+
+    @staticmethod
+    async def _close_tab(tab: Tab):
+        try:
+            await asyncio.wait_for(tab.close(), timeout=TAB_CLOSE_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Error closing tab: {e}")
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+
+from ..config import Settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+STATUS_ID_PATTERN = re.compile(r"/status/(\d+)")
+
+
+def status_id_from_link(link: str) -> Optional[int]:
+    """Numeric status ID from a tweet link, or None if it has none"""
+    match = STATUS_ID_PATTERN.search(link or "")
+    return int(match.group(1)) if match else None
+
+
+def newest_status_id(links: Iterable[str]) -> Optional[int]:
+    ids = [status_id for link in links if (status_id := status_id_from_link(link))]
+    return max(ids) if ids else None
+
+
+class CursorStore(ABC):
+    """
+    Persisted per-account high-water mark: the newest status ID seen.
+
+    ``advance`` only ever moves a cursor forward, so concurrent scrapes of the
+    same account cannot roll it back.
+    """
+
+    @abstractmethod
+    async def get(self, account_name: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    async def advance(self, account_name: str, status_id: int):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        """Release the store's connections"""
+
+    @staticmethod
+    def _key(account_name: str) -> str:
+        return account_name.lower()
+
+
+class MemoryCursorStore(CursorStore):
+    """In-process store, used in tests"""
+
+    def __init__(self):
+        self._cursors: Dict[str, int] = {}
+
+    async def get(self, account_name: str) -> Optional[int]:
+        return self._cursors.get(self._key(account_name))
+
+    async def advance(self, account_name: str, status_id: int):
+        key = self._key(account_name)
+        self._cursors[key] = max(status_id, self._cursors.get(key, 0))
+
+    async def close(self):
+        pass
+
+
+class SQLiteCursorStore(CursorStore):
+    """Store backed by a local SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = asyncio.Lock()
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cursors ("
+                " account TEXT PRIMARY KEY,"
+                " status_id INTEGER NOT NULL)"
+            )
+
+    async def get(self, account_name: str) -> Optional[int]:
+        async with self._lock:
+            row = await asyncio.to_thread(self._get, self._key(account_name))
+        return row[0] if row else None
+
+    async def advance(self, account_name: str, status_id: int):
+        async with self._lock:
+            await asyncio.to_thread(self._advance, self._key(account_name), status_id)
+
+    async def close(self):
+        self._connection.close()
+
+    def _get(self, account: str):
+        return self._connection.execute(
+            "SELECT status_id FROM cursors WHERE account = ?", (account,)
+        ).fetchone()
+
+    def _advance(self, account: str, status_id: int):
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO cursors (account, status_id) VALUES (?, ?)"
+                " ON CONFLICT(account) DO UPDATE SET"
+                " status_id = MAX(status_id, excluded.status_id)",
+                (account, status_id),
+            )
+
+
+class RedisCursorStore(CursorStore):
+    """Store shared across processes and nodes through Redis"""
+
+    # Compare-and-set so the cursor never moves backwards. IDs are compared as
+    # decimal strings because Lua numbers lose precision above 2^53.
+    _ADVANCE_SCRIPT = """
+    local current = redis.call('GET', KEYS[1])
+    if not current or #ARGV[1] > #current or (#ARGV[1] == #current and ARGV[1] > current) then
+        redis.call('SET', KEYS[1], ARGV[1])
+    end
+    """
+
+    def __init__(self, url: str, prefix: str = "pydoll-scraper:cursor:"):
+        if redis is None:
+            raise ImportError("RedisCursorStore requires the 'redis' package: pip install redis")
+        self.prefix = prefix
+        self._client = redis.from_url(url, decode_responses=True)
+        self._advance = self._client.register_script(self._ADVANCE_SCRIPT)
+
+    async def get(self, account_name: str) -> Optional[int]:
+        value = await self._client.get(self.prefix + self._key(account_name))
+        return int(value) if value else None
+
+    async def advance(self, account_name: str, status_id: int):
+        await self._advance(keys=[self.prefix + self._key(account_name)], args=[str(status_id)])
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def create_cursor_store(settings: Settings) -> CursorStore:
+    """Cursor store selected by ``settings.cursor_backend``"""
+    if settings.cursor_backend == "redis":
+        if not settings.redis_url:
+            raise ValueError("SCRAPER_CURSOR_BACKEND=redis requires SCRAPER_REDIS_URL")
+        return RedisCursorStore(settings.redis_url)
+    if settings.cursor_backend == "sqlite":
+        return SQLiteCursorStore(settings.cursor_db_path)
+    raise ValueError(f"Unknown cursor backend: {settings.cursor_backend!r}")
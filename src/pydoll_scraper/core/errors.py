@@ -0,0 +1,91 @@
+"""
+Typed scrape failures, so callers can tell a throttled scrape from an account
+that is gone and both from an account that simply has no tweets (an empty
+result, not an error).
+"""
+
+from typing import Optional
+
+
+class ScrapeError(Exception):
+    """A scrape that could not produce a result; ``kind`` names the failure"""
+
+    kind = "error"
+
+
+class RateLimitedError(ScrapeError):
+    """
+    The site throttled or soft-blocked us: a 429 from the timeline API, its
+    "Something went wrong" error page, a login wall, or a timeline that never
+    rendered. ``retry_after`` is the site's hint in seconds, when it gave one.
+    """
+
+    kind = "throttled"
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AccountUnavailableError(ScrapeError):
+    """The account does not exist, is suspended or has protected tweets"""
+
+    kind = "unavailable"
+
+
+class WorkerCrashedError(ScrapeError):
+    """The worker process running the scrape died or stopped responding"""
+
+    kind = "crashed"
+
+
+class TabFailedError(ScrapeError):
+    """
+    The tab crashed, a DevTools call on it did not answer in time, or its page
+    kept failing; ``reason`` is ``"crashed"``, ``"hung"`` or ``"errors"``
+    """
+
+    kind = "tab_failed"
+
+    def __init__(self, message: str, reason: str = "crashed"):
+        super().__init__(message)
+        self.reason = reason
+
+
+class OverloadedError(ScrapeError):
+    """
+    The scrape was shed before it ran: too many requests are queued for the
+    scraping capacity, or it could not finish within its deadline.
+    ``retry_after`` is the estimated wait in seconds until it could start.
+    """
+
+    kind = "overloaded"
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+ERROR_TYPES = {
+    error_type.kind: error_type
+    for error_type in (
+        ScrapeError,
+        RateLimitedError,
+        AccountUnavailableError,
+        WorkerCrashedError,
+        TabFailedError,
+        OverloadedError,
+    )
+}
+
+
+def error_kind(error: BaseException) -> str:
+    """``kind`` of a ``ScrapeError``, ``"error"`` for any other exception"""
+    return error.kind if isinstance(error, ScrapeError) else ScrapeError.kind
+
+
+def error_from_kind(kind: str, message: str, retry_after: Optional[float] = None) -> ScrapeError:
+    """Rebuild a failure reported by ``error_kind``, e.g. by another process"""
+    if kind in (RateLimitedError.kind, OverloadedError.kind):
+        return ERROR_TYPES[kind](message, retry_after)
+    return ERROR_TYPES.get(kind, ScrapeError)(message)
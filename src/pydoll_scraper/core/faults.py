@@ -0,0 +1,229 @@
+"""
+Tab fault isolation for scrapes.
+
+Every DevTools call of a scrape runs under a deadline (``cdp_call``), and a
+failed step probes its tab (``tab_alive``) to tell a crashed or hung tab from
+a transient page error. Either way the scrape raises ``TabFailedError`` and
+resumes in a fresh tab from its ``ScrapeCheckpoint`` instead of starting
+over; once it runs out of fresh tabs, the results collected so far are
+returned with the ``"partial"`` status.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from pydoll.browser.tab import Tab
+
+from .errors import ScrapeError, TabFailedError, error_kind
+from .page_scripts import evaluate
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single DevTools call may take before its tab counts as hung; calls
+# that wait on the page themselves (navigation, settling) get their own wait on top
+CDP_TIMEOUT = 15.0
+# Seconds the liveness probe of a tab may take
+PROBE_TIMEOUT = 2.0
+# Fresh tabs a scrape resumes in after its tab failed, before giving up
+TAB_RETRIES = 2
+# Times in a row a step may fail on a live tab before the tab is given up on
+STEP_RETRIES = 2
+TAB_CLOSE_TIMEOUT = 2.0
+
+COMPLETE = "complete"
+PARTIAL = "partial"
+
+R = TypeVar("R")
+
+# Opens a tab for one attempt of a scrape, e.g. ``BrowserPool.lease``
+TabSource = Callable[[], AsyncContextManager[Tab]]
+
+
+async def cdp_call(awaitable: Awaitable[R], operation: str, timeout: float = CDP_TIMEOUT) -> R:
+    """
+    Await a DevTools call, giving up after ``timeout`` seconds
+
+    Raises:
+        TabFailedError: If the call did not answer in time
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise TabFailedError(f"{operation} got no answer within {timeout:.0f}s", "hung") from None
+
+
+async def tab_alive(tab: Tab, timeout: float = PROBE_TIMEOUT) -> bool:
+    """Whether ``tab`` still evaluates scripts"""
+    try:
+        await asyncio.wait_for(evaluate(tab, "1"), timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def check_tab(tab: Tab, error: Exception, operation: str):
+    """
+    Raise ``TabFailedError`` for ``error`` if it left ``tab`` dead
+
+    ``ScrapeError``s are re-raised as they are, since they are about the
+    site, not the tab.
+    """
+    if isinstance(error, ScrapeError):
+        raise error
+    if not await tab_alive(tab):
+        raise TabFailedError(f"Tab crashed during {operation}: {error}", "crashed") from error
+
+
+class StepGuard:
+    """
+    Retries a failed scroll step in place while its tab is alive
+
+    ``failed`` returns to let the step run again, or raises
+    ``TabFailedError`` once the tab is dead or the step failed more than
+    ``retries`` times in a row.
+    """
+
+    def __init__(self, tab: Tab, operation: str, retries: int = STEP_RETRIES):
+        self.tab = tab
+        self.operation = operation
+        self.retries = retries
+        self.failures = 0
+
+    def succeeded(self):
+        self.failures = 0
+
+    async def failed(self, error: Exception):
+        await check_tab(self.tab, error, self.operation)
+        self.failures += 1
+        if self.failures > self.retries:
+            raise TabFailedError(
+                f"{self.operation} failed {self.failures} times in a row: {error}", "errors"
+            ) from error
+        logger.warning(f"Retrying {self.operation} after an error: {error}")
+
+
+@dataclass
+class ScrapeCheckpoint:
+    """
+    Progress of one scrape, kept across the tabs it resumes in
+
+    ``seen`` holds every result key yielded so far, ``passed`` the ones met
+    again in the current attempt, so a resumed scroll through known tweets
+    still counts as progress. ``reached_since`` tells whether an incremental
+    scrape scrolled down to its ``since_id``.
+    """
+
+    seen: Set[str] = field(default_factory=set)
+    passed: Set[str] = field(default_factory=set)
+    reached_since: bool = False
+    attempts: int = 0
+    status: str = COMPLETE
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+    @property
+    def resumes(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def begin_attempt(self):
+        self.attempts += 1
+        self.passed = set()
+
+    def add(self, key: str):
+        self.seen.add(key)
+        self.passed.add(key)
+
+    def revisit(self, key: str) -> bool:
+        """Record meeting an already yielded ``key``; True the first time per attempt"""
+        if key in self.passed:
+            return False
+        self.passed.add(key)
+        return True
+
+    def give_up(self, error: BaseException):
+        """Mark the results so far as partial, failed with ``error``"""
+        self.status = PARTIAL
+        self.error = str(error)
+        self.error_type = error_kind(error)
+
+    def outcome(self) -> Dict[str, Any]:
+        """Status fields of a task result"""
+        if self.status == COMPLETE:
+            return {"status": COMPLETE}
+        return {"status": self.status, "error": self.error, "error_type": self.error_type}
+
+
+def tab_sequence(first: Tab, fresh: Optional[TabSource] = None) -> TabSource:
+    """
+    Tab source opening ``first`` for the first attempt and tabs of ``fresh``
+    after it; without ``fresh`` there is no tab to resume in
+    """
+    used = False
+
+    @asynccontextmanager
+    async def open_tab() -> AsyncIterator[Tab]:
+        nonlocal used
+        if not used:
+            used = True
+            yield first
+        elif fresh is None:
+            raise RuntimeError("No fresh tab to resume in")
+        else:
+            async with fresh() as tab:
+                yield tab
+
+    return open_tab
+
+
+def browser_tabs(browser) -> TabSource:
+    """Tab source opening a new tab of ``browser`` per attempt, closed after it"""
+
+    @asynccontextmanager
+    async def open_tab() -> AsyncIterator[Tab]:
+        tab = await cdp_call(browser.new_tab(), "new_tab")
+        try:
+            yield tab
+        finally:
+            try:
+                await asyncio.wait_for(tab.close(), TAB_CLOSE_TIMEOUT)
+            except Exception as e:
+                logger.debug(f"Error closing tab: {e}")
+
+    return open_tab
+
+
+@asynccontextmanager
+async def tab_source(
+    tab: Optional[Tab],
+    tabs: Optional[TabSource],
+    launch: Callable[[], AsyncContextManager[Tuple[Any, Tab]]],
+    retries: int = TAB_RETRIES,
+) -> AsyncIterator[Tuple[TabSource, int]]:
+    """
+    Tabs of one scrape and how many fresh ones it may resume in
+
+    ``tab`` comes first when given, then tabs of ``tabs``; a given ``tab``
+    without ``tabs`` has nowhere to resume. With neither, ``launch`` starts
+    a dedicated browser whose first tab is followed by new tabs of its own.
+    """
+    if tab is not None:
+        yield tab_sequence(tab, tabs), retries if tabs is not None else 0
+    elif tabs is not None:
+        yield tabs, retries
+    else:
+        async with launch() as (browser, first):
+            yield tab_sequence(first, browser_tabs(browser)), retries
@@ -0,0 +1,255 @@
+"""
+Tweet extraction from the X.com web app's own timeline API responses.
+
+The profile page loads its timeline as JSON from the ``UserTweets`` GraphQL
+endpoint before rendering any ``<article>``. ``TimelineCapture`` picks those
+responses up through CDP network events and ``parse_user_tweets`` turns them
+into the same entry dictionaries the in-page extraction script returns, with
+exact status IDs and timestamps and no DOM traversal at all.
+"""
+
+import asyncio
+import base64
+import html
+import json
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from pydoll.browser.tab import Tab
+from pydoll.commands import NetworkCommands
+
+logger = logging.getLogger(__name__)
+
+USER_TWEETS_URL_PATTERN = re.compile(r"/i/api/graphql/[^/]+/UserTweets(?:\?|$)")
+
+CREATED_AT_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+def _iso_timestamp(created_at: Optional[str]) -> Optional[str]:
+    """``Fri Jan 10 00:15:00 +0000 2025`` to ``2025-01-10T00:15:00.000Z``, as on ``<time>``"""
+    if not created_at:
+        return None
+    try:
+        moment = datetime.strptime(created_at, CREATED_AT_FORMAT).astimezone(timezone.utc)
+    except ValueError:
+        return None
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _tweet_text(tweet: Dict[str, Any], legacy: Dict[str, Any]) -> str:
+    note = tweet.get("note_tweet", {}).get("note_tweet_results", {}).get("result", {})
+    if note.get("text"):
+        return html.unescape(note["text"])
+
+    text = legacy.get("full_text", "")
+    # The range excludes the leading @mentions of replies and trailing media links
+    if display_range := legacy.get("display_text_range"):
+        text = text[display_range[0] : display_range[1]]
+    return html.unescape(text)
+
+
+def _engagement_label(legacy: Dict[str, Any], views: Dict[str, Any]) -> str:
+    """Same wording as the ``aria-label`` of the rendered engagement bar"""
+    parts = [
+        f"{legacy.get('reply_count', 0)} replies",
+        f"{legacy.get('retweet_count', 0)} reposts",
+        f"{legacy.get('favorite_count', 0)} likes",
+    ]
+    if legacy.get("bookmark_count"):
+        parts.append(f"{legacy['bookmark_count']} bookmarks")
+    if views.get("count"):
+        parts.append(f"{views['count']} views")
+    return ", ".join(parts)
+
+
+def _screen_name(tweet: Dict[str, Any]) -> Optional[str]:
+    user = tweet.get("core", {}).get("user_results", {}).get("result", {})
+    return user.get("core", {}).get("screen_name") or user.get("legacy", {}).get("screen_name")
+
+
+def tweet_from_result(result: Optional[Dict[str, Any]], pinned: bool = False) -> Optional[Dict]:
+    """
+    Entry dictionary for one ``tweet_results.result`` object
+
+    Returns None for tombstones and other results without tweet data.
+    """
+    if result and result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet")
+    if not result or "legacy" not in result:
+        return None
+
+    legacy = result["legacy"]
+    status_id = result.get("rest_id") or legacy.get("id_str")
+    screen_name = _screen_name(result)
+    if not status_id or not screen_name:
+        return None
+
+    return {
+        "link": f"/{screen_name}/status/{status_id}",
+        "pinned": pinned,
+        "timestamp": _iso_timestamp(legacy.get("created_at")),
+        "text": _tweet_text(result, legacy),
+        "hashtags": [f"#{tag['text']}" for tag in legacy.get("entities", {}).get("hashtags", [])],
+        "details": _engagement_label(legacy, result.get("views", {})),
+        "retweet": "retweeted_status_result" in legacy,
+    }
+
+
+def _tweet_results(content: Dict[str, Any]) -> Iterator[Optional[Dict[str, Any]]]:
+    """Tweet results of a timeline entry: one for items, several for conversation modules"""
+    if item := content.get("itemContent"):
+        yield item.get("tweet_results", {}).get("result")
+    for module_item in content.get("items", []):
+        item = module_item.get("item", {}).get("itemContent", {})
+        yield item.get("tweet_results", {}).get("result")
+
+
+def _instructions(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    user = (payload.get("data") or {}).get("user", {}).get("result", {})
+    timeline = user.get("timeline_v2") or user.get("timeline") or {}
+    return timeline.get("timeline", {}).get("instructions", [])
+
+
+def parse_user_tweets(payload: Dict[str, Any], account_name: Optional[str] = None) -> List[Dict]:
+    """
+    Parse a ``UserTweets`` response into timeline entries, in timeline order
+
+    Like the rendered timeline, only the account's own tweets have links under
+    its handle: with ``account_name`` set, retweets and other authors' tweets
+    in conversation modules are left out.
+    """
+    account = account_name.lower() if account_name else None
+    entries = []
+
+    for instruction in _instructions(payload):
+        if instruction.get("type") == "TimelinePinEntry":
+            raw_entries, pinned = [instruction.get("entry", {})], True
+        elif "entries" in instruction:
+            raw_entries, pinned = instruction["entries"], False
+        else:
+            continue
+
+        for raw_entry in raw_entries:
+            for result in _tweet_results(raw_entry.get("content", {})):
+                entry = tweet_from_result(result, pinned)
+                if entry is None:
+                    continue
+                if account and (entry["retweet"] or not _is_by(entry, account)):
+                    continue
+                entries.append(entry)
+
+    return entries
+
+
+def _is_by(entry: Dict, account: str) -> bool:
+    return entry["link"].lower().startswith(f"/{account}/status/")
+
+
+def _retry_after(headers: Dict[str, Any]) -> Optional[float]:
+    """Seconds until ``x-rate-limit-reset`` (epoch seconds), or per ``retry-after``"""
+    headers = {name.lower(): value for name, value in headers.items()}
+    try:
+        if "x-rate-limit-reset" in headers:
+            return max(0.0, float(headers["x-rate-limit-reset"]) - time.time())
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class TimelineCapture:
+    """
+    Collects parsed ``UserTweets`` responses loaded by a tab
+
+    Use as an async context manager around the navigation, so the first page
+    of the timeline is captured too, and read pages with ``next_entries``.
+    A timeline request answered with 429 sets ``rate_limited``, with the
+    seconds until the limit resets in ``retry_after`` when the site sent them.
+    """
+
+    def __init__(self, tab: Tab, account_name: Optional[str] = None):
+        self.tab = tab
+        self.account_name = account_name
+        self.pages = 0
+        self.rate_limited = False
+        self.retry_after: Optional[float] = None
+        self._timeline_requests: Set[str] = set()
+        self._entries: "asyncio.Queue[List[Dict]]" = asyncio.Queue()
+        self._callback_ids: List[int] = []
+        self._enabled_network = False
+
+    async def __aenter__(self) -> "TimelineCapture":
+        self._callback_ids.append(
+            await self.tab.on("Network.responseReceived", self._on_response_received)
+        )
+        self._callback_ids.append(
+            await self.tab.on("Network.loadingFinished", self._on_loading_finished)
+        )
+        if not self.tab.network_events_enabled:
+            await self.tab.enable_network_events()
+            self._enabled_network = True
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for callback_id in self._callback_ids:
+            await self.tab._connection_handler.remove_callback(callback_id)
+        if self._enabled_network:
+            try:
+                await self.tab.disable_network_events()
+            except Exception as e:
+                logger.warning(f"Could not disable network events: {e}")
+
+    async def next_entries(self, timeout: float) -> List[Dict]:
+        """
+        Entries of every page captured since the last call
+
+        Waits up to ``timeout`` seconds for a page when none is waiting, and
+        returns an empty list if none arrives.
+        """
+        try:
+            entries = await asyncio.wait_for(self._entries.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        while not self._entries.empty():
+            entries = entries + self._entries.get_nowait()
+        return entries
+
+    def _on_response_received(self, event: Dict):
+        params = event["params"]
+        response = params.get("response", {})
+        if not USER_TWEETS_URL_PATTERN.search(response.get("url", "")):
+            return
+        if response.get("status") == 200:
+            self._timeline_requests.add(params["requestId"])
+        elif response.get("status") == 429:
+            self.rate_limited = True
+            self.retry_after = _retry_after(response.get("headers") or {})
+            logger.warning(f"Timeline request rate limited, retry after {self.retry_after}s")
+            # Wake a waiting next_entries instead of letting it time out
+            self._entries.put_nowait([])
+
+    async def _on_loading_finished(self, event: Dict):
+        request_id = event["params"]["requestId"]
+        if request_id not in self._timeline_requests:
+            return
+        self._timeline_requests.discard(request_id)
+
+        try:
+            response = await self.tab._execute_command(
+                NetworkCommands.get_response_body(request_id)
+            )
+            body = response["result"]["body"]
+            if response["result"].get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8")
+            entries = parse_user_tweets(json.loads(body), self.account_name)
+        except Exception as e:
+            logger.warning(f"Could not read timeline response {request_id}: {e}")
+            return
+
+        self.pages += 1
+        logger.info(f"Captured timeline page {self.pages} with {len(entries)} tweet(s)")
+        self._entries.put_nowait(entries)
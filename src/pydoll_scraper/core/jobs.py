@@ -0,0 +1,368 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from ..config import Settings
+from .errors import WorkerCrashedError
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    # ScrapeError kind of a failed job, e.g. "throttled" or "unavailable"
+    error_type: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Times a worker claimed the job; more than one after a worker died running it
+    attempts: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(**data)
+
+
+class JobQueue(ABC):
+    """
+    Queue of scrape jobs plus the stored state of every job.
+
+    The API submits jobs and reads their state; workers claim queued jobs and
+    record their outcome. Finished jobs are kept for ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: int = 86400):
+        self.ttl = ttl
+
+    @abstractmethod
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        pass
+
+    @abstractmethod
+    async def claim(self, timeout: float = 1.0) -> Optional[Job]:
+        """Take the next queued job and mark it running, or None after ``timeout`` seconds"""
+
+    @abstractmethod
+    async def save(self, job: Job):
+        pass
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Return the job once it is finished, or its current state after ``timeout`` seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.done or remaining <= 0:
+                return job
+            await asyncio.sleep(min(0.5, remaining))
+
+    async def complete(self, job: Job, result: Any):
+        job.status = SUCCEEDED
+        job.result = result
+        job.finished_at = time.time()
+        await self.save(job)
+
+    async def fail(self, job: Job, error: str, error_type: str = "error"):
+        job.status = FAILED
+        job.error = error
+        job.error_type = error_type
+        job.finished_at = time.time()
+        await self.save(job)
+
+    @abstractmethod
+    async def heartbeat(self):
+        """Tell other workers this one is alive and still running its claimed jobs"""
+
+    async def requeue_stale(self) -> int:
+        """Queue again the jobs claimed by workers that died; returns how many"""
+        return 0
+
+    @abstractmethod
+    async def close(self):
+        """Release the queue's connections"""
+
+    @staticmethod
+    def _new_job(kind: str, payload: Dict[str, Any]) -> Job:
+        return Job(id=uuid.uuid4().hex, kind=kind, payload=payload)
+
+
+class MemoryJobQueue(JobQueue):
+    """In-process queue, used in tests and by the API's built-in worker"""
+
+    def __init__(self, ttl: int = 86400):
+        super().__init__(ttl)
+        self._jobs: Dict[str, Job] = {}
+        self._pending: "asyncio.Queue[str]" = asyncio.Queue()
+        self._changed = asyncio.Condition()
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        self._expire()
+        job = self._new_job(kind, payload)
+        self._jobs[job.id] = job
+        self._pending.put_nowait(job.id)
+        return Job.from_dict(job.to_dict())
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        # Hand out copies so callers cannot change the stored state behind our back
+        return Job.from_dict(job.to_dict()) if job else None
+
+    async def claim(self, timeout: float = 1.0) -> Optional[Job]:
+        try:
+            job_id = await asyncio.wait_for(self._pending.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        job = self._jobs[job_id]
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.attempts += 1
+        return Job.from_dict(job.to_dict())
+
+    async def save(self, job: Job):
+        self._jobs[job.id] = Job.from_dict(job.to_dict())
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self._is_settled(job_id)), timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(job_id)
+
+    async def heartbeat(self):
+        # Jobs die with the process that runs them, so there is no one to tell
+        pass
+
+    async def close(self):
+        pass
+
+    def _is_settled(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        return job is None or job.done
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.done and job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Queue shared by the API and worker processes on any node through Redis
+
+    Job IDs wait in a list; each job's state is a JSON string expiring after
+    ``ttl``. Finished jobs are announced on a per-job channel so long-polling
+    clients wake up without polling.
+
+    Claiming moves a job ID atomically into this consumer's processing list,
+    where it stays until the job finishes, and ``heartbeat`` keeps the
+    consumer's liveness key from expiring for ``visibility_timeout``
+    seconds. ``requeue_stale`` hands the jobs of consumers whose key expired,
+    because their worker crashed or was killed, back to the queue, and fails
+    a job once ``max_attempts`` workers died running it.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: int = 86400,
+        prefix: str = "pydoll-scraper:jobs:",
+        visibility_timeout: int = 60,
+        max_attempts: int = 3,
+    ):
+        if redis is None:
+            raise ImportError("RedisJobQueue requires the 'redis' package: pip install redis")
+        super().__init__(ttl)
+        self.prefix = prefix
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        job = self._new_job(kind, payload)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.id), json.dumps(job.to_dict()), ex=self.ttl)
+            pipe.lpush(self._pending_key, job.id)
+            await pipe.execute()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        raw = await self._client.get(self._job_key(job_id))
+        return Job.from_dict(json.loads(raw)) if raw else None
+
+    async def claim(self, timeout: float = 1.0) -> Optional[Job]:
+        # Alive before a job lands in the processing list, so it is never taken for stale
+        await self.heartbeat()
+        job_id = await self._client.blmove(
+            self._pending_key, self._processing_key(self.consumer), timeout, "RIGHT", "LEFT"
+        )
+        if job_id is None:
+            return None
+        job = await self.get(job_id)
+        if job is None:
+            logger.warning(f"Dropping expired job {job_id}")
+            await self._client.lrem(self._processing_key(self.consumer), 1, job_id)
+            return None
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.attempts += 1
+        await self.save(job)
+        return job
+
+    async def save(self, job: Job):
+        if not job.done:
+            await self._client.set(self._job_key(job.id), json.dumps(job.to_dict()), ex=self.ttl)
+            return
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.id), json.dumps(job.to_dict()), ex=self.ttl)
+            pipe.lrem(self._processing_key(self.consumer), 1, job.id)
+            await pipe.execute()
+        await self._client.publish(self._done_channel(job.id), job.status)
+
+    async def heartbeat(self):
+        await self._client.set(
+            self._alive_key(self.consumer), str(time.time()), ex=self.visibility_timeout
+        )
+
+    async def requeue_stale(self) -> int:
+        """
+        Queue again the jobs of consumers without a live heartbeat
+
+        Each job is first moved into this consumer's own processing list, so
+        a requeuer dying halfway leaves it to be recovered in turn.
+        """
+        own = self._processing_key(self.consumer)
+        requeued = 0
+        async for key in self._client.scan_iter(match=self._processing_key("*")):
+            consumer = key[len(self._processing_key("")) :]
+            if key == own or await self._client.exists(self._alive_key(consumer)):
+                continue
+            while (job_id := await self._client.lmove(key, own, "RIGHT", "LEFT")) is not None:
+                if await self._requeue(job_id, consumer):
+                    requeued += 1
+        return requeued
+
+    async def _requeue(self, job_id: str, consumer: str) -> bool:
+        own = self._processing_key(self.consumer)
+        job = await self.get(job_id)
+        if job is None or job.done:
+            await self._client.lrem(own, 1, job_id)
+            return False
+        if job.attempts >= self.max_attempts:
+            logger.error(f"Failing job {job.id}: {job.attempts} workers died running it")
+            await self.fail(
+                job,
+                f"X.com scraping error: job abandoned by {job.attempts} workers that died",
+                WorkerCrashedError.kind,
+            )
+            return False
+
+        logger.warning(f"Requeueing job {job.id} claimed by dead worker {consumer}")
+        job.status = QUEUED
+        job.started_at = None
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.id), json.dumps(job.to_dict()), ex=self.ttl)
+            pipe.lrem(own, 1, job.id)
+            # The pending list is consumed from the right, so it runs next
+            pipe.rpush(self._pending_key, job.id)
+            await pipe.execute()
+        return True
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._done_channel(job_id))
+        try:
+            # Checked after subscribing so a job finishing in between is not missed
+            job = await self.get(job_id)
+            deadline = time.monotonic() + timeout
+            while job is not None and not job.done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=remaining
+                )
+                if message is not None:
+                    job = await self.get(job_id)
+            return job
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def close(self):
+        await self._client.aclose()
+
+    @property
+    def _pending_key(self) -> str:
+        return self.prefix + "pending"
+
+    def _processing_key(self, consumer: str) -> str:
+        return self.prefix + "processing:" + consumer
+
+    def _alive_key(self, consumer: str) -> str:
+        return self.prefix + "alive:" + consumer
+
+    def _job_key(self, job_id: str) -> str:
+        return self.prefix + "job:" + job_id
+
+    def _done_channel(self, job_id: str) -> str:
+        return self.prefix + "done:" + job_id
+
+
+def create_job_queue(settings: Settings) -> JobQueue:
+    """Job queue selected by ``settings.job_backend``"""
+    if settings.job_backend == "redis":
+        if not settings.redis_url:
+            raise ValueError("SCRAPER_JOB_BACKEND=redis requires SCRAPER_REDIS_URL")
+        return RedisJobQueue(
+            settings.redis_url,
+            ttl=settings.job_ttl,
+            visibility_timeout=settings.job_visibility_timeout,
+            max_attempts=settings.job_max_attempts,
+        )
+    if settings.job_backend == "memory":
+        return MemoryJobQueue(ttl=settings.job_ttl)
+    raise ValueError(f"Unknown job backend: {settings.job_backend!r}")
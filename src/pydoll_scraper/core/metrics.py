@@ -0,0 +1,320 @@
+"""
+Scrape timing spans and Prometheus metrics.
+
+``span`` times one stage of a scrape (browser launch, navigation, waiting for
+the timeline, scrolling, extraction) into the ``scraper_stage_seconds``
+histogram and counts the stages that raise. A ``collect_timings`` block
+additionally gathers the spans run inside it into a per-request breakdown.
+
+Metrics live in the process-wide ``REGISTRY`` and are rendered in the
+Prometheus text exposition format by ``REGISTRY.render()``; no client library
+is needed.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; covers sub-millisecond CDP round trips up to multi-minute scrapes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: bucket counts (non-cumulative), sum, count
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        values = self._values.get(self._key(labels))
+        return values[2] if values else 0
+
+    def sum(self, **labels: str) -> float:
+        values = self._values.get(self._key(labels))
+        return values[1] if values else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(c), s, n)) for key, (c, s, n) in self._values.items())
+
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a ``/metrics`` scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "scraper_stage_seconds", "Time spent in each scrape stage", ("operation", "stage")
+)
+STAGE_FAILURES = REGISTRY.counter(
+    "scraper_stage_failures_total", "Scrape stages that raised", ("operation", "stage")
+)
+BROWSERS_LIVE = REGISTRY.gauge("scraper_browsers_live", "Browsers currently running")
+TABS_LEASED = REGISTRY.gauge("scraper_tabs_leased", "Pool tabs currently leased")
+SCROLL_STEPS = REGISTRY.counter("scraper_scroll_steps_total", "Timeline scroll steps")
+ARTICLES_PARSED = REGISTRY.counter(
+    "scraper_articles_parsed_total", "Timeline articles parsed", ("extraction",)
+)
+THROTTLED = REGISTRY.counter(
+    "scraper_throttled_total", "Responses that signalled throttling", ("host",)
+)
+HOST_RATE = REGISTRY.gauge(
+    "scraper_host_rate_per_minute", "Current adaptive request rate", ("host",)
+)
+
+TAB_FAILURES = REGISTRY.counter(
+    "scraper_tab_failures_total",
+    "Tabs that crashed, hung or kept failing mid-scrape",
+    ("operation", "reason"),
+)
+PARTIAL_RESULTS = REGISTRY.counter(
+    "scraper_partial_results_total",
+    "Scrapes that returned the results collected before their tabs failed",
+    ("operation",),
+)
+
+SLOTS_BUSY = REGISTRY.gauge(
+    "scraper_slots_busy", "Scheduler slots held by running scrapes", ("priority",)
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "scraper_queue_depth", "Scrape requests waiting for a scheduler slot", ("priority",)
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "scraper_queue_wait_seconds", "Time scrape requests waited for a scheduler slot", ("priority",)
+)
+REQUESTS_SHED = REGISTRY.counter(
+    "scraper_requests_shed_total",
+    "Scrape requests rejected before running, "
+    "because the queue was full or the deadline unmeetable",
+    ("priority", "reason"),
+)
+
+WORKER_PROCESSES_READY = REGISTRY.gauge(
+    "scraper_worker_processes_ready", "Worker processes ready to take scrapes"
+)
+WORKER_RESTARTS = REGISTRY.counter(
+    "scraper_worker_restarts_total", "Worker processes restarted after dying or hanging"
+)
+
+
+class Timings:
+    """Per-request breakdown of the spans run inside a ``collect_timings`` block"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float, calls: int = 1):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    def merge(self, breakdown: Dict):
+        """Add the stages of a ``to_dict`` breakdown, e.g. from a worker process"""
+        for stage, values in breakdown["stages"].items():
+            self.add(stage, values["ms"] / 1000, values["calls"])
+
+    def to_dict(self) -> Dict:
+        """Milliseconds per stage, summed over repeated spans, plus the wall time"""
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages": {
+                stage: {"ms": round(seconds * 1000, 1), "calls": self.calls[stage]}
+                for stage, seconds in self.stages.items()
+            },
+        }
+
+
+_timings: ContextVar[Optional[Timings]] = ContextVar("scrape_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Timings]:
+    """Gather the spans run inside this block, including in tasks it spawns"""
+    timings = Timings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def merge_timings(breakdown: Dict):
+    """Add a ``Timings.to_dict`` breakdown to the enclosing ``collect_timings`` block, if any"""
+    if (timings := _timings.get()) is not None:
+        timings.merge(breakdown)
+
+
+@contextmanager
+def span(operation: str, stage: str) -> Iterator[None]:
+    """
+    Time ``stage`` of a scrape and count it as failed if it raises
+
+    Never wrap a ``yield`` of an async generator in a span, or the time the
+    consumer spends on each item is counted too.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.inc(operation=operation, stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, operation=operation, stage=stage)
+        if (timings := _timings.get()) is not None:
+            timings.add(f"{operation}.{stage}", elapsed)
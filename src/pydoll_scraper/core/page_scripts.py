@@ -0,0 +1,156 @@
+import json
+from typing import Any, Dict
+
+from pydoll.browser.tab import Tab
+from pydoll.commands import RuntimeCommands
+
+# Collects every rendered timeline article in a single round trip: status link,
+# pinned flag, timestamp, text, hashtags and the engagement summary (details).
+# Formatted with the account name (JSON encoded) and returns a JSON string so
+# the whole batch comes back by value.
+TIMELINE_EXTRACT_SCRIPT = """
+(() => {
+    const account = %s.toLowerCase();
+    const isStatusLink = (a) => {
+        const href = a.getAttribute('href') || '';
+        return href.includes('/status/') && href.toLowerCase().includes(account);
+    };
+    return JSON.stringify(Array.from(document.querySelectorAll('article')).map((article) => {
+        const time = article.querySelector('time');
+        let anchor = time ? time.closest('a') : null;
+        if (!anchor || !isStatusLink(anchor)) {
+            anchor = Array.from(article.querySelectorAll('a')).find(isStatusLink) || null;
+        }
+        const social = article.querySelector('[data-testid="socialContext"]');
+        const text = article.querySelector('[data-testid="tweetText"]');
+        const group = article.querySelector('[role="group"]');
+        const hashtags = text
+            ? Array.from(text.querySelectorAll('a[href*="/hashtag/"]')).map((a) => a.textContent)
+            : [];
+        return {
+            link: anchor ? anchor.getAttribute('href') : null,
+            pinned: !!social && social.textContent.toLowerCase().includes('pinned'),
+            timestamp: time ? time.getAttribute('datetime') : null,
+            text: text ? text.innerText : null,
+            hashtags: hashtags,
+            details: group ? group.getAttribute('aria-label') : null,
+        };
+    }));
+})()
+"""
+
+# Waits until the document has loaded and the network has been quiet for
+# ``quietMs`` (or ``timeoutMs`` passes), then snapshots the page in the same
+# round trip: title, every <meta> by name/property/http-equiv, and the text of
+# every match of each CSS selector, capped at ``maxText`` characters. Invalid
+# selectors map to null. Formatted with the options (JSON encoded).
+PAGE_SNAPSHOT_SCRIPT = """
+new Promise((resolve) => {
+    const opts = %s;
+    const started = performance.now();
+    let lastActivity = started;
+
+    let network = null;
+    if (window.PerformanceObserver) {
+        network = new PerformanceObserver(() => { lastActivity = performance.now(); });
+        try { network.observe({type: 'resource', buffered: false}); } catch (e) { network = null; }
+    }
+
+    const textOf = (el) => {
+        const text = el.innerText !== undefined ? el.innerText : el.textContent;
+        return (text || '').trim().slice(0, opts.maxText);
+    };
+
+    const snapshot = () => {
+        if (network) network.disconnect();
+        const meta = {};
+        for (const tag of document.querySelectorAll('meta')) {
+            const key = tag.getAttribute('name') || tag.getAttribute('property')
+                || tag.getAttribute('http-equiv');
+            const content = tag.getAttribute('content');
+            if (key && content !== null && !(key in meta)) meta[key] = content;
+        }
+        const selected = {};
+        for (const [key, selector] of Object.entries(opts.selectors)) {
+            try {
+                selected[key] = Array.from(document.querySelectorAll(selector)).map(textOf);
+            } catch (e) {
+                selected[key] = null;
+            }
+        }
+        resolve(JSON.stringify({
+            title: document.title,
+            ready_state: document.readyState,
+            waited_ms: performance.now() - started,
+            meta: meta,
+            selected: selected,
+        }));
+    };
+
+    const poll = () => {
+        const now = performance.now();
+        const loaded = document.readyState === 'complete';
+        if (now - started >= opts.timeoutMs) return snapshot();
+        if (loaded && now - lastActivity >= opts.quietMs) return snapshot();
+        setTimeout(poll, Math.min(opts.quietMs, 50));
+    };
+    poll();
+})
+"""
+
+
+# Reads why a profile page shows no articles: the empty-state panel (no posts,
+# account missing, suspended or protected), the "Something went wrong" error
+# X.com renders when it throttles, or a redirect to the login flow.
+TIMELINE_STATE_SCRIPT = """
+(() => {
+    const text = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? (el.innerText || el.textContent || '').trim() : null;
+    };
+    return JSON.stringify({
+        articles: document.querySelectorAll('article').length,
+        empty: text('[data-testid="emptyState"]'),
+        error: text('[data-testid="error-detail"]'),
+        login: location.pathname.startsWith('/i/flow/login'),
+    });
+})()
+"""
+
+
+async def evaluate(tab: Tab, expression: str, await_promise: bool = False) -> Any:
+    """Evaluate ``expression`` in ``tab`` and return its value"""
+    response = await tab._execute_command(
+        RuntimeCommands.evaluate(
+            expression=expression, return_by_value=True, await_promise=await_promise
+        )
+    )
+    result = response["result"]
+    if "exceptionDetails" in result:
+        raise RuntimeError(f"Script failed: {result['exceptionDetails'].get('text', '')}")
+
+    return result["result"].get("value")
+
+
+async def evaluate_json(tab: Tab, expression: str, await_promise: bool = False) -> Any:
+    """Evaluate a script that returns ``JSON.stringify``-ed data and decode it"""
+    value = await evaluate(tab, expression, await_promise=await_promise)
+    return json.loads(value) if value is not None else None
+
+
+def timeline_extract_script(account_name: str) -> str:
+    """Build the timeline extraction script for ``account_name``"""
+    return TIMELINE_EXTRACT_SCRIPT % json.dumps(account_name)
+
+
+def page_snapshot_script(
+    selectors: Dict[str, str], quiet_period: float, timeout: float, max_text: int
+) -> str:
+    """Build the page snapshot script for ``selectors``"""
+    options = {
+        "selectors": selectors,
+        "quietMs": int(quiet_period * 1000),
+        "timeoutMs": int(timeout * 1000),
+        "maxText": max_text,
+    }
+    return PAGE_SNAPSHOT_SCRIPT % json.dumps(options)
@@ -0,0 +1,241 @@
+"""
+Reusable Chrome user-data directories.
+
+A fresh profile has no HTTP cache, service worker or cookies, so every launch
+downloads x.com's whole JS bundle again and is more likely to get the login
+interstitial. ``ProfileManager`` hands out persistent profile directories under
+one root, each locked by a single browser at a time (across processes too, on
+platforms with ``fcntl``), and keeps each profile's cookies in a
+``cookies.json`` next to it so session state survives a browser that was
+killed rather than closed. A ``cookies.json`` dropped into a profile before its
+first launch seeds it, e.g. with a logged-in session.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import IO, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from pydoll.browser import Chrome
+from pydoll.browser.options import ChromiumOptions
+from pydoll.browser.tab import Tab
+
+from ..config import Settings
+from .metrics import span
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = ".scraper.lock"
+COOKIES_FILE = "cookies.json"
+COOKIE_TIMEOUT = 5.0
+ACQUIRE_POLL_INTERVAL = 0.2
+
+# Fields of a CDP Cookie that Storage.setCookies accepts back
+COOKIE_PARAM_FIELDS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+    "priority",
+    "sameParty",
+    "sourceScheme",
+    "sourcePort",
+    "partitionKey",
+)
+
+
+class Profile:
+    """A locked profile directory, held until ``release``"""
+
+    def __init__(self, name: str, path: Path, lock_file: IO, manager: "ProfileManager"):
+        self.name = name
+        self.path = path
+        self._lock_file = lock_file
+        self._manager = manager
+
+    @property
+    def cookies_path(self) -> Path:
+        return self.path / COOKIES_FILE
+
+    def apply(self, options: ChromiumOptions):
+        """Point ``options`` at this profile"""
+        options.add_argument(f"--user-data-dir={self.path}")
+
+    async def load_cookies(self, browser: Chrome) -> int:
+        """Restore the cookies saved with this profile; returns how many were set"""
+        try:
+            cookies = json.loads(self.cookies_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cookies of profile {self.name}: {e}")
+            return 0
+
+        params = [_cookie_param(cookie) for cookie in cookies if cookie.get("name")]
+        if params:
+            try:
+                await asyncio.wait_for(browser.set_cookies(params), timeout=COOKIE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Could not restore cookies of profile {self.name}: {e}")
+                return 0
+        return len(params)
+
+    async def save_cookies(self, browser: Chrome) -> int:
+        """Save the browser's cookies with this profile; returns how many were saved"""
+        try:
+            cookies = await asyncio.wait_for(browser.get_cookies(), timeout=COOKIE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not save cookies of profile {self.name}: {e}")
+            return 0
+
+        temp_path = self.cookies_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(cookies), encoding="utf-8")
+        os.replace(temp_path, self.cookies_path)
+        return len(cookies)
+
+    def release(self):
+        self._manager._release(self)
+
+
+def _cookie_param(cookie: Dict) -> Dict:
+    param = {key: cookie[key] for key in COOKIE_PARAM_FIELDS if key in cookie}
+    # Session cookies come back with expires -1 and must be set without one
+    if cookie.get("session") or param.get("expires", 0) < 0:
+        param.pop("expires", None)
+    return param
+
+
+class ProfileManager:
+    """
+    Persistent, exclusively locked Chrome profiles under ``root``
+
+    Profiles are named ``<prefix>-<n>``; ``acquire`` takes the lowest-numbered
+    free one, so a restarted process gets the warm profiles of its previous
+    run back.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._held: Set[str] = set()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["ProfileManager"]:
+        """Profile manager of the settings, or None when profiles are disabled"""
+        return cls(settings.profile_dir) if settings.persistent_profiles else None
+
+    def try_acquire(self, name: str) -> Optional[Profile]:
+        """Lock profile ``name`` if no other browser holds it"""
+        if not re.fullmatch(r"[\w.-]+", name):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        if name in self._held:
+            return None
+
+        path = self.root / name
+        path.mkdir(parents=True, exist_ok=True)
+        lock_file = open(path / LOCK_FILE, "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return None
+
+        self._held.add(name)
+        return Profile(name, path.resolve(), lock_file, self)
+
+    async def acquire(
+        self, name: Optional[str] = None, prefix: str = "profile", timeout: Optional[float] = None
+    ) -> Profile:
+        """
+        Lock profile ``name``, waiting up to ``timeout`` seconds for it, or the
+        first free ``<prefix>-<n>`` profile when no name is given
+
+        Raises:
+            TimeoutError: If ``name`` stays locked for ``timeout`` seconds
+        """
+        if name is None:
+            index = 0
+            while (profile := self.try_acquire(f"{prefix}-{index}")) is None:
+                index += 1
+            return profile
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while (profile := self.try_acquire(name)) is None:
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(f"Profile {name} is in use")
+            await asyncio.sleep(ACQUIRE_POLL_INTERVAL)
+        return profile
+
+    def _release(self, profile: Profile):
+        if profile.name not in self._held:
+            return
+        self._held.discard(profile.name)
+        if fcntl is not None:
+            fcntl.flock(profile._lock_file.fileno(), fcntl.LOCK_UN)
+        profile._lock_file.close()
+
+
+async def warm_up(tab: Tab, urls: List[str], timeout: float = 30.0):
+    """
+    Load ``urls`` in ``tab`` to fill the profile's HTTP cache and service
+    workers, then leave the tab blank. Failures are logged, not raised.
+    """
+    for url in urls:
+        try:
+            with span("pool", "warm_up"):
+                await asyncio.wait_for(tab.go_to(url), timeout=timeout)
+            logger.info(f"Warmed up browser cache with {url}")
+        except Exception as e:
+            logger.warning(f"Could not warm up with {url}: {e}")
+    if urls:
+        try:
+            await asyncio.wait_for(tab.go_to("about:blank"), timeout=timeout)
+        except Exception as e:
+            logger.debug(f"Could not blank the warm-up tab: {e}")
+
+
+@asynccontextmanager
+async def launch_browser(
+    options: ChromiumOptions,
+    profiles: Optional[ProfileManager] = None,
+    operation: str = "browser",
+) -> AsyncIterator[Tuple[Chrome, Tab]]:
+    """
+    Start a dedicated Chrome, on the first free profile of ``profiles`` when
+    given, and yield it with its first tab
+
+    The profile's cookies are restored after start and saved before the
+    browser stops, and the profile is unlocked once it has.
+    """
+    profile = await profiles.acquire() if profiles is not None else None
+    try:
+        if profile is not None:
+            profile.apply(options)
+
+        async with Chrome(options=options) as browser:
+            with span(operation, "browser_launch"):
+                tab = await browser.start()
+            if profile is not None:
+                await profile.load_cookies(browser)
+            try:
+                yield browser, tab
+            finally:
+                if profile is not None:
+                    await profile.save_cookies(browser)
+    finally:
+        if profile is not None:
+            profile.release()
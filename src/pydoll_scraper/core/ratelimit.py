@@ -0,0 +1,318 @@
+"""
+Per-host request rate limiting with adaptive backoff.
+
+``HostRateLimiter`` hands out one token per timeline navigation from a token
+bucket per host, kept in process or in Redis so every worker shares it. The
+rate adapts additive-increase/multiplicative-decrease style: each throttled
+response halves the host's rate and blocks the host for a jittered,
+exponentially growing backoff; each clean load raises the rate again towards
+the configured ceiling. That converges on the fastest rate the site tolerates
+instead of repeatedly tripping its block.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from ..config import Settings
+from .errors import RateLimitedError
+from .metrics import HOST_RATE, THROTTLED, span
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+
+class RateLimitBackend(ABC):
+    """Token buckets and backoff blocks, keyed by host"""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take a token from ``key``'s bucket, refilled at ``rate`` tokens per
+        second up to ``burst``
+
+        Returns 0 when a token was taken, otherwise the seconds to wait
+        before trying again.
+        """
+
+    @abstractmethod
+    async def block(self, key: str, seconds: float):
+        """Refuse tokens for ``key`` for at least ``seconds``"""
+
+    @abstractmethod
+    async def close(self):
+        """Release the backend's connections"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """In-process backend, shared by every scraper of one process"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._blocked_until: Dict[str, float] = {}
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = self._clock()
+        tokens, updated = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+
+        wait = self._blocked_until.get(key, 0.0) - now
+        if wait <= 0:
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        return wait
+
+    async def block(self, key: str, seconds: float):
+        until = self._clock() + seconds
+        self._blocked_until[key] = max(until, self._blocked_until.get(key, 0.0))
+
+    async def close(self):
+        pass
+
+
+# Both scripts run on Redis' clock, so workers on different hosts agree on time
+TAKE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+
+local blocked_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+BLOCK_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local until_ = now + tonumber(ARGV[1])
+if until_ > tonumber(redis.call('GET', KEYS[1]) or '0') then
+    redis.call('SET', KEYS[1], tostring(until_), 'PX', math.ceil(tonumber(ARGV[1]) * 1000))
+end
+return 1
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Backend shared by every API and worker process through Redis"""
+
+    def __init__(self, url: str, prefix: str = "pydoll-scraper:ratelimit:"):
+        if redis is None:
+            raise ImportError(
+                "RedisRateLimitBackend requires the 'redis' package: pip install redis"
+            )
+        self.prefix = prefix
+        self._client = redis.from_url(url, decode_responses=True)
+        self._take = self._client.register_script(TAKE_SCRIPT)
+        self._block = self._client.register_script(BLOCK_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        keys = [f"{self.prefix}bucket:{key}", f"{self.prefix}blocked:{key}"]
+        return float(await self._take(keys=keys, args=[rate, burst]))
+
+    async def block(self, key: str, seconds: float):
+        await self._block(keys=[f"{self.prefix}blocked:{key}"], args=[seconds])
+
+    async def close(self):
+        await self._client.aclose()
+
+
+@dataclass
+class _HostState:
+    rate: float
+    strikes: int = 0
+
+
+class HostRateLimiter:
+    """
+    Token-bucket rate limiter per host with adaptive rate and backoff
+
+    Make each request to a host inside ``request(host)``, which waits for
+    a token and records whether the request was throttled, and wrap whole
+    scrapes in ``retry`` to rerun them after a backoff. The buckets and
+    backoff blocks live in the backend, the adapted rate per host in this
+    limiter.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        rate_per_minute: float = 30.0,
+        burst: int = 5,
+        min_rate_per_minute: float = 2.0,
+        backoff: float = 30.0,
+        max_backoff: float = 600.0,
+        max_retries: int = 2,
+    ):
+        """
+        Args:
+            backend: Where buckets are kept; in process when omitted
+            rate_per_minute: Highest request rate per host
+            burst: Requests a host may get at once after being idle
+            min_rate_per_minute: Floor the rate is never decreased below
+            backoff: Seconds a host is blocked after its first throttled response,
+                doubled for every further one in a row
+            max_backoff: Upper bound of the backoff, in seconds
+            max_retries: Reruns of a throttled ``retry``
+        """
+        if rate_per_minute <= 0 or min_rate_per_minute <= 0:
+            raise ValueError("rates must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.backend = backend or MemoryRateLimitBackend()
+        self.max_rate = rate_per_minute / 60
+        self.min_rate = min(min_rate_per_minute, rate_per_minute) / 60
+        self.burst = burst
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self._hosts: Dict[str, _HostState] = {}
+
+    def rate_per_minute(self, host: str) -> float:
+        """Current adapted request rate for ``host``"""
+        return self._state(host).rate * 60
+
+    async def acquire(self, host: str):
+        """Wait until a request to ``host`` is allowed"""
+        with span("ratelimit", "wait"):
+            while True:
+                wait = await self.backend.take(host, self._state(host).rate, self.burst)
+                if wait <= 0:
+                    return
+                # Jitter spreads out waiters that would otherwise wake together
+                await asyncio.sleep(wait + random.uniform(0, min(wait, 1.0) * 0.1))
+
+    def succeeded(self, host: str):
+        """Record a clean response: clear the backoff and raise the rate a step"""
+        state = self._state(host)
+        state.strikes = 0
+        state.rate = min(self.max_rate, state.rate + self.max_rate / 10)
+        HOST_RATE.set(state.rate * 60, host=host)
+
+    async def throttled(self, host: str, retry_after: Optional[float] = None) -> float:
+        """
+        Record a throttled response: halve the rate and block the host
+
+        Returns the seconds the host is blocked for: ``retry_after`` when the
+        site gave one, otherwise the exponential backoff with jitter.
+        """
+        state = self._state(host)
+        state.strikes += 1
+        state.rate = max(self.min_rate, state.rate / 2)
+        HOST_RATE.set(state.rate * 60, host=host)
+        THROTTLED.inc(host=host)
+
+        if retry_after is not None and retry_after > 0:
+            delay = min(retry_after, self.max_backoff)
+        else:
+            ceiling = min(self.max_backoff, self.backoff * 2 ** (state.strikes - 1))
+            delay = random.uniform(ceiling / 2, ceiling)
+        await self.backend.block(host, delay)
+        logger.warning(
+            f"Throttled by {host}, backing off {delay:.1f}s "
+            f"at {state.rate * 60:.1f} requests/minute"
+        )
+        return delay
+
+    @asynccontextmanager
+    async def request(self, host: str) -> AsyncIterator[None]:
+        """
+        Wait for ``host``'s rate, then record the block's outcome: throttled
+        when it raises ``RateLimitedError``, succeeded when it completes
+        """
+        await self.acquire(host)
+        try:
+            yield
+        except RateLimitedError as e:
+            await self.throttled(host, e.retry_after)
+            raise
+        self.succeeded(host)
+
+    async def retry(self, func: Callable[[], Awaitable[R]], host: str = "") -> R:
+        """
+        Run ``func`` and rerun it up to ``max_retries`` times while it raises
+        ``RateLimitedError``
+
+        ``func`` should make its requests inside ``request``, so each retry
+        waits out the backoff its failure set.
+        """
+        for attempt in range(self.max_retries):
+            try:
+                return await func()
+            except RateLimitedError as e:
+                logger.info(
+                    f"Retrying {host or 'request'} after throttling ({e}), attempt {attempt + 2}"
+                )
+        return await func()
+
+    async def close(self):
+        await self.backend.close()
+
+    def _state(self, host: str) -> _HostState:
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.max_rate)
+        return self._hosts[host]
+
+
+def create_rate_limiter(settings: Settings, processes: int = 1) -> HostRateLimiter:
+    """
+    Rate limiter with the backend selected by ``settings.rate_limit_backend``
+
+    The memory backend only counts the requests of its own process, so when
+    ``processes`` processes scrape side by side each gets an equal share of
+    the per-host rate and burst.
+    """
+    rate_per_minute, burst = settings.host_rate_per_minute, settings.host_burst
+    if settings.rate_limit_backend == "redis":
+        if not settings.redis_url:
+            raise ValueError("SCRAPER_RATE_LIMIT_BACKEND=redis requires SCRAPER_REDIS_URL")
+        backend = RedisRateLimitBackend(settings.redis_url)
+    elif settings.rate_limit_backend == "memory":
+        backend = MemoryRateLimitBackend()
+        if processes > 1:
+            rate_per_minute = rate_per_minute / processes
+            burst = max(1, burst // processes)
+    else:
+        raise ValueError(f"Unknown rate limit backend: {settings.rate_limit_backend!r}")
+
+    return HostRateLimiter(
+        backend,
+        rate_per_minute=rate_per_minute,
+        burst=burst,
+        backoff=settings.throttle_backoff,
+        max_backoff=settings.throttle_max_backoff,
+        max_retries=settings.throttle_retries,
+    )
@@ -0,0 +1,246 @@
+"""
+Resource blocking for scrape sessions.
+
+Scrapes only need DOM text and links, so images, media, fonts and trackers are
+dropped before they reach the network. URL patterns go to Chrome's built-in
+blocklist (``Network.setBlockedURLs``), which costs nothing per request.
+Blocking by resource type needs ``Fetch`` request interception, i.e. one CDP
+round trip per blocked request, and is therefore opt-in.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from pydoll.browser.options import ChromiumOptions
+from pydoll.browser.tab import Tab
+from pydoll.commands import FetchCommands, NetworkCommands
+from pydoll.constants import NetworkErrorReason
+
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+TRACKER_URL_PATTERNS = (
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*doubleclick.net/*",
+    "*googlesyndication.com/*",
+    "*connect.facebook.net/*",
+    "*scorecardresearch.com/*",
+    "*hotjar.com/*",
+    "*static.ads-twitter.com/*",
+    "*analytics.twitter.com/*",
+    "*x.com/i/api/1.1/jot/*",
+)
+
+BLOCKED_EXTENSIONS = (
+    "jpg",
+    "jpeg",
+    "png",
+    "gif",
+    "webp",
+    "avif",
+    "mp4",
+    "webm",
+    "m3u8",
+    "mp3",
+    "woff",
+    "woff2",
+    "ttf",
+    "otf",
+)
+
+# X.com serves all images and video from these hosts; the extension patterns
+# catch images, media and fonts on other sites
+MEDIA_URL_PATTERNS = ("*://pbs.twimg.com/*", "*://video.twimg.com/*") + tuple(
+    pattern
+    for extension in BLOCKED_EXTENSIONS
+    for pattern in (f"*.{extension}", f"*.{extension}?*")
+)
+
+DEFAULT_BLOCKED_TYPES = ("Image", "Media", "Font")
+
+# Rough median transfer sizes per resource type, used to estimate what
+# blocked requests would have cost; the real size is never downloaded
+TYPICAL_RESOURCE_BYTES = {
+    "Image": 30_000,
+    "Media": 500_000,
+    "Font": 40_000,
+    "Script": 20_000,
+    "Stylesheet": 10_000,
+}
+DEFAULT_RESOURCE_BYTES = 5_000
+
+# Flags trimming memory and background work in browsers used for scraping
+LIGHTWEIGHT_CHROME_ARGS = (
+    "--disable-gpu",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--no-first-run",
+    "--mute-audio",
+    "--renderer-process-limit=4",
+    # Pooled tabs work in the background; keep their timers and rendering running
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """
+    What a scrape session blocks
+
+    Attributes:
+        block_url_patterns: URL wildcard patterns blocked by Chrome itself
+        block_types: CDP resource types blocked through request interception
+        intercept: Whether to intercept requests to enforce ``block_types``
+        lightweight: Whether to launch browsers with ``LIGHTWEIGHT_CHROME_ARGS``
+    """
+
+    block_url_patterns: Tuple[str, ...] = TRACKER_URL_PATTERNS + MEDIA_URL_PATTERNS
+    block_types: Tuple[str, ...] = DEFAULT_BLOCKED_TYPES
+    intercept: bool = False
+    lightweight: bool = True
+
+    @classmethod
+    def off(cls) -> "ResourcePolicy":
+        """Load pages in full"""
+        return cls(block_url_patterns=(), block_types=(), lightweight=False)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ResourcePolicy":
+        if not settings.block_resources:
+            return cls(
+                block_url_patterns=(), block_types=(), lightweight=settings.lightweight_browser
+            )
+        return cls(intercept=settings.block_by_type, lightweight=settings.lightweight_browser)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.block_url_patterns) or (self.intercept and bool(self.block_types))
+
+    @property
+    def blocks_images(self) -> bool:
+        return "Image" in self.block_types and self.enabled
+
+
+@dataclass
+class ResourceStats:
+    """Network usage of one scrape session"""
+
+    loaded_requests: int = 0
+    transferred_bytes: int = 0
+    blocked_requests: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def blocked_total(self) -> int:
+        return sum(self.blocked_requests.values())
+
+    @property
+    def estimated_saved_bytes(self) -> int:
+        return sum(
+            count * TYPICAL_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES)
+            for resource_type, count in self.blocked_requests.items()
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "loaded_requests": self.loaded_requests,
+            "transferred_bytes": self.transferred_bytes,
+            "blocked_requests": dict(self.blocked_requests),
+            "estimated_saved_bytes": self.estimated_saved_bytes,
+        }
+
+    def on_loading_finished(self, event: Dict):
+        self.loaded_requests += 1
+        self.transferred_bytes += int(event["params"].get("encodedDataLength") or 0)
+
+    def on_loading_failed(self, event: Dict):
+        params = event["params"]
+        if params.get("blockedReason") or params.get("errorText") == "net::ERR_BLOCKED_BY_CLIENT":
+            resource_type = params.get("type") or "Other"
+            self.blocked_requests[resource_type] = self.blocked_requests.get(resource_type, 0) + 1
+
+
+def add_lightweight_arguments(options: ChromiumOptions, policy: ResourcePolicy):
+    """Add memory-saving flags, and turn off image decoding when images are blocked"""
+    if not policy.lightweight:
+        return
+    for argument in LIGHTWEIGHT_CHROME_ARGS:
+        options.add_argument(argument)
+    if policy.blocks_images:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+
+
+def _fetch_enable_command(block_types: Tuple[str, ...]) -> Dict:
+    # FetchCommands.enable only takes a single pattern
+    return {
+        "method": "Fetch.enable",
+        "params": {
+            "patterns": [
+                {"urlPattern": "*", "resourceType": resource_type, "requestStage": "Request"}
+                for resource_type in block_types
+            ]
+        },
+    }
+
+
+@asynccontextmanager
+async def blocking_resources(tab: Tab, policy: ResourcePolicy) -> AsyncIterator[ResourceStats]:
+    """
+    Apply ``policy`` to ``tab`` for the duration of the block and count traffic
+
+    Blocking is undone on exit so pooled tabs are handed back unchanged.
+    """
+    stats = ResourceStats()
+    if not policy.enabled:
+        yield stats
+        return
+
+    callback_ids: List[int] = []
+    intercepting = policy.intercept and bool(policy.block_types)
+
+    async def fail_request(event: Dict):
+        await tab._execute_command(
+            FetchCommands.fail_request(
+                event["params"]["requestId"], NetworkErrorReason.BLOCKED_BY_CLIENT
+            )
+        )
+
+    try:
+        callback_ids.append(await tab.on("Network.loadingFinished", stats.on_loading_finished))
+        callback_ids.append(await tab.on("Network.loadingFailed", stats.on_loading_failed))
+        await tab.enable_network_events()
+        if policy.block_url_patterns:
+            await tab._execute_command(
+                NetworkCommands.set_blocked_urls(list(policy.block_url_patterns))
+            )
+        if intercepting:
+            callback_ids.append(await tab.on("Fetch.requestPaused", fail_request))
+            await tab._execute_command(_fetch_enable_command(policy.block_types))
+
+        yield stats
+
+    finally:
+        for callback_id in callback_ids:
+            await tab._connection_handler.remove_callback(callback_id)
+        try:
+            if intercepting:
+                await tab.disable_fetch_events()
+            if policy.block_url_patterns:
+                await tab._execute_command(NetworkCommands.set_blocked_urls([]))
+            await tab.disable_network_events()
+        except Exception as e:
+            logger.warning(f"Could not reset resource blocking: {e}")
+
+        logger.info(
+            f"Resource blocking: {stats.blocked_total} request(s) blocked, "
+            f"~{stats.estimated_saved_bytes // 1024} KiB saved, "
+            f"{stats.transferred_bytes // 1024} KiB transferred"
+        )
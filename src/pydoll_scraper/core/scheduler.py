@@ -0,0 +1,350 @@
+"""
+Priority and deadline-aware admission to the shared scraping capacity.
+
+``ScrapeScheduler`` hands out a fixed number of scrape slots, one per pooled
+tab by default. Waiting requests are served by priority class first
+(``"interactive"`` before ``"bulk"``), then by earliest deadline, then in
+arrival order, and bulk scrapes never take the last ``reserved`` free slots,
+so an interactive request finds a tab even while a backfill runs.
+
+A request's tweet budget turns into an estimated run time (``CostModel``),
+learned from the scrapes that finished. A request that has to queue is shed
+with ``OverloadedError`` straight away when the work queued ahead of it means
+it cannot finish within its deadline, instead of timing out after holding a
+tab; one that can start right away is always admitted.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from bisect import insort
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from ..config import Settings
+from .errors import OverloadedError
+from .metrics import QUEUE_DEPTH, QUEUE_WAIT_SECONDS, REQUESTS_SHED, SLOTS_BUSY
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+# Highest priority first
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+@dataclass
+class CostModel:
+    """
+    Estimated seconds a scrape of ``tweets`` tweets takes
+
+    ``seconds_per_tweet`` follows the scrapes that finished as an
+    exponentially weighted average with weight ``smoothing``.
+    """
+
+    setup_seconds: float = 5.0
+    seconds_per_tweet: float = 0.2
+    smoothing: float = 0.2
+    min_seconds_per_tweet: float = 0.01
+
+    def estimate(self, tweets: int) -> float:
+        return self.setup_seconds + self.seconds_per_tweet * max(0, tweets)
+
+    def observe(self, tweets: int, seconds: float):
+        """Learn from a scrape of ``tweets`` tweets that took ``seconds``"""
+        if tweets <= 0:
+            return
+        sample = max(0.0, seconds - self.setup_seconds) / tweets
+        self.seconds_per_tweet += self.smoothing * (sample - self.seconds_per_tweet)
+        self.seconds_per_tweet = max(self.min_seconds_per_tweet, self.seconds_per_tweet)
+
+
+@dataclass(eq=False)
+class Admission:
+    """A slot held by one scrape; hand it back with ``ScrapeScheduler.release``"""
+
+    priority: str
+    tweets: int
+    cost: float
+    started: float
+
+
+@dataclass(eq=False)
+class _Waiter:
+    rank: int
+    due: float
+    sequence: int
+    tweets: int
+    cost: float
+    enqueued: float
+    future: "asyncio.Future[Admission]" = field(repr=False)
+
+    @property
+    def key(self):
+        return (self.rank, self.due, self.sequence)
+
+
+class ScrapeScheduler:
+    """
+    Admits scrapes onto ``slots`` concurrent slots by priority and deadline
+
+    Run each scrape inside ``slot``, or pair ``acquire`` with ``release`` when
+    the slot outlives the call, as for a streamed response.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        reserved: int = 1,
+        max_queue: int = 64,
+        cost_model: Optional[CostModel] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            slots: Scrapes that may run at once
+            reserved: Slots bulk scrapes never take; at most ``slots - 1``
+            max_queue: Requests per priority that may wait for a slot
+            cost_model: Run time estimate of a scrape
+            clock: Monotonic time in seconds
+        """
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.slots = slots
+        self.reserved = min(max(0, reserved), slots - 1)
+        self.max_queue = max_queue
+        self.cost_model = cost_model or CostModel()
+        self._clock = clock
+        self._running: Set[Admission] = set()
+        self._waiting: List[_Waiter] = []
+        self._sequence = itertools.count()
+
+    def estimate(self, tweets: int) -> float:
+        """Estimated seconds a scrape of ``tweets`` tweets runs"""
+        return self.cost_model.estimate(tweets)
+
+    def estimated_wait(self, priority: str = INTERACTIVE) -> float:
+        """Seconds a request of ``priority`` without a deadline would wait for a slot"""
+        return self._start_estimate(_rank(priority), math.inf, self._clock())
+
+    async def acquire(
+        self,
+        priority: str = INTERACTIVE,
+        tweets: int = 0,
+        deadline: Optional[float] = None,
+        shed: bool = True,
+    ) -> Admission:
+        """
+        Wait for a slot for a scrape of ``tweets`` tweets that should finish
+        within ``deadline`` seconds
+
+        Args:
+            priority: ``"interactive"`` or ``"bulk"``
+            tweets: Tweet budget of the scrape, for its cost estimate
+            deadline: Seconds from now the scrape should finish in; None waits
+                as long as it takes
+            shed: Whether the request may be rejected; without shedding it
+                waits for a slot however long the queue
+
+        Raises:
+            OverloadedError: If the queue of ``priority`` is full, or the
+                scrape is estimated to miss its deadline
+        """
+        rank = _rank(priority)
+        now = self._clock()
+        cost = self.estimate(tweets)
+        due = now + deadline if deadline is not None else math.inf
+
+        if self._can_start(rank) and not any(w.rank <= rank for w in self._waiting):
+            QUEUE_WAIT_SECONDS.observe(0.0, priority=priority)
+            return self._start(rank, tweets, cost, now)
+
+        wait = self._start_estimate(rank, due, now)
+        if shed and self._queued(rank) >= self.max_queue:
+            raise self._shed(priority, "queue_full", f"{self.max_queue} requests queued", wait)
+        if shed and now + wait + cost > due:
+            raise self._shed(
+                priority,
+                "deadline",
+                f"estimated {wait + cost:.0f}s exceeds the {deadline:.0f}s deadline",
+                wait,
+            )
+
+        waiter = _Waiter(
+            rank,
+            due,
+            next(self._sequence),
+            tweets,
+            cost,
+            now,
+            asyncio.get_running_loop().create_future(),
+        )
+        self._waiting.append(waiter)
+        QUEUE_DEPTH.inc(priority=priority)
+        return await self._wait(waiter, shed)
+
+    def release(self, admission: Admission, succeeded: bool = False):
+        """
+        Hand back ``admission``'s slot, learning its run time when it
+        ``succeeded``; releasing twice is a no-op
+        """
+        if admission not in self._running:
+            return
+        self._running.discard(admission)
+        SLOTS_BUSY.dec(priority=admission.priority)
+        if succeeded:
+            self.cost_model.observe(admission.tweets, self._clock() - admission.started)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str = INTERACTIVE,
+        tweets: int = 0,
+        deadline: Optional[float] = None,
+        shed: bool = True,
+    ) -> AsyncIterator[Admission]:
+        """Hold a slot from ``acquire`` for the block; see ``acquire``"""
+        admission = await self.acquire(priority, tweets, deadline, shed)
+        try:
+            yield admission
+        except BaseException:
+            self.release(admission)
+            raise
+        self.release(admission, succeeded=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Slots, running and queued requests and the estimated wait per priority"""
+        now = self._clock()
+        return {
+            "slots": self.slots,
+            "reserved": self.reserved,
+            "running": {
+                priority: sum(1 for a in self._running if a.priority == priority)
+                for priority in PRIORITIES
+            },
+            "queued": {priority: self._queued(rank) for rank, priority in enumerate(PRIORITIES)},
+            "estimated_wait": {
+                priority: round(self._start_estimate(rank, math.inf, now), 1)
+                for rank, priority in enumerate(PRIORITIES)
+            },
+            "seconds_per_tweet": round(self.cost_model.seconds_per_tweet, 3),
+        }
+
+    async def _wait(self, waiter: _Waiter, shed: bool) -> Admission:
+        priority = PRIORITIES[waiter.rank]
+        # Waiting past the latest start that still meets the deadline only holds a tab in vain
+        latest_start = waiter.due - waiter.cost
+        timeout = max(0.0, latest_start - self._clock()) if shed and waiter.due < math.inf else None
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                return waiter.future.result()
+            self._dequeue(waiter)
+            raise self._shed(
+                priority,
+                "deadline",
+                "no slot in time to finish within the deadline",
+                self._start_estimate(waiter.rank, math.inf, self._clock()),
+            ) from None
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.future.result())
+            else:
+                self._dequeue(waiter)
+            raise
+
+    def _dispatch(self):
+        """Start waiters, best first, while slots allow"""
+        while self._waiting:
+            waiter = min(self._waiting, key=lambda w: w.key)
+            if not self._can_start(waiter.rank):
+                return
+            self._waiting.remove(waiter)
+            priority = PRIORITIES[waiter.rank]
+            QUEUE_DEPTH.dec(priority=priority)
+            now = self._clock()
+            QUEUE_WAIT_SECONDS.observe(now - waiter.enqueued, priority=priority)
+            waiter.future.set_result(self._start(waiter.rank, waiter.tweets, waiter.cost, now))
+
+    def _dequeue(self, waiter: _Waiter):
+        if waiter in self._waiting:
+            self._waiting.remove(waiter)
+            QUEUE_DEPTH.dec(priority=PRIORITIES[waiter.rank])
+        waiter.future.cancel()
+
+    def _start(self, rank: int, tweets: int, cost: float, now: float) -> Admission:
+        admission = Admission(PRIORITIES[rank], tweets, cost, now)
+        self._running.add(admission)
+        SLOTS_BUSY.inc(priority=admission.priority)
+        return admission
+
+    def _can_start(self, rank: int) -> bool:
+        return len(self._running) < self.slots - (self.reserved if rank > 0 else 0)
+
+    def _queued(self, rank: int) -> int:
+        return sum(1 for w in self._waiting if w.rank == rank)
+
+    def _start_estimate(self, rank: int, due: float, now: float) -> float:
+        """
+        Seconds until a request of ``rank`` due at ``due`` would start, by
+        playing the running scrapes and the waiters served before it forward
+        on their cost estimates
+        """
+        free = sorted([max(now, a.started + a.cost) for a in self._running])
+        free = [now] * (self.slots - len(free)) + free
+        key = (rank, due, math.inf)
+        for waiter in sorted((w for w in self._waiting if w.key < key), key=lambda w: w.key):
+            start = free.pop(self._slot_index(waiter.rank))
+            insort(free, start + waiter.cost)
+        return free[self._slot_index(rank)] - now
+
+    def _slot_index(self, rank: int) -> int:
+        # A bulk scrape starts once all but the reserved slots are taken at most
+        return self.reserved if rank > 0 else 0
+
+    def _shed(self, priority: str, reason: str, detail: str, wait: float) -> OverloadedError:
+        REQUESTS_SHED.inc(priority=priority, reason=reason)
+        logger.warning(f"Shedding {priority} scrape request: {detail}")
+        return OverloadedError(f"Scraping capacity overloaded: {detail}", retry_after=wait)
+
+
+def _rank(priority: str) -> int:
+    try:
+        return PRIORITIES.index(priority)
+    except ValueError:
+        raise ValueError(f"Unknown priority {priority!r}, expected one of {PRIORITIES}") from None
+
+
+def scrape_capacity(settings: Settings) -> int:
+    """Scheduler slots: ``scheduler_slots``, or one per pooled tab of every pool"""
+    if settings.scheduler_slots > 0:
+        return settings.scheduler_slots
+    tabs = max(1, settings.pool_browsers) * max(1, settings.pool_tabs_per_browser)
+    return tabs * max(1, settings.worker_processes)
+
+
+def default_deadline(settings: Settings, priority: str) -> Optional[float]:
+    """Deadline in seconds for requests of ``priority`` that set none, None for no deadline"""
+    seconds = settings.interactive_deadline if priority == INTERACTIVE else settings.bulk_deadline
+    return float(seconds) if seconds > 0 else None
+
+
+def create_scheduler(settings: Settings) -> ScrapeScheduler:
+    """Scheduler sized to the scraping capacity of ``settings``"""
+    return ScrapeScheduler(
+        scrape_capacity(settings),
+        reserved=settings.scheduler_reserved,
+        max_queue=settings.scheduler_max_queue,
+        cost_model=CostModel(
+            setup_seconds=settings.scrape_setup_seconds,
+            seconds_per_tweet=settings.scrape_ms_per_tweet / 1000,
+        ),
+    )
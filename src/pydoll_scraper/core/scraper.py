@@ -2,31 +2,102 @@ import asyncio
 import json
 import logging
 import os
-from dataclasses import asdict, dataclass
+import textwrap
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 
 from pydoll.browser import Chrome
 from pydoll.browser.options import ChromiumOptions
+from pydoll.browser.tab import Tab
 from pydoll.constants import Key
+from pydoll.exceptions import PageLoadTimeout
+
+from .browser_pool import add_headless_arguments
+from .crawl import TabCrawler
+from .errors import TabFailedError
+from .faults import (
+    CDP_TIMEOUT,
+    COMPLETE,
+    PARTIAL,
+    TAB_RETRIES,
+    TabSource,
+    cdp_call,
+    check_tab,
+    tab_source,
+)
+from .metrics import PARTIAL_RESULTS, TAB_FAILURES, span
+from .page_scripts import evaluate_json, page_snapshot_script
+from .profiles import ProfileManager, launch_browser
+from .resources import ResourcePolicy, ResourceStats, add_lightweight_arguments, blocking_resources
+from .sinks import OutputSink
+from .store import ResultStore
+from .writers import open_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrapedData:
     url: str
     title: str
     content: str
     timestamp: str
     metadata: Dict[str, str]
+    # Texts of every match of each custom selector; None for an invalid selector
+    selected: Dict[str, Optional[List[str]]] = field(default_factory=dict)
+    # "partial" when the page did not finish loading and was read as it was
+    status: str = COMPLETE
+
+
+DEFAULT_SELECTORS = {"title": "title", "content": "body"}
+
+# Seconds of network silence after load that count as settled, and the cap on
+# that wait; the cap matches the fixed sleep of earlier releases
+NETWORK_IDLE_QUIET = 0.5
+NETWORK_IDLE_TIMEOUT = 2.0
+
+# Characters kept per selected text in the snapshot, and in ScrapedData.content
+MAX_SNAPSHOT_TEXT = 20_000
+MAX_CONTENT_LENGTH = 1000
 
 
 class WebScraper:
-    def __init__(self, headless: bool = False, timeout: int = 30):
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 30,
+        resource_policy: Optional[ResourcePolicy] = None,
+        max_results_in_memory: int = 1000,
+        profiles: Optional[ProfileManager] = None,
+        sink: Optional[OutputSink] = None,
+        tabs: Optional[TabSource] = None,
+        cdp_timeout: float = CDP_TIMEOUT,
+        tab_retries: int = TAB_RETRIES,
+    ):
         self.timeout = timeout
-        self.scraped_data: List[ScrapedData] = []
+        # One result per URL, in scrape order; older results spill to disk
+        self.scraped_data: ResultStore[ScrapedData] = ResultStore(
+            ScrapedData, key=lambda page: page.url, max_in_memory=max_results_in_memory
+        )
+
+        # Requests blocked while scraping and the traffic of the last page
+        self.resource_policy = resource_policy or ResourcePolicy()
+        self.resource_stats: Optional[ResourceStats] = None
+
+        # Persistent profiles for launched browsers; throwaway ones when None
+        self.profiles = profiles
+
+        # Output every scraped page is also written to as it arrives
+        self.sink = sink
+
+        # Where pages without a tab are scraped, e.g. BrowserPool.lease; a page
+        # whose tab crashes or hangs is retried in up to tab_retries fresh tabs
+        self.tabs = tabs
+        self.cdp_timeout = cdp_timeout
+        self.tab_retries = tab_retries
 
         # Setup Chrome options - create fresh each time to avoid conflicts
         self._headless = headless
@@ -37,130 +108,223 @@ class WebScraper:
         options = ChromiumOptions()
 
         options.add_argument("--no-sandbox")
+        add_lightweight_arguments(options, self.resource_policy)
 
         # Set Chrome binary path (for Docker)
         if os.path.exists(self._chrome_bin):
             options.binary_location = self._chrome_bin
 
+        if self._headless:
+            add_headless_arguments(options)
+
         return options
 
-    async def scrape_url(self, url: str, selectors: Dict[str, str] = None) -> Optional[ScrapedData]:
+    def _launch(self):
+        """Launch a dedicated Chrome on one of ``profiles``, yielding it and its first tab"""
+        return launch_browser(self._create_chrome_options(), self.profiles, operation="web")
+
+    async def scrape_url(
+        self, url: str, selectors: Dict[str, str] = None, tab: Optional[Tab] = None
+    ) -> Optional[ScrapedData]:
         """
         Scrape a single URL using PyDoll
 
+        Waits for the page to load and its network to go idle, then reads it
+        in a single snapshot. A page that does not finish loading within
+        ``timeout`` is read as it is, with the ``"partial"`` status; one whose
+        tab crashes or hangs is scraped again in a fresh tab.
+
         Args:
             url: URL to scrape
-            selectors: Dictionary of CSS selectors for specific elements
+            selectors: Dictionary of CSS selectors for specific elements. The
+                ``"title"`` and ``"content"`` entries override where the title and
+                content are read from; the texts of every other selector are
+                returned in ``ScrapedData.selected``
+            tab: Already open tab to scrape in (e.g. leased from a ``BrowserPool``);
+                one of ``tabs`` or a dedicated Chrome is used when omitted
 
         Returns:
             ScrapedData object or None if scraping fails
         """
-        if selectors is None:
-            selectors = {"title": "title", "content": "body"}
+        selectors = {**DEFAULT_SELECTORS, **(selectors or {})}
 
         try:
-            async with Chrome(options=self._create_chrome_options()) as browser:
-                tab = await browser.start(headless=self._headless)
-                logger.info(f"Navigating to {url}")
-
-                await tab.go_to(url)
-                await asyncio.sleep(2)  # Wait for page to load
-
-                # Extract title
-                try:
-                    title = await tab.get_title()
-                except:
-                    try:
-                        title_element = await tab.find(tag_name="title")
-                        title = (
-                            await title_element.get_text() if title_element else "No title found"
-                        )
-                    except:
-                        title = "No title found"
-
-                # Extract content
-                try:
-                    content_element = await tab.find(tag_name="body")
-                    content = (
-                        await content_element.get_text() if content_element else "No content found"
-                    )
-                except:
-                    content = "No content found"
-
-                # Extract metadata
-                metadata = {}
-                try:
-                    # Get page description
-                    desc_elements = await tab.select_all("meta")
-                    for elem in desc_elements:
-                        name_attr = await elem.get_attribute("name")
-                        if name_attr == "description":
-                            content_attr = await elem.get_attribute("content")
-                            if content_attr:
-                                metadata["description"] = content_attr
-                        elif name_attr == "keywords":
-                            content_attr = await elem.get_attribute("content")
-                            if content_attr:
-                                metadata["keywords"] = content_attr
-                except:
-                    pass
-
-                scraped_data = ScrapedData(
-                    url=url,
-                    title=title.strip(),
-                    content=content.strip()[:1000],  # Limit content length
-                    timestamp=datetime.now().isoformat(),
-                    metadata=metadata,
-                )
-
-                self.scraped_data.append(scraped_data)
-                logger.info(f"Successfully scraped {url}")
-                return scraped_data
+            async with tab_source(tab, self.tabs, self._launch, self.tab_retries) as (
+                tabs,
+                retries,
+            ):
+                return await self._scrape_resuming(tabs, retries, url, selectors)
 
         except Exception as e:
             logger.error(f"Error scraping {url}: {str(e)}")
             return None
 
+    async def _scrape_resuming(
+        self, tabs: TabSource, retries: int, url: str, selectors: Dict[str, str]
+    ) -> ScrapedData:
+        """``_scrape_page`` in a tab of ``tabs``, again in a fresh one while tabs fail"""
+        attempt = 0
+        while True:
+            try:
+                async with tabs() as attempt_tab:
+                    return await self._scrape_page(attempt_tab, url, selectors)
+            except TabFailedError as e:
+                TAB_FAILURES.inc(operation="web", reason=e.reason)
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                logger.warning(f"{e}; retrying {url} in a fresh tab")
+
+    async def _scrape_page(self, tab: Tab, url: str, selectors: Dict[str, str]) -> ScrapedData:
+        """
+        Navigate ``tab`` to ``url`` and extract its data from one snapshot
+
+        Raises:
+            TabFailedError: If the tab crashed or a DevTools call on it hung
+        """
+        logger.info(f"Navigating to {url}")
+
+        script = page_snapshot_script(
+            selectors, NETWORK_IDLE_QUIET, NETWORK_IDLE_TIMEOUT, MAX_SNAPSHOT_TEXT
+        )
+        status = COMPLETE
+        async with blocking_resources(tab, self.resource_policy) as self.resource_stats:
+            try:
+                with span("web", "go_to"):
+                    await cdp_call(
+                        tab.go_to(url, timeout=self.timeout),
+                        "go_to",
+                        self.timeout + self.cdp_timeout,
+                    )
+            except PageLoadTimeout:
+                logger.warning(f"{url} did not load within {self.timeout}s, reading it as it is")
+                status = PARTIAL
+                PARTIAL_RESULTS.inc(operation="web")
+            except Exception as e:
+                await check_tab(tab, e, "go_to")
+                raise
+            try:
+                with span("web", "snapshot"):
+                    snapshot = await cdp_call(
+                        evaluate_json(tab, script, await_promise=True),
+                        "snapshot",
+                        NETWORK_IDLE_TIMEOUT + self.cdp_timeout,
+                    )
+            except Exception as e:
+                await check_tab(tab, e, "snapshot")
+                raise
+
+        scraped_data = self._from_snapshot(url, snapshot, status)
+        self.scraped_data.add(scraped_data)
+        if self.sink is not None:
+            await self.sink.write(scraped_data)
+        logger.info(f"Successfully scraped {url} (settled in {snapshot['waited_ms']:.0f}ms)")
+        return scraped_data
+
+    @staticmethod
+    def _from_snapshot(url: str, snapshot: Dict[str, Any], status: str = COMPLETE) -> ScrapedData:
+        """Build the result from a page snapshot"""
+        selected = dict(snapshot["selected"])
+        titles = selected.pop("title", None)
+        contents = selected.pop("content", None)
+        title = (titles[0] if titles else None) or snapshot["title"] or "No title found"
+        content = (contents[0] if contents else None) or "No content found"
+
+        return ScrapedData(
+            url=url,
+            title=title.strip(),
+            content=content.strip()[:MAX_CONTENT_LENGTH],
+            timestamp=datetime.now().isoformat(),
+            metadata=snapshot["meta"],
+            selected=selected,
+            status=status,
+        )
+
     async def scrape_multiple_urls(
-        self, urls: List[str], selectors: Dict[str, str] = None
+        self, urls: List[str], selectors: Dict[str, str] = None, max_concurrency: int = 5
     ) -> List[ScrapedData]:
         """
         Scrape multiple URLs concurrently
 
+        All URLs are scraped in tabs of a single Chrome, with at most
+        ``max_concurrency`` tabs open at once. Tabs are reused from page to
+        page; a page not loaded within ``timeout`` seconds is read as it is,
+        and one whose tab crashes or hangs is retried in a fresh tab.
+
         Args:
             urls: List of URLs to scrape
             selectors: Dictionary of CSS selectors for specific elements
+            max_concurrency: Maximum number of pages loading at the same time
 
         Returns:
             List of ScrapedData objects
         """
-        tasks = [self.scrape_url(url, selectors) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if not urls:
+            return []
+
+        try:
+            async with self._launch() as (browser, tab):
+                return await self._crawl(browser, tab, urls, selectors, max_concurrency)
+
+        except Exception as e:
+            logger.error(f"Error in concurrent scraping: {str(e)}")
+            return []
+
+    async def _crawl(
+        self,
+        browser: Chrome,
+        first_tab: Tab,
+        urls: List[str],
+        selectors: Optional[Dict[str, str]],
+        max_concurrency: int,
+    ) -> List[ScrapedData]:
+        """Scrape ``urls`` in parallel over reused tabs of the running ``browser``"""
+
+        selectors = {**DEFAULT_SELECTORS, **(selectors or {})}
+
+        async def scrape_in_tab(tab: Tab, url: str) -> ScrapedData:
+            return await self._scrape_page(tab, url, selectors)
+
+        # Every DevTools call has its own deadline; this one only bounds the whole page
+        page_timeout = self.timeout + NETWORK_IDLE_TIMEOUT + 2 * self.cdp_timeout
+        async with TabCrawler(
+            browser,
+            tabs=max_concurrency,
+            page_timeout=page_timeout,
+            first_tab=first_tab,
+            tab_retries=self.tab_retries,
+        ) as crawler:
+            results = await crawler.map(scrape_in_tab, urls)
 
         successful_results = []
         for result in results:
             if isinstance(result, ScrapedData):
                 successful_results.append(result)
-            elif isinstance(result, Exception):
+            elif isinstance(result, BaseException):
                 logger.error(f"Error in concurrent scraping: {str(result)}")
 
         return successful_results
 
-    async def search_and_scrape(self, query: str, max_results: int = 5) -> List[ScrapedData]:
+    async def search_and_scrape(
+        self, query: str, max_results: int = 5, max_concurrency: int = 5
+    ) -> List[ScrapedData]:
         """
         Search Google and scrape the first few results
 
+        Result pages are loaded in parallel in tabs of the search browser,
+        the search tab included.
+
         Args:
             query: Search query
             max_results: Maximum number of results to scrape
+            max_concurrency: Maximum number of result pages loading at the same time
 
         Returns:
             List of ScrapedData objects
         """
         try:
-            async with Chrome(options=self._create_chrome_options()) as browser:
+            async with self._launch() as (browser, tab):
                 logger.debug(f"Display: {os.getenv('DISPLAY')}")
-                tab = await browser.start()
                 logger.info(f"Searching for: {query}")
 
                 # Go to Google
@@ -201,29 +365,35 @@ class WebScraper:
 
                     logger.info(f"Found {len(urls)} URLs to scrape")
 
-                    # Scrape each URL
-                    scraped_results = []
-                    for url in urls:
-                        result = await self.scrape_url(url)
-                        if result:
-                            scraped_results.append(result)
-
-                    return scraped_results
+                    if not urls:
+                        return []
+                    return await self._crawl(browser, tab, urls, None, max_concurrency)
 
         except Exception as e:
             logger.error(f"Error in search and scrape: {str(e)}")
             return []
 
     def save_to_json(self, filename: str = "scraped_data.json"):
-        """Save scraped data to JSON file"""
+        """Save scraped data to JSON file, one item at a time"""
         try:
-            data = [asdict(item) for item in self.scraped_data]
             with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.write("[")
+                for index, item in enumerate(self.scraped_data):
+                    item_json = json.dumps(asdict(item), indent=2, ensure_ascii=False)
+                    f.write(",\n" if index else "\n")
+                    f.write(textwrap.indent(item_json, "  "))
+                f.write("\n]" if self.scraped_data else "]")
             logger.info(f"Data saved to {filename}")
         except Exception as e:
             logger.error(f"Error saving data: {str(e)}")
 
+    def save_results(self, path: Union[str, Path], format: Optional[str] = None) -> int:
+        """Stream scraped data to a JSONL or msgpack file and return how many were written"""
+        with open_writer(path, format) as writer:
+            count = self.scraped_data.write_to(writer)
+        logger.info(f"Saved {count} result(s) to {path}")
+        return count
+
     def get_scraped_data(self) -> List[Dict]:
         """Return scraped data as list of dictionaries"""
         return [asdict(item) for item in self.scraped_data]
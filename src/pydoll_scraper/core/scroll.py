@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from pydoll.browser.tab import Tab
+
+from .metrics import SCROLL_STEPS, span
+from .page_scripts import evaluate_json
+
+logger = logging.getLogger(__name__)
+
+# Scrolls by a step sized from the measured article height, then resolves once
+# new articles have been added and both the DOM and the network have been quiet
+# for ``quietMs``, or once ``timeoutMs`` passes. Virtualized timelines recycle
+# nodes, so added articles are counted from mutation records rather than from
+# the number of articles in the document.
+SCROLL_AND_WAIT_SCRIPT = """
+new Promise((resolve) => {
+    const opts = %s;
+    const started = performance.now();
+    const articles = Array.from(document.querySelectorAll('article'));
+    const heights = articles.map((a) => a.getBoundingClientRect().height).filter((h) => h > 0);
+    const articleHeight = heights.length
+        ? heights.reduce((sum, h) => sum + h, 0) / heights.length
+        : 0;
+    const step = articleHeight
+        ? Math.round(articleHeight * opts.articlesPerStep)
+        : opts.defaultStep;
+
+    let added = 0;
+    let lastActivity = performance.now();
+    const observer = new MutationObserver((records) => {
+        lastActivity = performance.now();
+        for (const record of records) {
+            for (const node of record.addedNodes) {
+                if (node.nodeType !== 1) continue;
+                if (node.matches('article')) added += 1;
+                else added += node.querySelectorAll('article').length;
+            }
+        }
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+
+    let network = null;
+    if (window.PerformanceObserver) {
+        network = new PerformanceObserver(() => { lastActivity = performance.now(); });
+        try { network.observe({type: 'resource', buffered: false}); } catch (e) { network = null; }
+    }
+
+    window.scrollBy(0, step);
+
+    const finish = () => {
+        observer.disconnect();
+        if (network) network.disconnect();
+        resolve(JSON.stringify({
+            added: added,
+            step: step,
+            article_height: articleHeight,
+            waited_ms: performance.now() - started,
+            at_bottom: window.innerHeight + window.scrollY >= document.body.scrollHeight - 2,
+        }));
+    };
+    const poll = () => {
+        const now = performance.now();
+        if (now - started >= opts.timeoutMs) return finish();
+        if (added > 0 && now - lastActivity >= opts.quietMs) return finish();
+        setTimeout(poll, Math.min(opts.quietMs, 50));
+    };
+    setTimeout(poll, Math.min(opts.quietMs, 50));
+})
+"""
+
+
+@dataclass
+class ScrollConfig:
+    """
+    Tuning for ``ScrollScheduler``
+
+    Attributes:
+        articles_per_step: Scroll distance in measured article heights
+        default_step: Scroll distance in pixels before any article has been measured
+        settle_timeout: Initial seconds to wait for new articles after a scroll
+        max_settle_timeout: Upper bound for the backed-off settle timeout
+        backoff_factor: Settle timeout multiplier after each step without new tweets
+        quiet_period: Seconds of DOM and network silence that count as settled
+        max_idle_steps: Consecutive steps without new tweets before giving up
+        max_steps: Hard cap on scroll steps per scrape
+        adaptive: ``False`` reproduces the fixed scroll and sleep of earlier releases
+    """
+
+    articles_per_step: float = 4.0
+    default_step: int = 1000
+    settle_timeout: float = 1.5
+    max_settle_timeout: float = 8.0
+    backoff_factor: float = 2.0
+    quiet_period: float = 0.15
+    max_idle_steps: int = 4
+    max_steps: int = 100
+    adaptive: bool = True
+
+    @classmethod
+    def legacy(cls) -> "ScrollConfig":
+        """Fixed 1000px steps, a 2 second sleep and no retry on an empty step"""
+        return cls(
+            default_step=1000,
+            settle_timeout=2.0,
+            max_settle_timeout=2.0,
+            backoff_factor=1.0,
+            max_idle_steps=1,
+            max_steps=20,
+            adaptive=False,
+        )
+
+
+class ScrollScheduler:
+    """
+    Decides when and how far to scroll a timeline, and when to give up.
+
+    Callers report how many new tweets each extraction produced through
+    ``should_continue`` and then call ``scroll``. Steps without new tweets
+    lengthen the next settle timeout before the scheduler gives up, so a
+    momentary network stall does not end the scrape.
+    """
+
+    def __init__(self, tab: Tab, config: Optional[ScrollConfig] = None):
+        self.tab = tab
+        self.config = config or ScrollConfig()
+        self.steps = 0
+        self.idle_steps = 0
+        self.settle_timeout = self.config.settle_timeout
+
+    def should_continue(self, new_items: int) -> bool:
+        """Record the latest extraction and decide whether another scroll is worthwhile"""
+        if new_items > 0:
+            self.idle_steps = 0
+            self.settle_timeout = self.config.settle_timeout
+        else:
+            self.idle_steps += 1
+            self.settle_timeout = min(
+                self.settle_timeout * self.config.backoff_factor, self.config.max_settle_timeout
+            )
+
+        if self.idle_steps >= self.config.max_idle_steps:
+            logger.info(f"No new tweets after {self.idle_steps} scroll(s), stopping scroll")
+            return False
+        if self.steps >= self.config.max_steps:
+            logger.info(f"Reached the limit of {self.config.max_steps} scroll steps")
+            return False
+        return True
+
+    async def scroll(self):
+        """Scroll one step and wait for the timeline to settle"""
+        self.steps += 1
+        SCROLL_STEPS.inc()
+        with span("xcom", "scroll"):
+            await self._scroll()
+
+    async def _scroll(self):
+        start = time.perf_counter()
+
+        if not self.config.adaptive:
+            await self.tab.execute_script(f"window.scrollBy(0, {self.config.default_step})")
+            await asyncio.sleep(self.settle_timeout)
+            logger.info(f"Scroll step {self.steps}: {self.config.default_step}px, fixed wait")
+            return
+
+        options = {
+            "articlesPerStep": self.config.articles_per_step,
+            "defaultStep": self.config.default_step,
+            "timeoutMs": int(self.settle_timeout * 1000),
+            "quietMs": int(self.config.quiet_period * 1000),
+        }
+        result = await evaluate_json(
+            self.tab, SCROLL_AND_WAIT_SCRIPT % json.dumps(options), await_promise=True
+        )
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Scroll step {self.steps}: {result['step']}px, {result['added']} article(s) added, "
+            f"settled in {result['waited_ms']:.0f}ms ({elapsed * 1000:.0f}ms round trip, "
+            f"timeout {self.settle_timeout:.1f}s)"
+        )
@@ -0,0 +1,160 @@
+"""
+Asynchronous output sinks.
+
+An ``OutputSink`` takes records from scrapes as they arrive and hands them to
+a ``RecordWriter`` in batches, in a worker thread, so serializing and
+writing to disk never holds up the event loop that drives the browsers.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Union
+
+from ..config import Settings
+from .writers import RecordWriter, open_writer
+
+logger = logging.getLogger(__name__)
+
+
+class OutputSink:
+    """
+    Batched, append-only writes to ``writer`` off the event loop
+
+    ``write`` only buffers a record. A background task writes the buffer
+    once it holds ``batch_size`` records or ``flush_interval`` seconds after
+    the last write, then flushes the writer, so every batch is durable.
+    Writers fall behind gracefully: once ``max_pending`` records are
+    buffered, ``write`` waits for the batch in progress.
+    """
+
+    def __init__(
+        self,
+        writer: RecordWriter,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: Optional[int] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending or batch_size * 4
+        self._buffer: List[Any] = []
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._closing = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def count(self) -> int:
+        """Records written so far"""
+        return self.writer.count
+
+    async def __aenter__(self) -> "OutputSink":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        """Start writing in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, record: Any):
+        """
+        Queue ``record`` for writing
+
+        Raises:
+            Exception: The error of a failed earlier batch, once
+        """
+        self._raise_error()
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        if len(self._buffer) >= self.max_pending:
+            await self._drain()
+
+    async def write_all(self, records: Iterable[Any]):
+        for record in records:
+            await self.write(record)
+
+    async def flush(self):
+        """Write and flush every record queued so far"""
+        await self._drain()
+        self._raise_error()
+
+    async def close(self):
+        """Write the remaining records and close the writer"""
+        if self._task is not None:
+            # Let the running batch finish rather than cancel it mid-write
+            self._closing = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        try:
+            await self._drain()
+        finally:
+            await asyncio.to_thread(self.writer.close)
+        self._raise_error()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._drain()
+
+    async def _drain(self):
+        async with self._lock:
+            while self._buffer:
+                batch, self._buffer = self._buffer, []
+                try:
+                    await asyncio.to_thread(self._write_batch, batch)
+                except Exception as e:
+                    logger.error(
+                        f"Could not write {len(batch)} record(s) to {self.writer.path}: {e}"
+                    )
+                    self._error = e
+
+    def _write_batch(self, batch: List[Any]):
+        self.writer.write_all(batch)
+        self.writer.flush()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+def open_sink(
+    path: Union[str, Path],
+    format: Optional[str] = None,
+    append: bool = True,
+    rotate_bytes: Optional[int] = None,
+    batch_size: int = 500,
+    flush_interval: float = 1.0,
+) -> OutputSink:
+    """Sink writing to ``path`` through ``open_writer``; start it before writing"""
+    writer = open_writer(path, format, append=append, rotate_bytes=rotate_bytes)
+    return OutputSink(writer, batch_size=batch_size, flush_interval=flush_interval)
+
+
+def create_output_sink(settings: Settings) -> Optional[OutputSink]:
+    """Sink configured by the settings, or None when no output path is set"""
+    if not settings.output_path:
+        return None
+    return open_sink(
+        settings.output_path,
+        settings.output_format,
+        rotate_bytes=settings.output_rotate_bytes or None,
+        batch_size=settings.output_batch_size,
+        flush_interval=settings.output_flush_interval,
+    )
@@ -0,0 +1,140 @@
+"""
+Ordered, deduplicated result storage with a bounded memory footprint.
+
+Long-lived scrapers and long backfills used to keep every result in a plain
+list. ``ResultStore`` keeps results in the order they were first seen, drops
+repeats by key (the numeric status ID for tweets, the URL for pages) and
+spills the oldest records to a temporary JSONL file once more than
+``max_in_memory`` are held, so memory stays flat however many are added.
+"""
+
+import itertools
+import json
+import os
+import tempfile
+import weakref
+from collections import deque
+from dataclasses import asdict
+from typing import (
+    Callable,
+    Deque,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+)
+
+from .writers import RecordWriter
+
+R = TypeVar("R")
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ResultStore(Generic[R]):
+    """
+    Dataclass records in first-seen order, unique by ``key(record)``
+
+    Only the keys of spilled records stay in memory, so dedupe still covers
+    them. Spilled records are read back, in order, when iterating.
+    """
+
+    def __init__(
+        self,
+        record_type: Type[R],
+        key: Callable[[R], Hashable],
+        max_in_memory: int = 1000,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            record_type: Dataclass of the records, used to read spilled ones back
+            key: Identity of a record; later records with a seen key are dropped
+            max_in_memory: Records held in memory before the oldest are spilled
+            spill_dir: Directory of the spill file, the system temp dir by default
+        """
+        if max_in_memory < 1:
+            raise ValueError("max_in_memory must be at least 1")
+
+        self.record_type = record_type
+        self.key = key
+        self.max_in_memory = max_in_memory
+        self.spill_dir = spill_dir
+        self._keys: Set[Hashable] = set()
+        self._memory: Deque[R] = deque()
+        self._spilled = 0
+        self._spill_file = None
+        self._spill_path: Optional[str] = None
+        self._finalizer = None
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._memory)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._keys
+
+    @property
+    def spilled(self) -> int:
+        """Number of records currently on disk"""
+        return self._spilled
+
+    def add(self, record: R) -> bool:
+        """Append ``record`` unless its key was seen before; returns whether it was added"""
+        key = self.key(record)
+        if key in self._keys:
+            return False
+
+        self._keys.add(key)
+        self._memory.append(record)
+        if len(self._memory) > self.max_in_memory:
+            self._spill(self._memory.popleft())
+        return True
+
+    def extend(self, records: Iterable[R]) -> int:
+        """Add every record and return how many were new"""
+        return sum(1 for record in records if self.add(record))
+
+    def __iter__(self) -> Iterator[R]:
+        spilled = self._spilled
+        if spilled:
+            self._spill_file.flush()
+            with open(self._spill_path, encoding="utf-8") as spill:
+                for line in itertools.islice(spill, spilled):
+                    yield self.record_type(**json.loads(line))
+        yield from list(self._memory)
+
+    def write_to(self, writer: RecordWriter) -> int:
+        """Stream every record to ``writer`` in order and return how many were written"""
+        return writer.write_all(self)
+
+    def clear(self):
+        """Forget all records and keys and remove the spill file"""
+        self._keys.clear()
+        self._memory.clear()
+        self._spilled = 0
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._finalizer()
+            self._spill_file = self._spill_path = self._finalizer = None
+
+    close = clear
+
+    def _spill(self, record: R):
+        if self._spill_file is None:
+            fd, self._spill_path = tempfile.mkstemp(
+                prefix="pydoll-results-", suffix=".jsonl", dir=self.spill_dir
+            )
+            self._spill_file = os.fdopen(fd, "w", encoding="utf-8")
+            self._finalizer = weakref.finalize(self, _remove, self._spill_path)
+
+        self._spill_file.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+        self._spilled += 1
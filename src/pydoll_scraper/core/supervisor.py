@@ -0,0 +1,489 @@
+"""
+Scrape worker processes.
+
+One asyncio loop handles the CDP traffic of every live tab, so a busy API
+process runs out of Python long before it runs out of cores. A
+``ProcessSupervisor`` spawns worker processes, each with its own event loop,
+browser pool, cursor store, rate limiter and result cache, and hands them
+tasks over multiprocessing queues; the API process only routes. With the
+in-memory rate limit backend each worker gets an equal share of the per-host
+rate, so together they stay within it; the Redis backend shares one budget.
+
+Each worker takes scrapes from its own request queue and answers on a queue
+shared by all workers, with plain tuples::
+
+    ("run", task_id, kind, payload, stream) | ("cancel", task_id) | None
+    (message, worker_id, task_id, data)
+
+where the answer is one of ``ready``, ``heartbeat``, ``item``, ``result`` or
+``error``. A ``result`` carries ``(result, timings)``, the stage timings of
+the scrape, which are added to the caller's ``collect_timings`` block.
+
+Workers send a heartbeat every ``heartbeat_interval`` seconds from their
+event loop, so one whose loop is stuck stops sending them too. A worker that
+dies, or sends nothing for ``heartbeat_timeout`` seconds, is killed and
+replaced; its outstanding scrapes fail with ``WorkerCrashedError``.
+
+Metrics are collected per process, so ``/metrics`` of the API only covers the
+supervisor itself, not the scrapes in the workers.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from ..config import Settings
+from .browser_pool import BrowserPool
+from .cache import create_scrape_cache
+from .cursor import create_cursor_store
+from .errors import WorkerCrashedError, error_from_kind, error_kind
+from .metrics import WORKER_PROCESSES_READY, WORKER_RESTARTS, collect_timings, merge_timings
+from .ratelimit import create_rate_limiter
+from .resources import ResourcePolicy
+from .tasks import iter_task, run_task
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 1.0
+STOP_TIMEOUT = 30.0
+
+TaskRunner = Callable[..., Any]
+
+
+def _worker_main(
+    worker_id: int,
+    settings: Settings,
+    processes: int,
+    requests: Any,
+    responses: Any,
+    heartbeat_interval: float,
+    task_runner: TaskRunner,
+    stream_runner: TaskRunner,
+):
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(
+            _serve(
+                worker_id,
+                settings,
+                processes,
+                requests,
+                responses,
+                heartbeat_interval,
+                task_runner,
+                stream_runner,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve(
+    worker_id: int,
+    settings: Settings,
+    processes: int,
+    requests: Any,
+    responses: Any,
+    heartbeat_interval: float,
+    task_runner: TaskRunner,
+    stream_runner: TaskRunner,
+):
+    """Run the scrapes sent on ``requests`` until told to stop or orphaned"""
+
+    def send(message: str, task_id: Optional[int] = None, data: Any = None):
+        responses.put((message, worker_id, task_id, data))
+
+    async def heartbeat():
+        while True:
+            send("heartbeat")
+            await asyncio.sleep(heartbeat_interval)
+
+    # Beat from the start, since launching the pool's browsers takes a while
+    beating = asyncio.create_task(heartbeat())
+    pool = BrowserPool.from_settings(settings) if settings.pool_browsers > 0 else None
+    cursor_store = create_cursor_store(settings)
+    rate_limiter = create_rate_limiter(settings, processes)
+    resource_policy = ResourcePolicy.from_settings(settings)
+    cache = create_scrape_cache(settings)
+    context = (pool, cursor_store, resource_policy, rate_limiter)
+    running: Dict[int, "asyncio.Task[None]"] = {}
+
+    async def run(task_id: int, kind: str, payload: Dict[str, Any], stream: bool):
+        try:
+            with collect_timings() as timings:
+                if stream:
+                    async for item in stream_runner(kind, payload, *context):
+                        send("item", task_id, item)
+                    result = None
+                else:
+                    result = await task_runner(kind, payload, *context, cache=cache)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            send("error", task_id, (error_kind(e), str(e), getattr(e, "retry_after", None)))
+        else:
+            send("result", task_id, (result, timings.to_dict()))
+        finally:
+            running.pop(task_id, None)
+
+    parent = multiprocessing.parent_process()
+    try:
+        if pool is not None:
+            await pool.start()
+        send("ready", data=os.getpid())
+
+        while True:
+            try:
+                request = await asyncio.to_thread(requests.get, True, heartbeat_interval)
+            except queue.Empty:
+                if parent is not None and not parent.is_alive():
+                    logger.warning("Supervisor is gone, stopping")
+                    break
+                continue
+            if request is None:
+                break
+            if request[0] == "cancel":
+                task = running.get(request[1])
+                if task is not None:
+                    task.cancel()
+                continue
+            _, task_id, kind, payload, stream = request
+            running[task_id] = asyncio.create_task(run(task_id, kind, payload, stream))
+
+        if running:
+            await asyncio.gather(*running.values(), return_exceptions=True)
+    finally:
+        beating.cancel()
+        if pool is not None:
+            await pool.close()
+        await cursor_store.close()
+        await rate_limiter.close()
+        if cache is not None:
+            await cache.close()
+
+
+@dataclass
+class _Worker:
+    """One worker process and the scrapes it has not answered yet"""
+
+    index: int
+    worker_id: int
+    process: BaseProcess
+    requests: Any
+    started_at: float
+    last_seen: float
+    ready: bool = False
+    pid: Optional[int] = None
+    tasks: Set[int] = field(default_factory=set)
+
+
+class ProcessSupervisor:
+    """
+    Spawns ``processes`` scrape workers and routes tasks to the least busy one
+
+    Workers are started with the ``spawn`` method, so each begins with a fresh
+    interpreter rather than a copy of the API process and its event loop.
+    ``task_runner`` and ``stream_runner`` run in the workers and must be
+    importable module-level functions with the signature of ``run_task``.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        processes: int = 2,
+        heartbeat_timeout: float = 30.0,
+        start_timeout: float = 120.0,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        task_runner: TaskRunner = run_task,
+        stream_runner: TaskRunner = iter_task,
+    ):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        if heartbeat_timeout <= heartbeat_interval:
+            raise ValueError("heartbeat_timeout must be longer than heartbeat_interval")
+
+        self.settings = settings
+        self.processes = processes
+        self.heartbeat_timeout = heartbeat_timeout
+        self.start_timeout = start_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.task_runner = task_runner
+        self.stream_runner = stream_runner
+        self.restarts = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._responses: Any = None
+        self._workers: List[_Worker] = []
+        self._by_id: Dict[int, _Worker] = {}
+        self._ids = itertools.count()
+        self._task_ids = itertools.count()
+        self._pending: Dict[int, "asyncio.Queue[Tuple[str, Any]]"] = {}
+        self._any_ready: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._monitor: Optional["asyncio.Task[None]"] = None
+        self._stopping = threading.Event()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ProcessSupervisor":
+        return cls(
+            settings,
+            processes=settings.worker_processes,
+            heartbeat_timeout=settings.worker_heartbeat_timeout,
+            start_timeout=settings.worker_start_timeout,
+        )
+
+    async def __aenter__(self) -> "ProcessSupervisor":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """
+        Spawn the workers and wait until every one is ready
+
+        Raises:
+            RuntimeError: If the workers are not ready within ``start_timeout``
+        """
+        self._loop = asyncio.get_running_loop()
+        self._any_ready = asyncio.Event()
+        self._stopping.clear()
+        self._responses = self._context.Queue()
+        self._reader = threading.Thread(
+            target=self._read_responses, name="supervisor-responses", daemon=True
+        )
+        self._reader.start()
+        self._workers = [self._spawn(index) for index in range(self.processes)]
+
+        deadline = time.monotonic() + self.start_timeout
+        while not all(worker.ready for worker in self._workers):
+            if time.monotonic() >= deadline:
+                await self.close()
+                raise RuntimeError(
+                    f"Worker processes did not start within {self.start_timeout} seconds"
+                )
+            await asyncio.sleep(0.05)
+
+        self._monitor = asyncio.create_task(self._watch())
+        logger.info(f"Started {self.processes} worker process(es)")
+
+    async def close(self):
+        """Stop the workers once their running scrapes finish"""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+        for worker in self._workers:
+            if worker.process.is_alive():
+                worker.requests.put(None)
+        for worker in self._workers:
+            await self._stop_process(worker, STOP_TIMEOUT)
+            self._fail_tasks(worker, "Worker process stopped")
+        self._workers = []
+        self._by_id.clear()
+        WORKER_PROCESSES_READY.set(0)
+
+        self._stopping.set()
+        if self._reader is not None:
+            await asyncio.to_thread(self._reader.join)
+            self._reader = None
+        if self._responses is not None:
+            self._responses.close()
+            self._responses = None
+
+    async def run_task(self, kind: str, payload: Dict[str, Any]) -> Any:
+        """
+        Run ``run_task(kind, payload)`` in a worker process and return its result
+
+        Raises:
+            ScrapeError: With the type the worker raised, or
+                ``WorkerCrashedError`` if the worker died running it
+        """
+        async with aclosing(self._submit(kind, payload, stream=False)) as answers:
+            async for message, data in answers:
+                if message == "result":
+                    return data
+
+    async def iter_task(self, kind: str, payload: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Yield the items of ``iter_task(kind, payload)`` as a worker process scrapes them"""
+        async with aclosing(self._submit(kind, payload, stream=True)) as answers:
+            async for message, data in answers:
+                if message == "item":
+                    yield data
+
+    def health(self) -> Dict[str, Any]:
+        """Liveness of each worker, for health checks"""
+        now = time.monotonic()
+        workers = [
+            {
+                "index": worker.index,
+                "pid": worker.pid,
+                "alive": worker.process.is_alive(),
+                "ready": worker.ready,
+                "tasks": len(worker.tasks),
+                "last_heartbeat_seconds": round(now - worker.last_seen, 3),
+            }
+            for worker in self._workers
+        ]
+        return {
+            "processes": self.processes,
+            "ready": sum(1 for worker in workers if worker["ready"]),
+            "restarts": self.restarts,
+            "workers": workers,
+        }
+
+    async def _submit(
+        self, kind: str, payload: Dict[str, Any], stream: bool
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Send a task to the least busy ready worker and yield its answers"""
+        worker = await self._choose_worker()
+        task_id = next(self._task_ids)
+        answers: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+        self._pending[task_id] = answers
+        worker.tasks.add(task_id)
+        worker.requests.put(("run", task_id, kind, payload, stream))
+
+        finished = False
+        try:
+            while True:
+                message, data = await answers.get()
+                if message == "error":
+                    finished = True
+                    raise error_from_kind(*data)
+                if message == "result":
+                    finished = True
+                    data, timings = data
+                    merge_timings(timings)
+                yield message, data
+                if finished:
+                    return
+        finally:
+            if self._pending.pop(task_id, None) is not None and not finished:
+                # The caller gave up, e.g. a client disconnected mid-stream
+                worker.tasks.discard(task_id)
+                if worker.process.is_alive():
+                    worker.requests.put(("cancel", task_id))
+
+    async def _choose_worker(self) -> _Worker:
+        while True:
+            ready = [worker for worker in self._workers if worker.ready]
+            if ready:
+                return min(ready, key=lambda worker: len(worker.tasks))
+            if self._any_ready is None:
+                raise RuntimeError("Supervisor is not started")
+            self._any_ready.clear()
+            await self._any_ready.wait()
+
+    def _spawn(self, index: int) -> _Worker:
+        worker_id = next(self._ids)
+        requests = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                worker_id,
+                self.settings,
+                self.processes,
+                requests,
+                self._responses,
+                self.heartbeat_interval,
+                self.task_runner,
+                self.stream_runner,
+            ),
+            name=f"scrape-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        now = time.monotonic()
+        worker = _Worker(index, worker_id, process, requests, started_at=now, last_seen=now)
+        self._by_id[worker_id] = worker
+        return worker
+
+    def _read_responses(self):
+        """Hand worker answers to the event loop; runs in its own thread"""
+        while not self._stopping.is_set():
+            try:
+                response = self._responses.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._dispatch, response)
+
+    def _dispatch(self, response: Tuple[str, int, Optional[int], Any]):
+        message, worker_id, task_id, data = response
+        worker = self._by_id.get(worker_id)
+        if worker is None:
+            # A replaced worker's last words
+            return
+        worker.last_seen = time.monotonic()
+
+        if message == "ready":
+            worker.ready = True
+            worker.pid = data
+            self._any_ready.set()
+            self._update_ready()
+        elif message in ("item", "result", "error"):
+            answers = self._pending.get(task_id)
+            if message != "item":
+                worker.tasks.discard(task_id)
+                self._pending.pop(task_id, None)
+            if answers is not None:
+                answers.put_nowait((message, data))
+
+    async def _watch(self):
+        """Replace workers that died or stopped sending heartbeats"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for worker in list(self._workers):
+                if not worker.process.is_alive():
+                    reason = f"exited with code {worker.process.exitcode}"
+                elif worker.ready and now - worker.last_seen > self.heartbeat_timeout:
+                    reason = f"sent no heartbeat for {now - worker.last_seen:.0f}s"
+                elif not worker.ready and now - worker.started_at > self.start_timeout:
+                    reason = f"was not ready after {self.start_timeout}s"
+                else:
+                    continue
+                await self._restart(worker, reason)
+
+    async def _restart(self, worker: _Worker, reason: str):
+        logger.error(f"Worker process {worker.index} (pid {worker.pid}) {reason}, restarting")
+        self._by_id.pop(worker.worker_id, None)
+        worker.ready = False
+        self._update_ready()
+        self._fail_tasks(worker, f"Worker process {reason}")
+        await self._stop_process(worker, 0)
+
+        self.restarts += 1
+        WORKER_RESTARTS.inc()
+        self._workers[self._workers.index(worker)] = self._spawn(worker.index)
+
+    async def _stop_process(self, worker: _Worker, timeout: float):
+        """Wait up to ``timeout`` seconds for the process to exit, then kill it"""
+        process = worker.process
+        await asyncio.to_thread(process.join, timeout)
+        if process.is_alive():
+            process.kill()
+            await asyncio.to_thread(process.join)
+        worker.requests.close()
+
+    def _fail_tasks(self, worker: _Worker, message: str):
+        for task_id in worker.tasks:
+            answers = self._pending.pop(task_id, None)
+            if answers is not None:
+                answers.put_nowait(("error", (WorkerCrashedError.kind, message, None)))
+        worker.tasks.clear()
+
+    def _update_ready(self):
+        WORKER_PROCESSES_READY.set(sum(1 for worker in self._workers if worker.ready))
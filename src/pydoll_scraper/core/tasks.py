@@ -0,0 +1,342 @@
+"""
+Scrape tasks addressed by name, shared by the API and the job workers.
+
+Payloads and results are plain JSON-serializable data so a task can be queued
+in one process and run in another.
+"""
+
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .browser_pool import BrowserPool
+from .cache import ScrapeCache
+from .cursor import CursorStore
+from .errors import ScrapeError, error_from_kind
+from .faults import COMPLETE, TabSource
+from .metrics import collect_timings
+from .ratelimit import HostRateLimiter
+from .resources import ResourcePolicy
+from .scraper import WebScraper
+from .xcom_scraper import XComScraper
+
+TASK_KINDS = ("xcom_links", "xcom_content", "page")
+
+R = TypeVar("R")
+
+
+def pool_tabs(pool: Optional[BrowserPool], headless: Optional[bool] = None) -> Optional[TabSource]:
+    """
+    Tab source leasing from ``pool``, or None so the scraper launches its own
+    browser: without a pool, or when ``headless`` asks for the other mode
+    """
+    if pool is None or (headless is not None and headless != pool.headless):
+        return None
+    return pool.lease
+
+
+def _headless(pool: Optional[BrowserPool], headless: Optional[bool]) -> bool:
+    """Mode of a browser the scraper launches itself: as asked, else the pool's"""
+    if headless is not None:
+        return headless
+    return pool.headless if pool is not None else True
+
+
+async def _retrying(
+    rate_limiter: Optional[HostRateLimiter], host: str, scrape: Callable[[], Awaitable[R]]
+) -> R:
+    """
+    Run ``scrape``, rerunning it while throttled; each run leases its own tabs
+
+    The only retry layer of a task: its scraper is built with
+    ``retry_throttled=False``.
+    """
+    if rate_limiter is None:
+        return await scrape()
+    return await rate_limiter.retry(scrape, host)
+
+
+async def scrape_links(
+    pool: Optional[BrowserPool],
+    account_name: str,
+    total_tweets: int = 25,
+    raise_on_error: bool = False,
+    cursor_store: Optional[CursorStore] = None,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    headless: Optional[bool] = None,
+) -> List[str]:
+    """
+    Scrape tweet links on a pooled tab
+
+    With a ``cursor_store`` only tweets newer than the account's cursor are
+    returned and the cursor is advanced. With a ``rate_limiter`` the timeline
+    load waits for x.com's rate and a throttled scrape is retried after a
+    backoff, on a fresh lease. With ``headless`` set to the other mode than
+    the pool's, the scrape launches a browser of its own.
+    """
+    try:
+        result = await links_result(
+            pool, account_name, total_tweets, cursor_store, resource_policy, rate_limiter, headless
+        )
+    except Exception:
+        if raise_on_error:
+            raise
+        return []
+    return result["links"]
+
+
+async def links_result(
+    pool: Optional[BrowserPool],
+    account_name: str,
+    total_tweets: int = 25,
+    cursor_store: Optional[CursorStore] = None,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    headless: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Scrape tweet links like ``scrape_links`` into an ``xcom_links`` task result
+
+    A tab that crashes or hangs is replaced by a fresh lease and the scrape
+    resumes where it stopped; once none is left, the links so far are
+    returned with ``"status": "partial"`` and the error.
+
+    Raises:
+        ScrapeError: If the scrape failed before its first link
+    """
+    scraper = XComScraper(
+        account_name,
+        headless=_headless(pool, headless),
+        resource_policy=resource_policy,
+        rate_limiter=rate_limiter,
+        tabs=pool_tabs(pool, headless),
+        retry_throttled=False,
+    )
+
+    async def scrape() -> Dict[str, Any]:
+        if cursor_store is not None:
+            links = await scraper.scrape_new_tweet_links(
+                cursor_store, total_tweets, raise_on_error=True
+            )
+        else:
+            links = await scraper.scrape_tweet_links(total_tweets, raise_on_error=True)
+        return {
+            "account": account_name,
+            "count": len(links),
+            "links": links,
+            **scraper.checkpoint.outcome(),
+        }
+
+    return await _retrying(rate_limiter, scraper.host, scrape)
+
+
+async def scrape_content(
+    pool: Optional[BrowserPool],
+    account_name: str,
+    total_tweets: int = 25,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    headless: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """Scrape tweet content on a pooled tab, as ``TweetData`` dictionaries"""
+    result = await content_result(
+        pool, account_name, total_tweets, resource_policy, rate_limiter, headless
+    )
+    return result["tweets"]
+
+
+async def content_result(
+    pool: Optional[BrowserPool],
+    account_name: str,
+    total_tweets: int = 25,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    headless: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Scrape tweet content into an ``xcom_content`` task result, see ``links_result``"""
+    scraper = XComScraper(
+        account_name,
+        headless=_headless(pool, headless),
+        resource_policy=resource_policy,
+        rate_limiter=rate_limiter,
+        tabs=pool_tabs(pool, headless),
+        retry_throttled=False,
+    )
+
+    async def scrape() -> Dict[str, Any]:
+        tweets = [asdict(tweet) async for tweet in scraper.iter_tweets(total_tweets)]
+        return {
+            "account": account_name,
+            "count": len(tweets),
+            "tweets": tweets,
+            **scraper.checkpoint.outcome(),
+        }
+
+    return await _retrying(rate_limiter, scraper.host, scrape)
+
+
+async def iter_content(
+    pool: Optional[BrowserPool],
+    account_name: str,
+    total_tweets: int = 25,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    headless: Optional[bool] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield tweet content dictionaries from a pooled tab as they are parsed
+
+    Raises:
+        ScrapeError: After the last tweet of a partial scrape, with the error
+            that ended it
+    """
+    scraper = XComScraper(
+        account_name,
+        headless=_headless(pool, headless),
+        resource_policy=resource_policy,
+        rate_limiter=rate_limiter,
+        tabs=pool_tabs(pool, headless),
+    )
+    async for tweet in scraper.iter_tweets(total_tweets):
+        yield asdict(tweet)
+
+    checkpoint = scraper.checkpoint
+    if checkpoint.status != COMPLETE:
+        raise error_from_kind(checkpoint.error_type, f"Partial result: {checkpoint.error}")
+
+
+async def scrape_page(
+    pool: Optional[BrowserPool],
+    url: str,
+    selectors: Optional[Dict[str, str]] = None,
+    resource_policy: Optional[ResourcePolicy] = None,
+    headless: Optional[bool] = None,
+    cache: Optional[ScrapeCache] = None,
+) -> Dict[str, Any]:
+    """
+    Scrape one web page on a pooled tab, as a ``ScrapedData`` dictionary,
+    through ``cache`` when one is given
+
+    Raises:
+        ScrapeError: If the page could not be loaded
+    """
+    scraper = WebScraper(
+        headless=_headless(pool, headless),
+        resource_policy=resource_policy,
+        max_results_in_memory=1,
+        tabs=pool_tabs(pool, headless),
+    )
+    if cache is not None:
+        page = await cache.page(url, selectors, lambda: scraper.scrape_url(url, selectors))
+    else:
+        page = await scraper.scrape_url(url, selectors)
+    if page is None:
+        raise ScrapeError(f"Could not scrape {url}")
+    return asdict(page)
+
+
+async def run_task(
+    kind: str,
+    payload: Dict[str, Any],
+    pool: Optional[BrowserPool] = None,
+    cursor_store: Optional[CursorStore] = None,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    cache: Optional[ScrapeCache] = None,
+) -> Any:
+    """
+    Run the task named ``kind`` and return its JSON-serializable result
+
+    Args:
+        kind: One of ``TASK_KINDS``
+        payload: Task arguments, e.g. ``{"account_name": ..., "total_tweets": ...}``,
+            or ``{"url": ..., "selectors": ...}`` for ``page`` tasks; with
+            ``"timings": true`` the result includes a per-stage timing
+            breakdown, and ``"headless"`` picks the browser mode, the pool's
+            when unset
+        pool: Browser pool to lease a tab from
+        cursor_store: Cursor store for incremental ``xcom_links`` tasks
+        resource_policy: Requests to block while scraping
+        rate_limiter: Per-host rate limiter shared by the process's scrapes
+        cache: Result cache ``page`` tasks go through
+
+    Raises:
+        ValueError: If ``kind`` is unknown
+        ScrapeError: If the scrape was throttled or the account is unavailable
+    """
+    with collect_timings() as timings:
+        result = await _run_task(
+            kind, payload, pool, cursor_store, resource_policy, rate_limiter, cache
+        )
+    if payload.get("timings"):
+        result["timings"] = timings.to_dict()
+    return result
+
+
+async def iter_task(
+    kind: str,
+    payload: Dict[str, Any],
+    pool: Optional[BrowserPool] = None,
+    cursor_store: Optional[CursorStore] = None,
+    resource_policy: Optional[ResourcePolicy] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield the items of the task named ``kind`` as they are scraped; only
+    ``xcom_content`` tasks stream, one tweet at a time
+
+    Raises:
+        ValueError: If ``kind`` does not stream
+    """
+    if kind != "xcom_content":
+        raise ValueError(f"Task kind {kind!r} does not stream")
+    async for tweet in iter_content(
+        pool,
+        payload["account_name"],
+        payload.get("total_tweets", 25),
+        resource_policy,
+        rate_limiter,
+        payload.get("headless"),
+    ):
+        yield tweet
+
+
+async def _run_task(
+    kind: str,
+    payload: Dict[str, Any],
+    pool: Optional[BrowserPool],
+    cursor_store: Optional[CursorStore],
+    resource_policy: Optional[ResourcePolicy],
+    rate_limiter: Optional[HostRateLimiter],
+    cache: Optional[ScrapeCache],
+) -> Dict[str, Any]:
+    if kind == "page":
+        return await scrape_page(
+            pool,
+            payload["url"],
+            payload.get("selectors"),
+            resource_policy=resource_policy,
+            headless=payload.get("headless"),
+            cache=cache,
+        )
+
+    account_name = payload["account_name"]
+    total_tweets = payload.get("total_tweets", 25)
+
+    if kind == "xcom_links":
+        return await links_result(
+            pool,
+            account_name,
+            total_tweets,
+            cursor_store=cursor_store if payload.get("incremental") else None,
+            resource_policy=resource_policy,
+            rate_limiter=rate_limiter,
+            headless=payload.get("headless"),
+        )
+
+    if kind == "xcom_content":
+        return await content_result(
+            pool, account_name, total_tweets, resource_policy, rate_limiter, payload.get("headless")
+        )
+
+    raise ValueError(f"Unknown task kind: {kind!r}")
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from typing import Any, Optional, Set
+
+from .batch import write_result
+from .browser_pool import BrowserPool
+from .cache import ScrapeCache
+from .cursor import CursorStore
+from .errors import error_kind
+from .jobs import JobQueue
+from .ratelimit import HostRateLimiter
+from .resources import ResourcePolicy
+from .scheduler import BULK, ScrapeScheduler
+from .sinks import OutputSink
+from .supervisor import ProcessSupervisor
+from .tasks import run_task
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Claims jobs from a ``JobQueue`` and runs up to ``concurrency`` of them at once
+
+    Each job runs through ``run_task`` on a tab leased from ``pool``, or in one
+    of the ``supervisor``'s worker processes; its result or error message is
+    stored back in the queue, and the result's rows are written to ``sink``.
+    Page jobs go through the result ``cache`` when one is given.
+    With a ``scheduler`` shared with the API, jobs wait for a slot of their
+    payload's ``priority``, bulk when it sets none, rather than being shed.
+
+    Every ``heartbeat_interval`` seconds, and once at start, the worker tells
+    the queue it is alive and requeues the jobs of workers that died.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        pool: Optional[BrowserPool] = None,
+        concurrency: int = 4,
+        cursor_store: Optional[CursorStore] = None,
+        claim_timeout: float = 1.0,
+        resource_policy: Optional[ResourcePolicy] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        supervisor: Optional[ProcessSupervisor] = None,
+        sink: Optional[OutputSink] = None,
+        scheduler: Optional[ScrapeScheduler] = None,
+        heartbeat_interval: float = 10.0,
+        cache: Optional[ScrapeCache] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.queue = queue
+        self.pool = pool
+        self.concurrency = concurrency
+        self.cursor_store = cursor_store
+        self.claim_timeout = claim_timeout
+        self.resource_policy = resource_policy
+        self.rate_limiter = rate_limiter
+        self.supervisor = supervisor
+        self.sink = sink
+        self.scheduler = scheduler
+        self.heartbeat_interval = heartbeat_interval
+        self.cache = cache
+        self._stopping = asyncio.Event()
+        self._running: Set["asyncio.Task[None]"] = set()
+
+    async def run(self):
+        """Process jobs until ``stop`` is called"""
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(f"Job worker started with concurrency {self.concurrency}")
+        keepalive = asyncio.create_task(self._keepalive())
+
+        while not self._stopping.is_set():
+            await slots.acquire()
+            if self._stopping.is_set():
+                slots.release()
+                break
+            try:
+                job = await self.queue.claim(self.claim_timeout)
+            except Exception as e:
+                slots.release()
+                logger.error(f"Error claiming job: {e}")
+                await asyncio.sleep(self.claim_timeout)
+                continue
+
+            if job is None:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(self._run_job(job, slots))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        keepalive.cancel()
+        await asyncio.gather(keepalive, return_exceptions=True)
+        logger.info("Job worker stopped")
+
+    def stop(self):
+        """Stop claiming new jobs; ``run`` returns once running jobs finish"""
+        self._stopping.set()
+
+    async def _keepalive(self):
+        while True:
+            try:
+                await self.queue.heartbeat()
+                requeued = await self.queue.requeue_stale()
+                if requeued:
+                    logger.warning(f"Requeued {requeued} job(s) of workers that died")
+            except Exception as e:
+                logger.error(f"Error keeping the job queue alive: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _run_job(self, job, slots: asyncio.Semaphore):
+        logger.info(f"Running job {job.id} ({job.kind})")
+        try:
+            if self.scheduler is None:
+                result = await self._run(job)
+            else:
+                priority = job.payload.get("priority") or BULK
+                tweets = job.payload.get("total_tweets", 0)
+                async with self.scheduler.slot(priority, tweets, shed=False):
+                    result = await self._run(job)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            await self.queue.fail(job, f"X.com scraping error: {str(e)}", error_kind(e))
+        else:
+            await self.queue.complete(job, result)
+            if self.sink is not None:
+                await write_result(self.sink, job.kind, result)
+        finally:
+            slots.release()
+
+    async def _run(self, job) -> Any:
+        if self.supervisor is not None:
+            return await self.supervisor.run_task(job.kind, job.payload)
+        return await run_task(
+            job.kind,
+            job.payload,
+            self.pool,
+            self.cursor_store,
+            self.resource_policy,
+            self.rate_limiter,
+            cache=self.cache,
+        )
@@ -0,0 +1,318 @@
+"""
+Streaming record writers.
+
+Each record is written as soon as it is produced, so exporting a long scrape
+never builds the whole document in memory. JSONL and SQLite are always
+available; msgpack requires the optional ``msgpack`` package and Parquet the
+optional ``pyarrow`` package.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+from .cursor import status_id_from_link
+
+WRITER_FORMATS = ("jsonl", "msgpack", "parquet", "sqlite")
+
+_SUFFIX_FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".msgpack": "msgpack",
+    ".mpk": "msgpack",
+    ".parquet": "parquet",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+}
+
+
+def record_to_dict(record: Any) -> Dict[str, Any]:
+    """Dataclass records as dictionaries; dictionaries as they are"""
+    if is_dataclass(record) and not isinstance(record, type):
+        return asdict(record)
+    return record
+
+
+class RecordWriter(ABC):
+    """Appends records to a file one at a time"""
+
+    def __init__(self, path: Union[str, Path], append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._file = self._open(append)
+
+    @abstractmethod
+    def _open(self, append: bool):
+        """Open the underlying file"""
+
+    @abstractmethod
+    def _write(self, data: Dict[str, Any]):
+        """Serialize one record"""
+
+    def write(self, record: Any):
+        self._write(record_to_dict(record))
+        self.count += 1
+
+    def write_all(self, records: Iterable[Any]) -> int:
+        """Write every record of ``records`` and return how many were written"""
+        written = 0
+        for record in records:
+            self.write(record)
+            written += 1
+        return written
+
+    def flush(self):
+        """Make every record written so far durable"""
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonlWriter(RecordWriter):
+    """One JSON document per line"""
+
+    def _open(self, append: bool):
+        return open(self.path, "a" if append else "w", encoding="utf-8")
+
+    def _write(self, data: Dict[str, Any]):
+        self._file.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+
+class RotatingJsonlWriter(JsonlWriter):
+    """
+    JSONL that moves on to a new file once ``max_bytes`` have been written
+
+    The current file is always ``path``; full ones are renamed to
+    ``<stem>.<n><suffix>``, numbered in write order, and appending continues
+    the numbering.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int, append: bool = False):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        super().__init__(path, append=append)
+
+    def rotated_files(self) -> List[Path]:
+        """Full files, oldest first"""
+        pattern = f"{self.path.stem}.[0-9]*{self.path.suffix}"
+        return sorted(self.path.parent.glob(pattern), key=self._rotation_index)
+
+    def _rotation_index(self, path: Path) -> int:
+        return int(path.name[len(self.path.stem) + 1 : len(path.name) - len(self.path.suffix)])
+
+    def _open(self, append: bool):
+        rotated = self.rotated_files()
+        if not append:
+            for path in rotated:
+                path.unlink()
+            rotated = []
+        self._next_index = self._rotation_index(rotated[-1]) + 1 if rotated else 0
+        file = super()._open(append)
+        self._size = file.tell()
+        return file
+
+    def _write(self, data: Dict[str, Any]):
+        line = json.dumps(data, ensure_ascii=False) + "\n"
+        self._file.write(line)
+        self._size += len(line.encode("utf-8"))
+        if self._size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        os.replace(
+            self.path,
+            self.path.with_name(f"{self.path.stem}.{self._next_index:05d}{self.path.suffix}"),
+        )
+        self._next_index += 1
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+
+class MsgpackWriter(RecordWriter):
+    """Concatenated msgpack maps, readable with ``msgpack.Unpacker``"""
+
+    def _open(self, append: bool):
+        if msgpack is None:
+            raise ImportError("MsgpackWriter requires the 'msgpack' package: pip install msgpack")
+        self._packer = msgpack.Packer()
+        return open(self.path, "ab" if append else "wb")
+
+    def _write(self, data: Dict[str, Any]):
+        self._file.write(self._packer.pack(data))
+
+
+class ParquetWriter(RecordWriter):
+    """
+    Parquet dataset: a directory of ``part-<n>.parquet`` files
+
+    Records are buffered and written as one part file per ``flush`` (and on
+    ``close``), each holding a single row group. Part files are written under
+    a temporary name and renamed when complete, so an interrupted run leaves
+    only whole files behind, and appending adds parts after the existing
+    ones. Dictionary values are stored as JSON strings, since their keys vary
+    from record to record; the column types are inferred per part.
+    """
+
+    def __init__(self, path: Union[str, Path], append: bool = False):
+        self._rows: List[Dict[str, Any]] = []
+        super().__init__(path, append=append)
+
+    def _open(self, append: bool):
+        if pyarrow is None:
+            raise ImportError("ParquetWriter requires the 'pyarrow' package: pip install pyarrow")
+        self.path.mkdir(parents=True, exist_ok=True)
+        parts = list(self.path.glob("part-*.parquet"))
+        if not append:
+            for part in parts:
+                part.unlink()
+            parts = []
+        self._next_part = max((int(part.stem.split("-")[1]) + 1 for part in parts), default=0)
+        return None
+
+    def _write(self, data: Dict[str, Any]):
+        self._rows.append(
+            {
+                key: json.dumps(value, ensure_ascii=False) if isinstance(value, dict) else value
+                for key, value in data.items()
+            }
+        )
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = pyarrow.Table.from_pylist(self._rows)
+        part = self.path / f"part-{self._next_part:05d}.parquet"
+        temp_path = part.with_suffix(".tmp")
+        pyarrow.parquet.write_table(table, temp_path)
+        os.replace(temp_path, part)
+        self._next_part += 1
+        self._rows = []
+
+    def close(self):
+        self.flush()
+
+
+def record_key(data: Dict[str, Any]) -> str:
+    """
+    Identity of a record: the status ID of its tweet link, else its URL or link
+
+    Raises:
+        ValueError: If the record has none of them
+    """
+    link = data.get("link")
+    if link and (status_id := status_id_from_link(link)) is not None:
+        return str(status_id)
+    key = data.get("url") or link
+    if not key:
+        raise ValueError(f"Record has no tweet link or URL to key it by: {sorted(data)}")
+    return key
+
+
+class SqliteWriter(RecordWriter):
+    """
+    Records in a SQLite table, one row per ``record_key``, in WAL mode
+
+    A record whose key is already stored is merged into the stored one
+    (``json_patch``), so tweet content written after its bare link fills in
+    the same row, and rewriting a record is idempotent. Rows are committed
+    on ``flush``; WAL lets readers query the table while a scrape writes it.
+    """
+
+    def __init__(self, path: Union[str, Path], append: bool = False, table: str = "records"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.table = table
+        super().__init__(path, append=append)
+
+    def _open(self, append: bool):
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " written_at REAL NOT NULL)"
+            )
+            if not append:
+                connection.execute(f"DELETE FROM {self.table}")
+        self._upsert = (
+            f"INSERT INTO {self.table} (key, data, written_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET"
+            " data = json_patch(data, excluded.data), written_at = excluded.written_at"
+        )
+        return connection
+
+    def _write(self, data: Dict[str, Any]):
+        self._file.execute(self._upsert, self._row(data))
+
+    def write_all(self, records: Iterable[Any]) -> int:
+        rows = [self._row(record_to_dict(record)) for record in records]
+        self._file.executemany(self._upsert, rows)
+        self.count += len(rows)
+        return len(rows)
+
+    def _row(self, data: Dict[str, Any]) -> Tuple[str, str, float]:
+        return record_key(data), json.dumps(data, ensure_ascii=False), time.time()
+
+    def flush(self):
+        self._file.commit()
+
+    def close(self):
+        self._file.commit()
+        self._file.close()
+
+
+def open_writer(
+    path: Union[str, Path],
+    format: Optional[str] = None,
+    append: bool = False,
+    rotate_bytes: Optional[int] = None,
+) -> RecordWriter:
+    """
+    Writer for ``path``, in ``format`` or the one its suffix names; JSONL
+    moves on to a new file every ``rotate_bytes`` when given
+
+    Raises:
+        ValueError: If the format is unknown or cannot be told from the suffix
+    """
+    format = format or _SUFFIX_FORMATS.get(Path(path).suffix.lower())
+    if format == "jsonl" and rotate_bytes:
+        return RotatingJsonlWriter(path, rotate_bytes, append=append)
+    if format == "jsonl":
+        return JsonlWriter(path, append=append)
+    if format == "msgpack":
+        return MsgpackWriter(path, append=append)
+    if format == "parquet":
+        return ParquetWriter(path, append=append)
+    if format == "sqlite":
+        return SqliteWriter(path, append=append)
+    raise ValueError(f"format must be one of {WRITER_FORMATS}, got {format!r} for {path}")
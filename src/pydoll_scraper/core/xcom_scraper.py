@@ -1,19 +1,55 @@
-import asyncio
 import logging
 import os
-from dataclasses import dataclass
-from typing import List, Optional
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlparse
 
-from pydoll.browser import Chrome
 from pydoll.browser.options import ChromiumOptions
 from pydoll.browser.tab import Tab, WebElement
 from pydoll.constants import By
 
+from .browser_pool import create_chrome_options
+from .cursor import CursorStore, newest_status_id, status_id_from_link
+from .errors import AccountUnavailableError, RateLimitedError, TabFailedError
+from .faults import (
+    CDP_TIMEOUT,
+    COMPLETE,
+    TAB_RETRIES,
+    ScrapeCheckpoint,
+    StepGuard,
+    TabSource,
+    cdp_call,
+    tab_source,
+)
+from .graphql import TimelineCapture
+from .metrics import ARTICLES_PARSED, PARTIAL_RESULTS, TAB_FAILURES, span
+from .page_scripts import TIMELINE_STATE_SCRIPT, evaluate_json, timeline_extract_script
+from .profiles import ProfileManager, launch_browser
+from .ratelimit import HostRateLimiter
+from .resources import ResourcePolicy, ResourceStats, blocking_resources
+from .scroll import ScrollConfig, ScrollScheduler
+from .sinks import OutputSink
+from .store import ResultStore
+from .writers import open_writer
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class TweetData:
     datetime: str
     hashtag: Optional[str]
@@ -21,13 +57,122 @@ class TweetData:
     content: Optional[str]
     link: str
 
+    @classmethod
+    def from_extracted(cls, entry: Dict) -> "TweetData":
+        """Build from one entry of the timeline extraction script"""
+        return cls(
+            datetime=entry.get("timestamp") or "",
+            hashtag=" ".join(entry.get("hashtags") or []) or None,
+            details=entry.get("details"),
+            content=entry.get("text"),
+            link=entry["link"],
+        )
+
+    @property
+    def status_id(self) -> Optional[int]:
+        return status_id_from_link(self.link)
+
+
+def tweet_key(tweet: TweetData) -> Hashable:
+    """Identity of a tweet: its numeric status ID, or its link when it has none"""
+    return tweet.status_id or tweet.link
+
+
+def tweet_store(max_in_memory: int = 1000, spill_dir: Optional[str] = None) -> ResultStore:
+    """Result store of ``TweetData`` in timeline order, unique by status ID"""
+    return ResultStore(TweetData, tweet_key, max_in_memory=max_in_memory, spill_dir=spill_dir)
+
+
+EXTRACTION_MODES = ("script", "dom", "graphql")
+
+# Seconds to wait for the first timeline API response after navigating
+FIRST_PAGE_TIMEOUT = 10.0
+
+# Seconds to wait for a profile page to render articles, its empty state or an error
+TIMELINE_TIMEOUT = 10
+TIMELINE_READY_XPATH = (
+    '//article | //*[@data-testid="emptyState"] | //*[@data-testid="error-detail"]'
+)
+
+# Empty-state wording of accounts that cannot be scraped, as opposed to
+# accounts that simply have not posted
+UNAVAILABLE_MARKERS = ("doesn't exist", "suspended", "protected")
+
+R = TypeVar("R")
+
 
 class XComScraper:
-    def __init__(self, account_name: str, headless: bool = False, timeout: int = 30):
+    def __init__(
+        self,
+        account_name: str,
+        headless: bool = True,
+        timeout: int = 30,
+        extraction: str = "script",
+        base_url: str = "https://x.com",
+        scroll_config: Optional[ScrollConfig] = None,
+        resource_policy: Optional[ResourcePolicy] = None,
+        profiles: Optional[ProfileManager] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        sink: Optional[OutputSink] = None,
+        tabs: Optional[TabSource] = None,
+        cdp_timeout: float = CDP_TIMEOUT,
+        tab_retries: int = TAB_RETRIES,
+        retry_throttled: bool = True,
+    ):
+        """
+        Args:
+            account_name: X.com handle to scrape
+            headless: Run Chrome without a window
+            timeout: Page timeout in seconds
+            extraction: ``"script"`` parses every article in one injected script per
+                scroll step, ``"dom"`` walks articles element by element over CDP,
+                ``"graphql"`` parses the timeline API responses the page loads
+            base_url: Site root, overridable to point at a local fixture server
+            scroll_config: Scroll scheduling tuning, adaptive defaults when omitted
+            resource_policy: Requests to block while scraping; images, media, fonts
+                and trackers by default. Traffic of the last scrape is kept in
+                ``resource_stats``
+            profiles: Persistent profiles for the dedicated Chrome launched when no
+                tab is given, so its cache and cookies carry over between runs;
+                a throwaway profile is used when omitted
+            rate_limiter: Per-host limiter every timeline load waits on, shared
+                by all scrapers of the process; throttled collecting scrapes
+                are retried through it. Unlimited when omitted
+            sink: Output every parsed tweet is written to, with its account,
+                as it arrives
+            tabs: Where scrapes without a ``tab`` get theirs, and where any scrape
+                resumes when its tab fails, e.g. ``BrowserPool.lease``; a
+                dedicated Chrome is launched when omitted
+            cdp_timeout: Seconds a DevTools call may take before the tab counts
+                as hung
+            tab_retries: Fresh tabs a scrape resumes in, from where it stopped,
+                after its tab crashed or hung. Progress and status of the last
+                scrape are kept in ``checkpoint``
+            retry_throttled: Retry throttled collecting scrapes that launch their
+                own Chrome through ``rate_limiter``; off when the caller retries
+                the whole scrape itself
+        """
+        if extraction not in EXTRACTION_MODES:
+            raise ValueError(f"extraction must be one of {EXTRACTION_MODES}, got {extraction!r}")
+
         self.account_name = account_name
         self.headless = headless
         self.timeout = timeout
-        self.account_url = f"https://x.com/{account_name}"
+        self.extraction = extraction
+        self.base_url = base_url.rstrip("/")
+        self.account_url = f"{self.base_url}/{account_name}"
+        self.host = urlparse(self.base_url).netloc or self.base_url
+        self.scroll_config = scroll_config or ScrollConfig()
+        self.resource_policy = resource_policy or ResourcePolicy()
+        self.resource_stats: Optional[ResourceStats] = None
+        self.profiles = profiles
+        self.rate_limiter = rate_limiter
+        self.sink = sink
+        self.tabs = tabs
+        self.cdp_timeout = cdp_timeout
+        self.tab_retries = tab_retries
+        self.retry_throttled = retry_throttled
+        self.checkpoint = ScrapeCheckpoint()
 
         # Chrome options
         self._headless = headless
@@ -57,69 +202,305 @@ class XComScraper:
 
     def _get_chrome_options(self) -> ChromiumOptions:
         """Get Chrome options for browser configuration"""
-        options = ChromiumOptions()
-
-        if self.headless:
-            options.add_argument("--headless")
-
-        # Standard options for better compatibility
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-web-security")
-
-        return options
-
-    async def _scroll_until_tweets_loaded(self, tab: Tab, total_needed: int = 25) -> List:
-        """Scroll down until required number of tweets are loaded"""
-        seen_links = set()
-        unique_articles = []
-        scroll_attempts = 0
-        max_scroll_attempts = 20
-
-        while len(unique_articles) < total_needed and scroll_attempts < max_scroll_attempts:
+        return create_chrome_options(self.headless, self.resource_policy)
+
+    async def _iter_dom(
+        self,
+        tab: Tab,
+        total_needed: int = 25,
+        since_id: Optional[int] = None,
+        checkpoint: Optional[ScrapeCheckpoint] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield each new tweet found by walking the timeline articles over CDP
+
+        Every article is parsed once per scroll step, as it is found, so
+        results never depend on element handles that the virtualized timeline
+        may have recycled since. Stops at the first tweet not newer than
+        ``since_id``, if given.
+        """
+        checkpoint = checkpoint if checkpoint is not None else ScrapeCheckpoint()
+        pinned_links = set()
+        scheduler = ScrollScheduler(tab, self.scroll_config)
+        guard = StepGuard(tab, "scroll step")
+
+        while len(checkpoint.seen) < total_needed:
             try:
-                current_articles = await tab.query(expression="//article", find_all=True)
-                if not current_articles or isinstance(current_articles, WebElement):
+                with span("xcom", "query_articles"):
+                    articles = await cdp_call(
+                        tab.query(expression="//article", find_all=True),
+                        "query_articles",
+                        self.cdp_timeout,
+                    )
+                if not articles or isinstance(articles, WebElement):
                     logger.warning("No articles found")
                     break
 
-                # Track new unique articles by their links
-                new_articles_count = 0
-                for article in current_articles:
-                    # Skip pinned tweets
-                    if await self._is_tweet_pinned(article):
-                        continue
+                with span("xcom", "parse_articles"):
+                    batch = await self._parse_articles(articles, checkpoint.passed, pinned_links)
+                new_entries, revisited, reached_known = self._take_new(
+                    batch, checkpoint, total_needed, since_id
+                )
+                for entry in new_entries:
+                    yield entry
+
+                if self._should_stop(
+                    scheduler,
+                    len(new_entries),
+                    revisited,
+                    len(checkpoint.seen),
+                    total_needed,
+                    reached_known,
+                    since_id,
+                ):
+                    break
 
-                    # Get the tweet link as unique identifier
-                    tweet_link = await self._find_tweet_link(article)
-                    if tweet_link and tweet_link not in seen_links:
-                        seen_links.add(tweet_link)
-                        unique_articles.append(article)
-                        new_articles_count += 1
+                await self._scroll(scheduler)
+                guard.succeeded()
 
-                logger.info(
-                    f"Found {new_articles_count} new articles, total unique: {len(unique_articles)}"
+            except Exception as e:
+                await guard.failed(e)
+
+    async def _parse_articles(
+        self, articles: List[WebElement], seen_links: set, pinned_links: set
+    ) -> List[Dict]:
+        """
+        Entries for the articles of one scroll step that were not parsed before
+
+        The link is read first, so the costlier pinned check only runs for
+        tweets not seen on an earlier step. Articles that fail to parse, e.g.
+        because they were detached mid-step, are skipped; a hung tab raises
+        ``TabFailedError``.
+        """
+        batch = []
+        for article in articles:
+            ARTICLES_PARSED.inc(extraction="dom")
+            try:
+                link = await cdp_call(
+                    self._find_tweet_link(article), "find_tweet_link", self.cdp_timeout
                 )
-
-                if len(unique_articles) >= total_needed:
-                    logger.info(f"Collected {len(unique_articles)} unique articles")
+                if not link or link in seen_links or link in pinned_links:
+                    continue
+                if await cdp_call(
+                    self._is_tweet_pinned(article), "is_tweet_pinned", self.cdp_timeout
+                ):
+                    pinned_links.add(link)
+                    continue
+            except TabFailedError:
+                raise
+            except Exception as e:
+                logger.debug(f"Error parsing article: {e}")
+                continue
+            batch.append({"link": link, "pinned": False})
+        return batch
+
+    async def _iter_extracted(
+        self,
+        tab: Tab,
+        total_needed: int = 25,
+        since_id: Optional[int] = None,
+        checkpoint: Optional[ScrapeCheckpoint] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield each newly parsed tweet as soon as its scroll step is extracted
+
+        Stops at the first tweet not newer than ``since_id``, if given.
+        """
+        script = timeline_extract_script(self.account_name)
+        checkpoint = checkpoint if checkpoint is not None else ScrapeCheckpoint()
+        scheduler = ScrollScheduler(tab, self.scroll_config)
+        guard = StepGuard(tab, "scroll step")
+
+        while len(checkpoint.seen) < total_needed:
+            try:
+                with span("xcom", "extract"):
+                    batch = await cdp_call(evaluate_json(tab, script), "extract", self.cdp_timeout)
+                if not batch:
+                    logger.warning("No articles found")
                     break
 
-                # If no new articles found, we've reached the end
-                if new_articles_count == 0:
-                    logger.info("No new articles found, stopping scroll")
+                ARTICLES_PARSED.inc(len(batch), extraction="script")
+                new_entries, revisited, reached_known = self._take_new(
+                    batch, checkpoint, total_needed, since_id
+                )
+                for entry in new_entries:
+                    yield entry
+
+                if self._should_stop(
+                    scheduler,
+                    len(new_entries),
+                    revisited,
+                    len(checkpoint.seen),
+                    total_needed,
+                    reached_known,
+                    since_id,
+                ):
                     break
 
-                await tab.execute_script("window.scrollBy(0, 1000)")
-                await asyncio.sleep(2)  # Increased sleep time for content loading
-                scroll_attempts += 1
+                await self._scroll(scheduler)
+                guard.succeeded()
 
             except Exception as e:
-                logger.error(f"Error during scrolling: {e}")
+                await guard.failed(e)
+
+    async def _iter_intercepted(
+        self,
+        tab: Tab,
+        total_needed: int = 25,
+        since_id: Optional[int] = None,
+        checkpoint: Optional[ScrapeCheckpoint] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield tweets parsed from the timeline API responses the page loads
+
+        Navigates to the profile itself, since the first page arrives with the
+        navigation. Scrolling only triggers the next page; nothing is read
+        from the DOM.
+
+        Raises:
+            RateLimitedError: If a later page is throttled, after the tweets so far
+        """
+        checkpoint = checkpoint if checkpoint is not None else ScrapeCheckpoint()
+        scheduler = ScrollScheduler(tab, self.scroll_config)
+        guard = StepGuard(tab, "scroll step")
+
+        async with TimelineCapture(tab, self.account_name) as capture:
+            async with self._request():
+                with span("xcom", "go_to"):
+                    await cdp_call(tab.go_to(self.account_url), "go_to", self.timeout)
+                with span("xcom", "wait_for_page"):
+                    batch = await capture.next_entries(FIRST_PAGE_TIMEOUT)
+                if not await self._check_capture(tab, capture):
+                    return
+
+            while len(checkpoint.seen) < total_needed:
+                try:
+                    ARTICLES_PARSED.inc(len(batch), extraction="graphql")
+                    new_entries, revisited, reached_known = self._take_new(
+                        batch, checkpoint, total_needed, since_id
+                    )
+                    for entry in new_entries:
+                        yield entry
+
+                    if self._should_stop(
+                        scheduler,
+                        len(new_entries),
+                        revisited,
+                        len(checkpoint.seen),
+                        total_needed,
+                        reached_known,
+                        since_id,
+                    ):
+                        break
+
+                    await self._scroll(scheduler)
+                    with span("xcom", "wait_for_page"):
+                        batch = await capture.next_entries(scheduler.settle_timeout)
+                    guard.succeeded()
+
+                    if capture.rate_limited:
+                        logger.warning(
+                            f"Rate limited after {len(checkpoint.seen)} tweet(s), stopping"
+                        )
+                        if self.rate_limiter is not None:
+                            await self.rate_limiter.throttled(self.host, capture.retry_after)
+                        raise RateLimitedError("Timeline API rate limited", capture.retry_after)
+
+                except Exception as e:
+                    await guard.failed(e)
+
+    async def _check_capture(self, tab: Tab, capture: TimelineCapture) -> bool:
+        """
+        Whether the first timeline page was captured; raises when the page
+        shows why it was not, like ``_check_timeline``
+        """
+        if capture.pages:
+            return True
+        if capture.rate_limited:
+            raise RateLimitedError("Timeline API rate limited", capture.retry_after)
+        if await self._check_timeline(tab):
+            logger.warning("No timeline response captured")
+        return False
+
+    def _take_new(
+        self,
+        batch: List[Dict],
+        checkpoint: ScrapeCheckpoint,
+        total_needed: int,
+        since_id: Optional[int],
+    ) -> "tuple[List[Dict], int, bool]":
+        """
+        Entries of ``batch`` not in ``checkpoint`` yet, with absolute links
+
+        Pinned and linkless entries are skipped. Also returns how many tweets
+        yielded by an earlier attempt were met for the first time in this
+        one, and whether a tweet not newer than ``since_id`` was reached,
+        which is also recorded on ``checkpoint``.
+        """
+        new_entries = []
+        revisited = 0
+        for entry in batch:
+            if entry["pinned"] or not entry["link"]:
+                continue
+
+            link = self._absolute_link(entry["link"])
+            if self._is_known(link, since_id):
+                checkpoint.reached_since = True
+                return new_entries, revisited, True
+            if link in checkpoint.seen:
+                revisited += checkpoint.revisit(link)
+                continue
+
+            checkpoint.add(link)
+            new_entries.append({**entry, "link": link})
+            if len(checkpoint.seen) >= total_needed:
                 break
 
-        return unique_articles[:total_needed] if unique_articles else []
+        return new_entries, revisited, False
+
+    @staticmethod
+    def _should_stop(
+        scheduler: ScrollScheduler,
+        new_count: int,
+        revisited: int,
+        total: int,
+        total_needed: int,
+        reached_known: bool,
+        since_id: Optional[int],
+    ) -> bool:
+        """
+        Whether to stop scrolling after a step; tweets met again on the way
+        back to a resumed scrape's checkpoint count as progress
+        """
+        logger.info(f"Found {new_count} new articles, total unique: {total}")
+        if revisited:
+            logger.info(f"Passed {revisited} article(s) collected before resuming")
+
+        if reached_known:
+            logger.info(f"Reached already seen tweet {since_id}, stopping scroll")
+            return True
+
+        if total >= total_needed:
+            logger.info(f"Collected {total} unique articles")
+            return True
+
+        return not scheduler.should_continue(new_count + revisited)
+
+    async def _scroll(self, scheduler: ScrollScheduler):
+        """Scroll one step; a tab that does not settle within its wait counts as hung"""
+        await cdp_call(scheduler.scroll(), "scroll", scheduler.settle_timeout + self.cdp_timeout)
+
+    @staticmethod
+    def _is_known(link: str, since_id: Optional[int]) -> bool:
+        if since_id is None:
+            return False
+        status_id = status_id_from_link(link)
+        return status_id is not None and status_id <= since_id
+
+    def _absolute_link(self, href: str) -> str:
+        if not href.startswith("http"):
+            href = f"{self.base_url}{href}"
+        return href
 
     async def _is_tweet_pinned(self, article: WebElement) -> bool:
         """Check if tweet is pinned"""
@@ -152,9 +533,7 @@ class XComScraper:
                 try:
                     href = link.get_attribute(name="href")
                     if href and "/status/" in href and self.account_name in href:
-                        if not href.startswith("http"):
-                            href = f"https://x.com{href}"
-                        return href
+                        return self._absolute_link(href)
                 except:
                     continue
         except Exception as e:
@@ -162,47 +541,305 @@ class XComScraper:
 
         return None
 
-    async def _extract_tweet_links(self, articles: List) -> List[str]:
-        """Extract tweet links from articles"""
-        links = set()
-
-        for article in articles:
-            try:
-                if await self._is_tweet_pinned(article):
-                    logger.debug("Skipping pinned tweet")
-                    continue
-
-                if link := await self._find_tweet_link(article):
-                    links.add(link)
-                    logger.debug(f"Found tweet link: {link}")
-
-            except Exception as e:
-                logger.error(f"Error extracting tweet link: {e}")
-                continue
+    async def scrape_tweet_links(
+        self,
+        total_tweets: int = 25,
+        tab: Optional[Tab] = None,
+        raise_on_error: bool = False,
+        since_id: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Scrape tweet links from user profile
+
+        Runs on ``tab`` when one is given (e.g. leased from a ``BrowserPool``),
+        otherwise on one of ``tabs`` or a dedicated Chrome launched for this
+        call. With ``since_id`` scrolling stops at the first tweet not newer
+        than it and only newer links are returned. Errors are logged and yield
+        an empty list unless ``raise_on_error`` is set, in which case a
+        throttled scrape raises ``RateLimitedError`` and a missing or
+        protected account ``AccountUnavailableError``; an account without
+        tweets is an empty list either way. Errors after the first link
+        return the links so far instead, with ``checkpoint.status`` set to
+        ``"partial"``. Scrapes launching their own Chrome retry throttled
+        loads when the scraper has a rate limiter; callers passing a tab or
+        ``tabs`` retry themselves, so no tab is held through the backoff.
+        """
+
+        async def collect() -> List[str]:
+            return [
+                link
+                async for link in self.iter_tweet_links(total_tweets, tab=tab, since_id=since_id)
+            ]
 
-        return list(set(links))
-
-    async def scrape_tweet_links(self, total_tweets: int = 25) -> List[str]:
-        """Scrape tweet links from user profile"""
         try:
-            chrome_options = self._get_chrome_options()
-            async with Chrome(options=chrome_options) as browser:
-
-                tab = await browser.start()
-                logger.info(f"Navigating to {self.account_url}")
+            links = await self._retrying(collect, tab)
+            logger.info(f"Collected {len(links)} tweet links ({self.checkpoint.status})")
+            return links
 
-                await tab.go_to(self.account_url)
-                await tab.find_or_wait_element(by=By.XPATH, value="//article", timeout=10)
-
-                if not (articles := await self._scroll_until_tweets_loaded(tab, total_tweets)):
-                    logger.warning("No articles found")
-                    return []
+        except Exception as e:
+            logger.error(f"Error scraping tweet links: {e}")
+            if raise_on_error:
+                raise
+            return []
 
-                # Extract links from articles
-                links = await self._extract_tweet_links(articles)
-                logger.info(f"Collected {len(links)} tweet links")
-                return links
+    async def scrape_new_tweet_links(
+        self,
+        cursor_store: CursorStore,
+        total_tweets: int = 25,
+        tab: Optional[Tab] = None,
+        raise_on_error: bool = False,
+    ) -> List[str]:
+        """
+        Scrape only tweets newer than the account's stored cursor, then advance it
+
+        Returns at most ``total_tweets`` links, newest first. The cursor stays
+        put after a partial scrape, and when ``total_tweets`` ran out before
+        the scroll reached the cursor, since the tweets between the last link
+        and the cursor were never read; the next scrape returns them.
+        """
+        since_id = await cursor_store.get(self.account_name)
+        links = await self.scrape_tweet_links(
+            total_tweets, tab=tab, raise_on_error=raise_on_error, since_id=since_id
+        )
+        if self.checkpoint.status != COMPLETE:
+            logger.warning(f"Keeping the cursor of {self.account_name} after a partial scrape")
+        elif since_id is not None and not self.checkpoint.reached_since:
+            logger.warning(
+                f"Keeping the cursor of {self.account_name}: {total_tweets} tweet(s) "
+                f"collected before reaching tweet {since_id}"
+            )
+        elif newest := newest_status_id(links):
+            await cursor_store.advance(self.account_name, newest)
+        logger.info(f"Found {len(links)} new tweet(s) for {self.account_name} since {since_id}")
+        return links
+
+    async def iter_tweet_links(
+        self, total_tweets: int = 25, tab: Optional[Tab] = None, since_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield each tweet link as soon as it is parsed, newest first
+
+        Stop iterating once you have enough: scrolling stops with it. Runs on
+        ``tab`` when one is given, otherwise on one of ``tabs`` or a dedicated
+        Chrome that stays open until the generator is exhausted or closed.
+        """
+        async with aclosing(
+            self._iter_resuming(tab, total_tweets, since_id, links_only=True)
+        ) as entries:
+            async for entry in entries:
+                yield entry["link"]
+
+    async def iter_tweets(
+        self, total_tweets: int = 25, tab: Optional[Tab] = None
+    ) -> AsyncIterator[TweetData]:
+        """
+        Yield ``TweetData`` for each timeline article as soon as it is parsed
+
+        Runs on ``tab`` when one is given, otherwise on one of ``tabs`` or a
+        dedicated Chrome that stays open until the generator is exhausted or
+        closed.
+        """
+        async with aclosing(self._iter_resuming(tab, total_tweets)) as entries:
+            async for entry in entries:
+                tweet = TweetData.from_extracted(entry)
+                if self.sink is not None:
+                    await self.sink.write({"account": self.account_name, **asdict(tweet)})
+                yield tweet
+
+    async def scrape_tweets_content(
+        self, total_tweets: int = 25, tab: Optional[Tab] = None
+    ) -> List[TweetData]:
+        """Scrape tweet content from user profile"""
+
+        async def collect() -> List[TweetData]:
+            return [tweet async for tweet in self.iter_tweets(total_tweets, tab=tab)]
 
+        try:
+            return await self._retrying(collect, tab)
         except Exception as e:
-            logger.error(f"Error scraping tweet links: {e}")
+            logger.error(f"Error scraping tweet content: {e}")
             return []
+
+    async def export_tweets(
+        self,
+        path: Union[str, Path],
+        total_tweets: int = 25,
+        tab: Optional[Tab] = None,
+        format: Optional[str] = None,
+        append: bool = False,
+    ) -> int:
+        """
+        Stream tweet content to a JSONL or msgpack file as it is parsed
+
+        Tweets are written in timeline order, once per status ID, and never
+        held in memory, so a backfill of any size runs in flat memory.
+
+        Returns:
+            Number of tweets written
+        """
+        seen: Set[Hashable] = set()
+        with open_writer(path, format, append=append) as writer:
+            async for tweet in self.iter_tweets(total_tweets, tab=tab):
+                if (key := tweet_key(tweet)) not in seen:
+                    seen.add(key)
+                    writer.write(tweet)
+            logger.info(f"Wrote {writer.count} tweet(s) to {path} ({self.checkpoint.status})")
+            return writer.count
+
+    async def _retrying(self, scrape: Callable[[], Awaitable[R]], tab: Optional[Tab]) -> R:
+        """Run ``scrape``, rerunning it after a backoff while throttled if it owns its browser"""
+        owns_browser = tab is None and self.tabs is None
+        if not (self.retry_throttled and self.rate_limiter is not None and owns_browser):
+            return await scrape()
+        return await self.rate_limiter.retry(scrape, self.host)
+
+    @asynccontextmanager
+    async def _request(self) -> AsyncIterator[None]:
+        """Wait for the host's rate and report whether the block was throttled"""
+        if self.rate_limiter is None:
+            yield
+            return
+        async with self.rate_limiter.request(self.host):
+            yield
+
+    def _launch(self):
+        """Launch a dedicated Chrome on one of ``profiles``, yielding it and its first tab"""
+        return launch_browser(self._get_chrome_options(), self.profiles, operation="xcom")
+
+    async def _iter_resuming(
+        self,
+        tab: Optional[Tab],
+        total_tweets: int,
+        since_id: Optional[int] = None,
+        links_only: bool = False,
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield parsed tweets like ``_iter_timeline``, resuming in a fresh tab
+        when the tab crashes or hangs
+
+        A resumed attempt reloads the timeline and skips the tweets yielded
+        before it, kept in ``checkpoint``. Once no fresh tab is left, or any
+        other error ends the scrape after its first tweet, the tweets so far
+        stand and the checkpoint's status is ``"partial"``. Errors before the
+        first tweet are raised.
+        """
+        self.checkpoint = checkpoint = ScrapeCheckpoint()
+        async with tab_source(tab, self.tabs, self._launch, self.tab_retries) as (tabs, retries):
+            while True:
+                checkpoint.begin_attempt()
+                try:
+                    async with tabs() as attempt_tab:
+                        async with blocking_resources(
+                            attempt_tab, self.resource_policy
+                        ) as self.resource_stats:
+                            async with aclosing(
+                                self._iter_timeline(
+                                    attempt_tab, total_tweets, since_id, links_only, checkpoint
+                                )
+                            ) as entries:
+                                async for entry in entries:
+                                    yield entry
+                    return
+                except TabFailedError as e:
+                    TAB_FAILURES.inc(operation="xcom", reason=e.reason)
+                    if checkpoint.resumes < retries:
+                        logger.warning(
+                            f"{e}; resuming @{self.account_name} in a fresh tab "
+                            f"after {len(checkpoint.seen)} tweet(s)"
+                        )
+                        continue
+                    error: Exception = e
+                except Exception as e:
+                    error = e
+
+                if not checkpoint.seen:
+                    raise error
+                checkpoint.give_up(error)
+                PARTIAL_RESULTS.inc(operation="xcom")
+                logger.warning(
+                    f"Keeping {len(checkpoint.seen)} tweet(s) of @{self.account_name} "
+                    f"collected before: {error}"
+                )
+                return
+
+    async def _iter_timeline(
+        self,
+        tab: Tab,
+        total_tweets: int,
+        since_id: Optional[int] = None,
+        links_only: bool = False,
+        checkpoint: Optional[ScrapeCheckpoint] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Load the profile timeline in ``tab`` and yield parsed tweets as they arrive
+
+        DOM extraction only reads links, so with ``links_only`` unset the
+        ``"dom"`` mode parses content with the extraction script instead.
+        Tweets already in ``checkpoint`` are skipped.
+        """
+        if self.extraction == "graphql":
+            entries = self._iter_intercepted(tab, total_tweets, since_id, checkpoint)
+        elif not await self._open_timeline(tab):
+            return
+        elif self.extraction == "dom" and links_only:
+            entries = self._iter_dom(tab, total_tweets, since_id, checkpoint)
+        else:
+            entries = self._iter_extracted(tab, total_tweets, since_id, checkpoint)
+
+        async with aclosing(entries):
+            async for entry in entries:
+                yield entry
+
+    async def _open_timeline(self, tab: Tab) -> bool:
+        """
+        Navigate to the profile and wait for its first article
+
+        Returns False when the account has no tweets, see ``_check_timeline``.
+        """
+        logger.info(f"Navigating to {self.account_url}")
+        async with self._request():
+            with span("xcom", "go_to"):
+                await cdp_call(tab.go_to(self.account_url), "go_to", self.timeout)
+            with span("xcom", "wait_for_timeline"):
+                await cdp_call(
+                    tab.find_or_wait_element(
+                        by=By.XPATH,
+                        value=TIMELINE_READY_XPATH,
+                        timeout=TIMELINE_TIMEOUT,
+                        raise_exc=False,
+                    ),
+                    "wait_for_timeline",
+                    TIMELINE_TIMEOUT + self.cdp_timeout,
+                )
+                return await self._check_timeline(tab)
+
+    async def _check_timeline(self, tab: Tab) -> bool:
+        """
+        Whether the loaded profile page shows articles
+
+        Returns False when it shows the empty state of an account without
+        tweets.
+
+        Raises:
+            AccountUnavailableError: If the account does not exist, is suspended
+                or is protected
+            RateLimitedError: If the page shows X.com's error, the login wall,
+                or nothing at all
+        """
+        state = await cdp_call(
+            evaluate_json(tab, TIMELINE_STATE_SCRIPT), "timeline_state", self.cdp_timeout
+        )
+        if state["articles"]:
+            return True
+        if state["login"]:
+            raise RateLimitedError(f"Redirected to the login page loading {self.account_url}")
+        if state["error"] is not None:
+            raise RateLimitedError(f"Timeline failed to load: {state['error']}")
+        if state["empty"] is None:
+            raise RateLimitedError(f"Timeline did not render within {TIMELINE_TIMEOUT}s")
+
+        message = " ".join(state["empty"].replace("\u2019", "'").split())
+        if any(marker in message.lower() for marker in UNAVAILABLE_MARKERS):
+            raise AccountUnavailableError(f"@{self.account_name}: {message}")
+        logger.info(f"@{self.account_name} has no tweets: {message}")
+        return False
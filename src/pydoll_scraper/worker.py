@@ -0,0 +1,79 @@
+"""
+Standalone scrape worker process.
+
+Runs jobs submitted through the API's ``/jobs`` endpoints on its own browser
+pool. Requires the Redis job backend so the API and workers share a queue::
+
+    SCRAPER_JOB_BACKEND=redis SCRAPER_REDIS_URL=redis://localhost:6379/0 \\
+        uv run python -m src.pydoll_scraper.worker
+"""
+
+import asyncio
+import logging
+import signal
+
+from .config import Settings
+from .core.browser_pool import BrowserPool
+from .core.cache import create_scrape_cache
+from .core.cursor import create_cursor_store
+from .core.jobs import create_job_queue
+from .core.ratelimit import create_rate_limiter
+from .core.resources import ResourcePolicy
+from .core.sinks import create_output_sink
+from .core.worker import JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(settings: Settings):
+    """Run a job worker until SIGINT or SIGTERM"""
+    if settings.job_backend != "redis":
+        raise ValueError("A standalone worker requires SCRAPER_JOB_BACKEND=redis")
+
+    queue = create_job_queue(settings)
+    cursor_store = create_cursor_store(settings)
+    pool = BrowserPool.from_settings(settings) if settings.pool_browsers > 0 else None
+    rate_limiter = create_rate_limiter(settings)
+    sink = create_output_sink(settings)
+    cache = create_scrape_cache(settings)
+    worker = JobWorker(
+        queue,
+        pool,
+        concurrency=settings.worker_concurrency,
+        cursor_store=cursor_store,
+        resource_policy=ResourcePolicy.from_settings(settings),
+        rate_limiter=rate_limiter,
+        sink=sink,
+        heartbeat_interval=settings.job_visibility_timeout / 3,
+        cache=cache,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        if sink is not None:
+            sink.start()
+        if pool is not None:
+            await pool.start()
+        await worker.run()
+    finally:
+        if pool is not None:
+            await pool.close()
+        await cursor_store.close()
+        await rate_limiter.close()
+        if sink is not None:
+            await sink.close()
+        if cache is not None:
+            await cache.close()
+        await queue.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(Settings.from_env()))
+
+
+if __name__ == "__main__":
+    main()
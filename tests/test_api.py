@@ -0,0 +1,100 @@
+"""
+Tests for the FastAPI endpoints, calling route handlers with fake scrapers
+"""
+
+import json
+from types import SimpleNamespace
+
+from pydoll_scraper.api import main
+from pydoll_scraper.api.main import XComBatchScrapeRequest, XComScrapeRequest
+from pydoll_scraper.config import Settings
+from pydoll_scraper.core.cursor import MemoryCursorStore
+from pydoll_scraper.core.jobs import MemoryJobQueue
+from pydoll_scraper.core.xcom_scraper import TweetData, XComScraper
+
+
+def fake_http_request(
+    pool=None, settings=None, cache=None, cursor_store=None, job_queue=None, scheduler=None
+):
+    state = SimpleNamespace(
+        browser_pool=pool,
+        settings=settings or Settings(),
+        cache=cache,
+        cursor_store=cursor_store or MemoryCursorStore(),
+        job_queue=job_queue or MemoryJobQueue(),
+        rate_limiter=None,
+        supervisor=None,
+        sink=None,
+        scheduler=scheduler,
+    )
+    return SimpleNamespace(app=SimpleNamespace(state=state))
+
+
+async def read_ndjson(response):
+    body = "".join([chunk async for chunk in response.body_iterator])
+    return [json.loads(line) for line in body.splitlines()]
+
+
+async def test_content_streams_one_tweet_per_line(monkeypatch):
+    async def iter_tweets(self, total_tweets=25, tab=None):
+        for i in range(total_tweets):
+            yield TweetData(
+                datetime="2025-01-10T00:15:00.000Z",
+                hashtag="#perf",
+                details="1 reply",
+                content=f"tweet {i}",
+                link=f"https://x.com/{self.account_name}/status/{i}",
+            )
+
+    monkeypatch.setattr(XComScraper, "iter_tweets", iter_tweets)
+
+    response = await main.scrape_xcom_content(
+        XComScrapeRequest(account_name="fixture", total_tweets=3), fake_http_request()
+    )
+
+    assert response.media_type == "application/x-ndjson"
+    lines = await read_ndjson(response)
+    assert [line["content"] for line in lines] == ["tweet 0", "tweet 1", "tweet 2"]
+    assert lines[0]["link"] == "https://x.com/fixture/status/0"
+
+
+async def test_content_reports_errors_in_band(monkeypatch):
+    async def iter_tweets(self, total_tweets=25, tab=None):
+        yield TweetData("2025-01-10", None, None, "first", "https://x.com/fixture/status/1")
+        raise RuntimeError("tab crashed")
+
+    monkeypatch.setattr(XComScraper, "iter_tweets", iter_tweets)
+
+    response = await main.scrape_xcom_content(
+        XComScrapeRequest(account_name="fixture"), fake_http_request()
+    )
+
+    lines = await read_ndjson(response)
+    assert lines[0]["content"] == "first"
+    assert "tab crashed" in lines[1]["error"]
+
+
+async def test_batch_reports_partial_failures(monkeypatch):
+    async def scrape_tweet_links(self, total_tweets=25, tab=None, raise_on_error=False):
+        if self.account_name == "suspended":
+            raise RuntimeError("account suspended")
+        return [f"https://x.com/{self.account_name}/status/{i}" for i in range(total_tweets)]
+
+    monkeypatch.setattr(XComScraper, "scrape_tweet_links", scrape_tweet_links)
+    request = XComBatchScrapeRequest(
+        requests=[
+            XComScrapeRequest(account_name="first", total_tweets=2),
+            XComScrapeRequest(account_name="suspended"),
+            XComScrapeRequest(account_name="third", total_tweets=1),
+        ],
+        concurrency=2,
+    )
+
+    response = await main.scrape_xcom_links_batch(request, fake_http_request())
+
+    assert response["total"] == 3
+    assert response["failed"] == 1
+    assert [r["account"] for r in response["results"]] == ["first", "suspended", "third"]
+    assert response["results"][0]["count"] == 2
+    assert "account suspended" in response["results"][1]["error"]
+    assert response["results"][2]["links"] == ["https://x.com/third/status/0"]
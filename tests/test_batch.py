@@ -0,0 +1,93 @@
+"""
+Tests for the batch runner and its checkpointed, resumable output
+"""
+
+import asyncio
+import io
+import json
+
+import pytest
+
+from pydoll_scraper.core.batch import BatchRunner, Checkpoint, account_name, read_inputs
+from pydoll_scraper.core.errors import AccountUnavailableError, RateLimitedError
+from pydoll_scraper.core.writers import open_writer
+
+
+def fake_run(failing=()):
+    calls = []
+
+    async def run(kind, payload, pool, cursor_store, resource_policy, rate_limiter):
+        account = payload["account_name"]
+        calls.append(account)
+        await asyncio.sleep(0.01)
+        if account == "gone":
+            raise AccountUnavailableError("@gone: Account suspended")
+        if account in failing:
+            raise RateLimitedError("Timeline did not render")
+        links = [f"https://x.com/{account}/status/{i}" for i in range(payload["total_tweets"])]
+        return {"account": account, "count": len(links), "links": links}
+
+    return run, calls
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_inputs_and_account_names():
+    stream = io.StringIO("alice\n\n# comment\n  @bob  \nhttps://x.com/carol/status/1\n")
+
+    assert [account_name(item) for item in read_inputs(stream)] == ["alice", "bob", "carol"]
+    with pytest.raises(ValueError):
+        account_name("https://x.com/")
+
+
+async def test_batch_writes_rows_and_resumes_from_checkpoint(tmp_path):
+    output = tmp_path / "links.jsonl"
+    inputs = ["alice", "gone", "busy", "bob", "alice"]
+
+    run, calls = fake_run(failing={"busy"})
+    checkpoint = Checkpoint(tmp_path / "links.checkpoint")
+    with open_writer(output) as writer:
+        runner = BatchRunner("xcom_links", writer, checkpoint, workers=3, total_tweets=2, run=run)
+        stats = await runner.run(inputs)
+    checkpoint.close()
+
+    assert sorted(calls) == ["alice", "bob", "busy", "gone"]
+    assert (stats.done, stats.unavailable, stats.failed, stats.skipped) == (2, 1, 1, 1)
+    assert sorted(row["link"] for row in read_jsonl(output)) == [
+        f"https://x.com/{account}/status/{i}" for account in ("alice", "bob") for i in range(2)
+    ]
+
+    run, calls = fake_run()
+    checkpoint = Checkpoint(tmp_path / "links.checkpoint")
+    with open_writer(output, append=True) as writer:
+        runner = BatchRunner("xcom_links", writer, checkpoint, workers=3, total_tweets=2, run=run)
+        stats = await runner.run(inputs)
+    checkpoint.close()
+
+    assert calls == ["busy"]
+    assert stats.skipped == 4
+    assert len(read_jsonl(output)) == 6
+
+
+async def test_parquet_output_is_written_in_whole_parts(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "links.parquet"
+    run, _ = fake_run()
+
+    checkpoint = Checkpoint(tmp_path / "links.checkpoint")
+    with open_writer(output) as writer:
+        runner = BatchRunner(
+            "xcom_links", writer, checkpoint, workers=2, checkpoint_every=2, run=run
+        )
+        await runner.run(["a", "b", "c"])
+    checkpoint.close()
+
+    assert sorted(path.name for path in output.iterdir()) == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+    ]
+    table = parquet.read_table(output)
+    assert table.num_rows == 75
+    assert set(table.column("account").to_pylist()) == {"a", "b", "c"}
@@ -0,0 +1,139 @@
+"""
+Tests for the shared browser pool, using in-memory fakes instead of Chrome
+"""
+
+import asyncio
+
+import pytest
+
+from pydoll_scraper.core import browser_pool
+from pydoll_scraper.core.browser_pool import BrowserPool, create_chrome_options
+from pydoll_scraper.core.tasks import pool_tabs
+
+
+class FakeTab:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def execute_script(self, script):
+        if self.browser.crashed or self.closed:
+            raise ConnectionError("target closed")
+        return {"result": {"result": {"value": 1}}}
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    launched = 0
+
+    def __init__(self):
+        FakeBrowser.launched += 1
+        self.crashed = False
+        self.stopped = False
+        self.tabs = []
+
+    async def start(self, headless=False):
+        return FakeTab(self)
+
+    async def new_tab(self, url=""):
+        if self.crashed:
+            raise ConnectionError("browser gone")
+        tab = FakeTab(self)
+        self.tabs.append(tab)
+        return tab
+
+    async def get_version(self):
+        if self.crashed:
+            raise ConnectionError("browser gone")
+        return {}
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.stopped = True
+
+
+@pytest.fixture
+async def pool():
+    FakeBrowser.launched = 0
+    pool = BrowserPool(browsers=2, tabs_per_browser=2, max_tab_uses=3, browser_factory=FakeBrowser)
+    await pool.start()
+    yield pool
+    await pool.close()
+
+
+async def test_lease_reuses_tabs(pool):
+    async with pool.lease() as first:
+        pass
+    async with pool.lease() as second:
+        pass
+
+    assert first is second
+    assert FakeBrowser.launched == 2
+
+
+async def test_tab_recycled_after_max_uses(pool):
+    tabs = []
+    for _ in range(4):
+        async with pool.lease() as tab:
+            tabs.append(tab)
+
+    assert tabs[0] is tabs[2]
+    assert tabs[0].closed
+    assert tabs[3] is not tabs[0]
+
+
+async def test_tab_recycled_when_lease_raises(pool):
+    with pytest.raises(RuntimeError):
+        async with pool.lease() as tab:
+            raise RuntimeError("renderer hiccup")
+
+    assert tab.closed
+    async with pool.lease() as fresh:
+        assert fresh is not tab
+
+
+async def test_crashed_browser_is_relaunched(pool):
+    async with pool.lease() as tab:
+        tab.browser.crashed = True
+
+    assert tab.browser.stopped
+    assert FakeBrowser.launched == 3
+
+
+async def test_capacity_limits_concurrent_leases(pool):
+    active = 0
+    peak = 0
+
+    async def worker():
+        nonlocal active, peak
+        async with pool.lease():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(worker() for _ in range(10)))
+
+    assert peak == pool.size
+    assert pool.leased == 0
+
+
+def test_headless_options_mask_headless_chrome(monkeypatch):
+    monkeypatch.setattr(browser_pool, "chrome_major_version", lambda binary=None: 126)
+
+    headless = create_chrome_options(headless=True).arguments
+    headed = create_chrome_options(headless=False).arguments
+
+    assert "--headless=new" in headless
+    assert "--disable-blink-features=AutomationControlled" in headless
+    assert "--window-size=1920,1080" in headless
+    user_agent = next(arg for arg in headless if arg.startswith("--user-agent="))
+    assert "Chrome/126.0.0.0" in user_agent and "Headless" not in user_agent
+    assert not any(arg.startswith(("--headless", "--user-agent")) for arg in headed)
+
+
+async def test_other_browser_mode_than_the_pools_gets_no_tab(pool):
+    async with pool_tabs(pool, headless=True)() as tab:
+        assert tab is not None
+    assert pool_tabs(pool, headless=False) is None
@@ -0,0 +1,166 @@
+"""
+Tests for the scrape result cache, backed by the in-memory fake
+"""
+
+import asyncio
+
+from pydoll_scraper.core.cache import (
+    LRUCache,
+    MemoryCache,
+    ScrapeCache,
+    tweet_links_result_key,
+)
+from pydoll_scraper.core.faults import PARTIAL
+from pydoll_scraper.core.scraper import ScrapedData, WebScraper
+from pydoll_scraper.core.tasks import run_task
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def links_result(*links, status="complete"):
+    return {"account": "nasa", "count": len(links), "links": list(links), "status": status}
+
+
+async def test_concurrent_misses_share_one_scrape():
+    cache = ScrapeCache(MemoryCache(), ttl=60)
+    calls = 0
+
+    async def scrape():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return links_result("https://x.com/nasa/status/1")
+
+    results = await asyncio.gather(
+        *(cache.tweet_links_result("nasa", 25, scrape) for _ in range(50))
+    )
+
+    assert calls == 1
+    assert all(result["links"] == ["https://x.com/nasa/status/1"] for result in results)
+
+
+async def test_cancelled_leader_leaves_the_scrape_to_its_followers():
+    cache = ScrapeCache(MemoryCache(), ttl=60)
+    started = asyncio.Event()
+
+    async def scrape():
+        started.set()
+        await asyncio.sleep(0.05)
+        return links_result("https://x.com/nasa/status/1")
+
+    leader = asyncio.create_task(cache.tweet_links_result("nasa", 25, scrape))
+    await started.wait()
+    follower = asyncio.create_task(cache.tweet_links_result("nasa", 25, scrape))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert (await follower)["links"] == ["https://x.com/nasa/status/1"]
+    assert leader.cancelled()
+
+
+async def test_backend_hit_skips_scrape_and_fills_local_tier():
+    backend = MemoryCache()
+    key = tweet_links_result_key("NASA", 10)
+    await backend.set(key, '["https://x.com/nasa/status/2"]', ttl=60)
+    cache = ScrapeCache(backend, ttl=60)
+
+    async def scrape():
+        raise AssertionError("should not scrape")
+
+    assert await cache.tweet_links_result("nasa", 10, scrape) == {
+        "account": "nasa",
+        "count": 1,
+        "links": ["https://x.com/nasa/status/2"],
+        "status": "complete",
+    }
+    assert len(cache.local) == 1
+
+
+async def test_empty_and_partial_results_are_not_cached():
+    cache = ScrapeCache(MemoryCache(), ttl=60)
+    results = [
+        links_result(),
+        links_result("https://x.com/nasa/status/1", status=PARTIAL),
+        links_result("https://x.com/nasa/status/1", "https://x.com/nasa/status/2"),
+    ]
+    calls = 0
+
+    async def scrape():
+        nonlocal calls
+        calls += 1
+        return results[calls - 1]
+
+    for expected in results + results[-1:]:
+        assert await cache.tweet_links_result("nasa", 25, scrape) == expected
+
+    assert calls == 3
+
+
+async def test_errors_propagate_to_every_waiter_and_are_not_cached():
+    cache = ScrapeCache(MemoryCache(), ttl=60)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("throttled")
+
+    results = await asyncio.gather(
+        *(cache.tweet_links_result("nasa", 25, failing) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    fresh = links_result("https://x.com/nasa/status/3")
+    assert await cache.tweet_links_result("nasa", 25, lambda: asyncio.sleep(0, fresh)) == fresh
+
+
+async def test_pages_round_trip_through_backend():
+    backend = MemoryCache()
+    page = ScrapedData("https://example.com", "Example", "Body", "2025-01-01T00:00:00", {})
+
+    async def scrape():
+        return page
+
+    await ScrapeCache(backend).page("https://example.com", None, scrape)
+    cached = await ScrapeCache(backend).page("https://example.com", None, scrape)
+
+    assert cached == page
+    assert cached is not page
+
+
+async def test_page_tasks_go_through_the_cache(monkeypatch):
+    urls = []
+
+    async def scrape_url(self, url, selectors=None, tab=None):
+        urls.append(url)
+        status = PARTIAL if "slow" in url else "complete"
+        return ScrapedData(url, "Example", "Body", "2025-01-01T00:00:00", {}, status=status)
+
+    monkeypatch.setattr(WebScraper, "scrape_url", scrape_url)
+    cache = ScrapeCache(MemoryCache(), ttl=60)
+
+    for url in ["https://example.com", "https://example.com", "https://slow.example.com"] * 2:
+        page = await run_task("page", {"url": url}, cache=cache)
+        assert page["url"] == url
+
+    assert urls == ["https://example.com", "https://slow.example.com", "https://slow.example.com"]
+
+
+def test_lru_tier_expires_and_evicts():
+    clock = FakeClock()
+    lru = LRUCache(max_size=2, clock=clock)
+    lru.set("a", 1, ttl=10)
+    lru.set("b", 2, ttl=10)
+    lru.get("a")
+    lru.set("c", 3, ttl=10)
+
+    assert lru.get("b") == (False, None)
+    assert lru.get("a") == (True, 1)
+
+    clock.now = 11
+    assert lru.get("a") == (False, None)
@@ -0,0 +1,45 @@
+"""
+Tests for bounded concurrency helpers
+"""
+
+import asyncio
+
+import pytest
+
+from pydoll_scraper.core.concurrency import map_bounded
+
+
+async def test_map_bounded_limits_calls_in_flight():
+    active = 0
+    peak = 0
+
+    async def work(item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return item * 2
+
+    results = await map_bounded(work, range(20), limit=3)
+
+    assert peak == 3
+    assert results == [i * 2 for i in range(20)]
+
+
+async def test_map_bounded_returns_exceptions_in_place():
+    async def work(item):
+        if item == 1:
+            raise ValueError("bad item")
+        return item
+
+    results = await map_bounded(work, [0, 1, 2], limit=2)
+
+    assert results[0] == 0
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 2
+
+
+async def test_map_bounded_rejects_zero_limit():
+    with pytest.raises(ValueError):
+        await map_bounded(lambda item: item, [1], limit=0)
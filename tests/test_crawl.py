@@ -0,0 +1,94 @@
+"""
+Tests for parallel fetching over reusable tabs, using in-memory fakes instead of Chrome
+"""
+
+import asyncio
+import time
+
+from pydoll_scraper.core.crawl import TabCrawler
+from pydoll_scraper.core.errors import TabFailedError
+
+
+class FakeTab:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+        self.urls = []
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.tabs = []
+
+    async def new_tab(self, url=""):
+        tab = FakeTab(f"tab-{len(self.tabs)}")
+        self.tabs.append(tab)
+        return tab
+
+
+async def load(tab, url):
+    tab.urls.append(url)
+    await asyncio.sleep(float(url.rsplit("/", 1)[1]))
+    return url
+
+
+async def test_pages_load_in_parallel_over_reused_tabs():
+    browser = FakeBrowser()
+    first = FakeTab("start")
+    urls = [f"https://example.com/{delay}" for delay in (0.05, 0.1, 0.05, 0.05, 0.05, 0.05)]
+
+    start = time.perf_counter()
+    async with TabCrawler(browser, tabs=3, first_tab=first) as crawler:
+        results = await crawler.map(load, urls)
+        again = await crawler.map(load, urls[:3])
+    elapsed = time.perf_counter() - start
+
+    assert results == urls
+    assert again == urls[:3]
+    assert elapsed < 0.3
+    assert len(browser.tabs) == 2
+    assert first.urls and not first.closed
+    assert all(tab.closed for tab in browser.tabs)
+
+
+async def test_hung_page_times_out_and_its_tab_is_replaced():
+    browser = FakeBrowser()
+
+    async with TabCrawler(browser, tabs=1, page_timeout=0.05) as crawler:
+        results = await crawler.map(load, ["https://example.com/5", "https://example.com/0"])
+
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert results[1] == "https://example.com/0"
+    assert [tab.closed for tab in browser.tabs] == [True, True]
+    assert browser.tabs[1].urls == ["https://example.com/0"]
+
+
+async def test_errors_are_returned_in_place():
+    async def fetch(tab, url):
+        if url.endswith("bad"):
+            raise ConnectionError("net::ERR_NAME_NOT_RESOLVED")
+        return url
+
+    async with TabCrawler(FakeBrowser(), tabs=2) as crawler:
+        results = await crawler.map(fetch, ["a", "bad", "c"])
+
+    assert results[0] == "a"
+    assert isinstance(results[1], ConnectionError)
+    assert results[2] == "c"
+
+
+async def test_failed_tab_is_replaced_and_the_page_retried():
+    async def fetch(tab, url):
+        if tab.name == "tab-0":
+            raise TabFailedError("Tab crashed during snapshot", "crashed")
+        return f"{url} in {tab.name}"
+
+    browser = FakeBrowser()
+    async with TabCrawler(browser, tabs=1, tab_retries=1) as crawler:
+        results = await crawler.map(fetch, ["a", "b"])
+
+    assert results == ["a in tab-1", "b in tab-1"]
+    assert browser.tabs[0].closed
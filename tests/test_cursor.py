@@ -0,0 +1,125 @@
+"""
+Tests for per-account cursors and incremental scraping
+"""
+
+from pydoll_scraper.api import main
+from pydoll_scraper.api.main import XComScrapeRequest
+from pydoll_scraper.core.cursor import (
+    MemoryCursorStore,
+    SQLiteCursorStore,
+    newest_status_id,
+    status_id_from_link,
+)
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+from .test_api import fake_http_request
+from .test_extraction import FakeTimelineTab, make_entry
+
+
+def test_status_id_parsing():
+    assert status_id_from_link("https://x.com/fixture/status/1878000000000000001") == (
+        1878000000000000001
+    )
+    assert status_id_from_link("/fixture/status/42/photo/1") == 42
+    assert status_id_from_link("https://x.com/fixture") is None
+    assert newest_status_id(["/a/status/3", "/a/status/10", "/a"]) == 10
+    assert newest_status_id([]) is None
+
+
+async def test_memory_cursor_only_moves_forward():
+    store = MemoryCursorStore()
+
+    await store.advance("Fixture", 10)
+    await store.advance("fixture", 5)
+
+    assert await store.get("FIXTURE") == 10
+    assert await store.get("other") is None
+
+
+async def test_sqlite_cursor_persists_and_only_moves_forward(tmp_path):
+    path = str(tmp_path / "cursors" / "cursors.sqlite3")
+    store = SQLiteCursorStore(path)
+    await store.advance("fixture", 1878000000000000001)
+    await store.advance("fixture", 7)
+    await store.close()
+
+    reopened = SQLiteCursorStore(path)
+    assert await reopened.get("fixture") == 1878000000000000001
+    await reopened.close()
+
+
+async def test_extraction_stops_at_known_tweet():
+    # Newest first, as on the timeline; 5 was returned by the previous scrape
+    tab = FakeTimelineTab([[make_entry(i) for i in (9, 8, 7, 5, 4)]])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    links = await scraper.scrape_tweet_links(25, tab=tab, raise_on_error=True, since_id=5)
+
+    assert links == [f"https://x.com/fixture/status/{i}" for i in (9, 8, 7)]
+    assert tab.scrolls == 0
+
+
+async def test_pinned_tweet_does_not_stop_extraction():
+    batch = [make_entry(1, pinned=True), make_entry(9), make_entry(8)]
+    tab = FakeTimelineTab([batch])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    links = await scraper.scrape_tweet_links(2, tab=tab, raise_on_error=True, since_id=5)
+
+    assert len(links) == 2
+
+
+def timeline_tab(*ids):
+    return FakeTimelineTab([[make_entry(i) for i in ids]])
+
+
+async def test_scrape_new_tweet_links_advances_cursor():
+    store = MemoryCursorStore()
+    await store.advance("fixture", 5)
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    links = await scraper.scrape_new_tweet_links(store, tab=timeline_tab(9, 8, 7, 5, 4))
+    assert len(links) == 3
+    assert await store.get("fixture") == 9
+    assert await scraper.scrape_new_tweet_links(store, tab=timeline_tab(9, 8, 7, 5, 4)) == []
+    assert await store.get("fixture") == 9
+
+
+async def test_cursor_stays_until_the_scroll_reaches_it():
+    store = MemoryCursorStore()
+    await store.advance("fixture", 5)
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    # More new tweets than the budget: 7 and 6 were never read
+    links = await scraper.scrape_new_tweet_links(store, 2, tab=timeline_tab(9, 8, 7, 6, 5))
+    assert links == ["https://x.com/fixture/status/9", "https://x.com/fixture/status/8"]
+    assert await store.get("fixture") == 5
+
+    links = await scraper.scrape_new_tweet_links(store, 25, tab=timeline_tab(9, 8, 7, 6, 5))
+    assert len(links) == 4
+    assert await store.get("fixture") == 9
+
+    # Without a cursor there is nothing to miss
+    fresh = MemoryCursorStore()
+    assert len(await scraper.scrape_new_tweet_links(fresh, 2, tab=timeline_tab(9, 8, 7))) == 2
+    assert await fresh.get("fixture") == 9
+
+
+async def test_incremental_request_uses_cursor(monkeypatch):
+    async def scrape_new_tweet_links(
+        self, cursor_store, total_tweets=25, tab=None, raise_on_error=False
+    ):
+        await cursor_store.advance(self.account_name, 3)
+        return ["https://x.com/fixture/status/3"]
+
+    monkeypatch.setattr(XComScraper, "scrape_new_tweet_links", scrape_new_tweet_links)
+    store = MemoryCursorStore()
+
+    response = await main.scrape_xcom_links(
+        XComScrapeRequest(account_name="fixture", incremental=True),
+        fake_http_request(cursor_store=store),
+    )
+
+    assert response["links"] == ["https://x.com/fixture/status/3"]
+    assert await store.get("fixture") == 3
@@ -0,0 +1,202 @@
+"""
+Tests for in-page tweet extraction, using a fake tab that returns canned batches
+"""
+
+import json
+
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.scroll import ScrollConfig, ScrollScheduler
+from pydoll_scraper.core.xcom_scraper import TweetData, XComScraper
+
+
+def make_entry(status_id, pinned=False, account="fixture"):
+    return {
+        "link": f"/{account}/status/{status_id}",
+        "pinned": pinned,
+        "timestamp": "2025-01-10T00:15:00.000Z",
+        "text": f"tweet {status_id}",
+        "hashtags": ["#perf"],
+    }
+
+
+class FakeTimelineTab:
+    """Returns one batch per extraction, as the extraction script would"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.evaluations = 0
+        self.scrolls = 0
+
+    def timeline_state(self):
+        return {"articles": 1, "empty": None, "error": None, "login": False}
+
+    async def go_to(self, url):
+        pass
+
+    async def find_or_wait_element(self, by, value, timeout=10, raise_exc=True):
+        pass
+
+    async def _execute_command(self, command):
+        if "emptyState" in command["params"]["expression"]:
+            value = self.timeline_state()
+        elif command["params"].get("awaitPromise"):
+            self.scrolls += 1
+            value = {"added": 1, "step": 1000, "article_height": 250, "waited_ms": 5}
+        else:
+            value = self.batches[min(self.evaluations, len(self.batches) - 1)]
+            self.evaluations += 1
+        return {"result": {"result": {"type": "string", "value": json.dumps(value)}}}
+
+
+class FakeElement:
+    def __init__(self, text="", href=None, children=()):
+        self._text = text
+        self.href = href
+        self.children = list(children)
+
+    @property
+    async def text(self):
+        return self._text
+
+    def get_attribute(self, name):
+        return self.href
+
+
+class FakeArticle:
+    """Timeline article answering the link and pinned queries over fake CDP"""
+
+    def __init__(self, status_id, pinned=False, detached=False):
+        self.status_id = status_id
+        self.pinned = pinned
+        self.detached = detached
+        self.queries = {"//a": 0, "//div": 0}
+
+    async def query(self, expression, find_all=False):
+        if self.detached:
+            raise ValueError("Could not find node with given id")
+        self.queries[expression] += 1
+        if expression == "//a":
+            return [FakeElement(href=f"/fixture/status/{self.status_id}")]
+        return [FakeElement("Pinned" if self.pinned else f"tweet {self.status_id}")]
+
+
+class FakeDomTab(FakeTimelineTab):
+    """Shows one list of articles per scroll step"""
+
+    def __init__(self, steps):
+        super().__init__([])
+        self.steps = list(steps)
+
+    async def query(self, expression, find_all=False):
+        return self.steps[min(self.scrolls, len(self.steps) - 1)]
+
+
+async def test_single_evaluation_when_first_batch_suffices():
+    tab = FakeTimelineTab([[make_entry(i) for i in range(10)]])
+    scraper = XComScraper(
+        "fixture", resource_policy=ResourcePolicy.off(), base_url="http://localhost:8080"
+    )
+
+    tweets = await scraper.scrape_tweets_content(5, tab=tab)
+
+    assert tab.evaluations == 1
+    assert tab.scrolls == 0
+    assert [t.link for t in tweets] == [
+        f"http://localhost:8080/fixture/status/{i}" for i in range(5)
+    ]
+
+
+async def test_pinned_and_linkless_articles_are_skipped():
+    batch = [make_entry(1, pinned=True), {**make_entry(2), "link": None}, make_entry(3)]
+    tab = FakeTimelineTab([batch])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    tweets = await scraper.scrape_tweets_content(1, tab=tab)
+
+    assert [t.link for t in tweets] == ["https://x.com/fixture/status/3"]
+    assert tweets[0].hashtag == "#perf"
+
+
+async def test_scroll_survives_a_stalled_step():
+    first = [make_entry(i) for i in range(3)]
+    later = first + [make_entry(i) for i in range(3, 6)]
+    tab = FakeTimelineTab([first, first, later])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    tweets = await scraper.scrape_tweets_content(6, tab=tab)
+
+    assert len(tweets) == 6
+    assert tab.scrolls == 2
+
+
+async def test_scroll_gives_up_after_idle_steps():
+    tab = FakeTimelineTab([[make_entry(i) for i in range(3)]])
+    scraper = XComScraper(
+        "fixture",
+        resource_policy=ResourcePolicy.off(),
+        scroll_config=ScrollConfig(max_idle_steps=3),
+    )
+
+    tweets = await scraper.scrape_tweets_content(10, tab=tab)
+
+    assert len(tweets) == 3
+    assert tab.evaluations == 4
+
+
+def test_scheduler_backs_off_until_new_tweets_arrive():
+    config = ScrollConfig(settle_timeout=1.0, max_settle_timeout=3.0, backoff_factor=2.0)
+    scheduler = ScrollScheduler(tab=None, config=config)
+
+    assert scheduler.should_continue(0)
+    assert scheduler.settle_timeout == 2.0
+    assert scheduler.should_continue(0)
+    assert scheduler.settle_timeout == 3.0
+    assert scheduler.should_continue(5)
+    assert scheduler.settle_timeout == 1.0
+    assert scheduler.idle_steps == 0
+
+
+def test_tweet_data_from_extracted_entry():
+    entry = {**make_entry(7), "hashtags": ["#perf", "#python"], "details": "3 replies"}
+    entry["link"] = "https://x.com/fixture/status/7"
+
+    tweet = TweetData.from_extracted(entry)
+
+    assert tweet.datetime == "2025-01-10T00:15:00.000Z"
+    assert tweet.hashtag == "#perf #python"
+    assert tweet.details == "3 replies"
+    assert tweet.content == "tweet 7"
+    assert tweet.link == "https://x.com/fixture/status/7"
+
+
+async def test_dom_extraction_parses_each_article_once():
+    pinned = FakeArticle(99, pinned=True)
+    first = [pinned] + [FakeArticle(i) for i in range(3)]
+    second = first[:2] + [FakeArticle(3, detached=True)] + [FakeArticle(i) for i in range(4, 6)]
+    tab = FakeDomTab([first, second])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off(), extraction="dom")
+
+    links = await scraper.scrape_tweet_links(5, tab=tab, raise_on_error=True)
+
+    assert links == [f"https://x.com/fixture/status/{i}" for i in (0, 1, 2, 4, 5)]
+    assert tab.scrolls == 1
+    # The pinned check runs once per tweet, not again on later scroll steps
+    assert pinned.queries["//div"] == 1
+    assert first[1].queries == {"//a": 2, "//div": 1}
+
+
+async def test_iter_tweet_links_stops_scrolling_when_consumer_stops():
+    tab = FakeTimelineTab(
+        [[make_entry(i) for i in range(3 * step, 3 * step + 3)] for step in range(5)]
+    )
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    links = []
+    async for link in scraper.iter_tweet_links(total_tweets=100, tab=tab):
+        links.append(link)
+        if len(links) == 4:
+            break
+
+    assert len(links) == 4
+    assert tab.evaluations == 2
+    assert tab.scrolls == 1
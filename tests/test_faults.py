@@ -0,0 +1,153 @@
+"""
+Tests for resuming scrapes in fresh tabs when theirs crash or hang, using fake tabs
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from pydoll.exceptions import PageLoadTimeout
+
+from pydoll_scraper.core.cursor import MemoryCursorStore
+from pydoll_scraper.core.errors import TabFailedError
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.scraper import WebScraper
+from pydoll_scraper.core.scroll import ScrollConfig
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+from .test_extraction import FakeTimelineTab, make_entry
+from .test_scraper import FakePageTab, make_snapshot
+
+FAST_SCROLL = ScrollConfig(settle_timeout=0.01, max_settle_timeout=0.01, max_idle_steps=1)
+
+
+class HangingTab(FakeTimelineTab):
+    """Stops answering once it has run ``answers`` extractions"""
+
+    def __init__(self, batches, answers):
+        super().__init__(batches)
+        self.answers = answers
+
+    async def _execute_command(self, command):
+        if self.evaluations >= self.answers:
+            await asyncio.sleep(60)
+        return await super()._execute_command(command)
+
+
+class FlakyTab(FakeTimelineTab):
+    """Fails its first ``failures`` extractions; a dead tab fails the probe too"""
+
+    def __init__(self, batches, failures, dead=False):
+        super().__init__(batches)
+        self.failures = failures
+        self.dead = dead
+
+    async def _execute_command(self, command):
+        expression = command["params"]["expression"]
+        if expression == "1":
+            if self.dead:
+                raise ConnectionError("WebSocket is closed")
+            return {"result": {"result": {"type": "number", "value": 1}}}
+        if "emptyState" not in expression and self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("Cannot find context with specified id")
+        return await super()._execute_command(command)
+
+
+def tab_source(tabs):
+    """Tab source handing out ``tabs`` one per attempt"""
+    tabs = list(tabs)
+
+    @asynccontextmanager
+    async def open_tab():
+        yield tabs.pop(0)
+
+    return open_tab
+
+
+def links(ids):
+    return [f"https://x.com/fixture/status/{i}" for i in ids]
+
+
+async def test_hung_tab_resumes_in_a_fresh_tab_from_the_checkpoint():
+    first_page = [make_entry(i) for i in (9, 8, 7)]
+    both_pages = first_page + [make_entry(i) for i in (6, 5, 4)]
+    hung = HangingTab([first_page], answers=1)
+    # The fresh tab reloads the timeline; scrolling back past the three tweets
+    # already collected counts as progress even with max_idle_steps=1
+    fresh = FakeTimelineTab([first_page, both_pages])
+    scraper = XComScraper(
+        "fixture",
+        scroll_config=FAST_SCROLL,
+        resource_policy=ResourcePolicy.off(),
+        tabs=tab_source([hung, fresh]),
+        cdp_timeout=0.05,
+    )
+
+    result = await scraper.scrape_tweet_links(6, raise_on_error=True)
+
+    assert result == links([9, 8, 7, 6, 5, 4])
+    assert scraper.checkpoint.status == "complete"
+    assert scraper.checkpoint.resumes == 1
+    assert fresh.scrolls == 1
+
+
+async def test_tweets_so_far_are_kept_when_no_fresh_tab_is_left():
+    store = MemoryCursorStore()
+    await store.advance("fixture", 1)
+    tab = HangingTab([[make_entry(i) for i in (9, 8, 7)]], answers=1)
+    scraper = XComScraper(
+        "fixture", scroll_config=FAST_SCROLL, resource_policy=ResourcePolicy.off(), cdp_timeout=0.05
+    )
+
+    result = await scraper.scrape_new_tweet_links(store, 6, tab=tab, raise_on_error=True)
+
+    assert result == links([9, 8, 7])
+    outcome = scraper.checkpoint.outcome()
+    assert outcome["status"] == "partial"
+    assert outcome["error_type"] == "tab_failed"
+    assert "scroll got no answer" in outcome["error"]
+    # Tweets between the last one read and the cursor were never seen
+    assert await store.get("fixture") == 1
+
+
+async def test_step_errors_retry_in_place_unless_the_tab_died():
+    batch = [make_entry(i) for i in (3, 2, 1)]
+
+    flaky = FlakyTab([batch], failures=2)
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+    assert await scraper.scrape_tweet_links(3, tab=flaky, raise_on_error=True) == links([3, 2, 1])
+    assert scraper.checkpoint.status == "complete"
+
+    dead = FlakyTab([batch], failures=1, dead=True)
+    with pytest.raises(TabFailedError) as failed:
+        await scraper.scrape_tweet_links(3, tab=dead, raise_on_error=True)
+    assert failed.value.reason == "crashed"
+
+
+class CrashedPageTab(FakePageTab):
+    async def go_to(self, url, timeout=300):
+        raise ConnectionError("WebSocket is closed")
+
+    async def _execute_command(self, command):
+        raise ConnectionError("WebSocket is closed")
+
+
+class SlowPageTab(FakePageTab):
+    async def go_to(self, url, timeout=300):
+        raise PageLoadTimeout()
+
+
+async def test_pages_retry_crashed_tabs_and_read_slow_pages_as_they_are():
+    crashed, fresh = CrashedPageTab(make_snapshot()), FakePageTab(make_snapshot())
+    scraper = WebScraper(resource_policy=ResourcePolicy.off(), tabs=tab_source([crashed, fresh]))
+
+    page = await scraper.scrape_url("http://localhost/articles/1")
+
+    assert page.status == "complete"
+    assert fresh.navigations == [("http://localhost/articles/1", 30)]
+
+    slow = await scraper.scrape_url("http://localhost/articles/2", tab=SlowPageTab(make_snapshot()))
+
+    assert slow.status == "partial"
+    assert slow.content == "Body text"
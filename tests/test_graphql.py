@@ -0,0 +1,161 @@
+"""
+Tests for GraphQL timeline interception, using the recorded UserTweets fixture
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from pydoll_scraper.core.graphql import TimelineCapture, parse_user_tweets
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.scroll import ScrollConfig
+from pydoll_scraper.core.xcom_scraper import TweetData, XComScraper
+
+USER_TWEETS = Path(__file__).parents[1] / "benchmarks" / "fixtures" / "user_tweets.json"
+TIMELINE_URL = "https://x.com/i/api/graphql/FixtureQueryId/UserTweets?variables=%7B%7D"
+
+
+def load_user_tweets():
+    return json.loads(USER_TWEETS.read_text(encoding="utf-8"))
+
+
+def shifted_page(page):
+    """The recorded page with status IDs moved below the previous page's"""
+    body = USER_TWEETS.read_text(encoding="utf-8")
+    return body.replace('"17899999', f'"1789999{9 - page}').replace(
+        '"1790000000000000000"', f'"1789999{9 - page}00000000000"'
+    )
+
+
+class FakeApiTab:
+    """Loads one UserTweets page on navigation and one more per scroll step"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.callbacks = {}
+        self.network_events_enabled = False
+        self.scrolls = 0
+        self._connection_handler = SimpleNamespace(remove_callback=self._remove_callback)
+
+    async def on(self, event_name, callback, temporary=False):
+        self.callbacks[len(self.callbacks) + 1] = (event_name, callback)
+        return len(self.callbacks)
+
+    async def _remove_callback(self, callback_id):
+        return self.callbacks.pop(callback_id, None) is not None
+
+    async def enable_network_events(self):
+        self.network_events_enabled = True
+
+    async def disable_network_events(self):
+        self.network_events_enabled = False
+
+    async def go_to(self, url):
+        await self._load_next_page()
+
+    async def _execute_command(self, command):
+        if command["method"] == "Network.getResponseBody":
+            body = self.pages[int(command["params"]["requestId"])]
+            return {"result": {"body": body, "base64Encoded": False}}
+
+        self.scrolls += 1
+        await self._load_next_page()
+        value = {"added": 20, "step": 4000, "article_height": 250, "waited_ms": 5}
+        return {"result": {"result": {"type": "string", "value": json.dumps(value)}}}
+
+    async def _load_next_page(self):
+        request_id = str(self.scrolls)
+        if int(request_id) >= len(self.pages):
+            return
+        await self._emit(
+            "Network.responseReceived",
+            {"requestId": request_id, "response": {"url": TIMELINE_URL, "status": 200}},
+        )
+        await self._emit("Network.loadingFinished", {"requestId": request_id})
+
+    async def _emit(self, event_name, params):
+        for name, callback in list(self.callbacks.values()):
+            if name == event_name:
+                result = callback({"method": event_name, "params": params})
+                if asyncio.iscoroutine(result):
+                    await result
+
+
+def test_parse_recorded_user_tweets():
+    entries = parse_user_tweets(load_user_tweets(), "fixture")
+
+    assert entries[0]["pinned"] is True
+    assert not any(entry["pinned"] for entry in entries[1:])
+    assert all(entry["link"].startswith("/fixture/status/") for entry in entries)
+    # 20 items plus a two-tweet module, minus the retweet and the tombstone
+    assert len(entries) == 20
+
+    first = entries[1]
+    assert first["timestamp"].endswith(".000Z")
+    assert first["hashtags"] == ["#perf", "#scraping"]
+    assert first["details"].endswith("views")
+    assert not any("https://t.co/" in entry["text"] for entry in entries)
+    assert any(entry["text"] == "and a second part & more" for entry in entries)
+
+
+def test_parse_without_account_keeps_retweets():
+    entries = parse_user_tweets(load_user_tweets())
+
+    retweets = [entry for entry in entries if entry["retweet"]]
+    assert len(retweets) == 1
+    assert retweets[0]["text"].startswith("RT @other:")
+
+
+def test_parsed_entries_build_tweet_data():
+    entry = parse_user_tweets(load_user_tweets(), "fixture")[1]
+
+    tweet = TweetData.from_extracted(entry)
+
+    assert tweet.datetime == entry["timestamp"]
+    assert tweet.hashtag == "#perf #scraping"
+
+
+async def test_capture_ignores_other_responses():
+    tab = FakeApiTab([USER_TWEETS.read_text(encoding="utf-8")])
+
+    async with TimelineCapture(tab, "fixture") as capture:
+        await tab._emit(
+            "Network.responseReceived",
+            {"requestId": "9", "response": {"url": "https://x.com/i/api/1.1/jot", "status": 200}},
+        )
+        await tab._emit("Network.loadingFinished", {"requestId": "9"})
+        assert await capture.next_entries(timeout=0.01) == []
+
+        await tab.go_to("https://x.com/fixture")
+        assert len(await capture.next_entries(timeout=0.01)) == 20
+
+    assert tab.callbacks == {}
+    assert not tab.network_events_enabled
+
+
+async def test_intercepted_timeline_paginates_by_scrolling():
+    tab = FakeApiTab([shifted_page(page) for page in range(3)])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off(), extraction="graphql")
+
+    links = await scraper.scrape_tweet_links(45, tab=tab, raise_on_error=True)
+
+    assert len(links) == 45
+    assert len(set(links)) == 45
+    assert tab.scrolls == 2
+    assert links[0] == "https://x.com/fixture/status/1789999999999984162"
+
+
+async def test_intercepted_timeline_stops_when_pages_run_out():
+    tab = FakeApiTab([USER_TWEETS.read_text(encoding="utf-8")])
+    scraper = XComScraper(
+        "fixture",
+        resource_policy=ResourcePolicy.off(),
+        extraction="graphql",
+        scroll_config=ScrollConfig(settle_timeout=0.01, max_settle_timeout=0.01, max_idle_steps=2),
+    )
+
+    links = await scraper.scrape_tweet_links(100, tab=tab, raise_on_error=True)
+
+    assert len(links) == 19
+    assert tab.scrolls == 2
@@ -0,0 +1,254 @@
+"""
+Tests for the job queue, the job worker and the /jobs endpoints
+"""
+
+import asyncio
+import fnmatch
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from pydoll_scraper.api import main
+from pydoll_scraper.api.main import XComScrapeRequest
+from pydoll_scraper.core import worker as worker_module
+from pydoll_scraper.core.errors import AccountUnavailableError
+from pydoll_scraper.core.jobs import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    MemoryJobQueue,
+    RedisJobQueue,
+)
+from pydoll_scraper.core.worker import JobWorker
+
+from .test_api import fake_http_request
+
+
+@pytest.fixture
+def fake_tasks(monkeypatch):
+    """Replace run_task with one that scrapes nothing and records what it ran"""
+    calls = []
+    release = asyncio.Event()
+    release.set()
+
+    async def run_task(
+        kind,
+        payload,
+        pool=None,
+        cursor_store=None,
+        resource_policy=None,
+        rate_limiter=None,
+        cache=None,
+    ):
+        calls.append((kind, payload))
+        await release.wait()
+        if payload["account_name"] == "suspended":
+            raise AccountUnavailableError("account suspended")
+        return {"account": payload["account_name"], "count": 1, "links": ["link"]}
+
+    monkeypatch.setattr(worker_module, "run_task", run_task)
+    return calls, release
+
+
+async def start_worker(queue, concurrency=2):
+    worker = JobWorker(queue, concurrency=concurrency, claim_timeout=0.05)
+    return worker, asyncio.create_task(worker.run())
+
+
+async def test_worker_runs_jobs_and_records_results(fake_tasks):
+    calls, _ = fake_tasks
+    queue = MemoryJobQueue()
+    worker, task = await start_worker(queue)
+
+    ok = await queue.submit("xcom_links", {"account_name": "fixture"})
+    bad = await queue.submit("xcom_links", {"account_name": "suspended"})
+
+    ok_done = await queue.wait(ok.id, timeout=1)
+    bad_done = await queue.wait(bad.id, timeout=1)
+    worker.stop()
+    await task
+
+    assert ok_done.status == SUCCEEDED
+    assert ok_done.result["links"] == ["link"]
+    assert ok_done.started_at is not None and ok_done.finished_at is not None
+    assert bad_done.status == FAILED
+    assert "account suspended" in bad_done.error
+    assert bad_done.error_type == "unavailable"
+    assert ok_done.error_type is None
+    assert [payload["account_name"] for _, payload in calls] == ["fixture", "suspended"]
+
+
+async def test_wait_returns_unfinished_job_after_timeout(fake_tasks):
+    _, release = fake_tasks
+    release.clear()
+    queue = MemoryJobQueue()
+    worker, task = await start_worker(queue)
+
+    job = await queue.submit("xcom_links", {"account_name": "fixture"})
+    pending = await queue.wait(job.id, timeout=0.2)
+
+    assert pending.status == RUNNING
+    release.set()
+    assert (await queue.wait(job.id, timeout=1)).status == SUCCEEDED
+    worker.stop()
+    await task
+
+
+async def test_worker_limits_concurrency(fake_tasks):
+    calls, release = fake_tasks
+    release.clear()
+    queue = MemoryJobQueue()
+    worker, task = await start_worker(queue, concurrency=2)
+
+    for i in range(4):
+        await queue.submit("xcom_links", {"account_name": f"account{i}"})
+    await asyncio.sleep(0.2)
+
+    assert len(calls) == 2
+    release.set()
+    worker.stop()
+    await task
+    assert len(calls) == 2
+
+
+async def test_job_endpoints_submit_and_long_poll(fake_tasks):
+    queue = MemoryJobQueue()
+    worker, task = await start_worker(queue)
+    http_request = fake_http_request(job_queue=queue)
+
+    response = await main.submit_xcom_links_job(
+        XComScrapeRequest(account_name="fixture", total_tweets=5), http_request
+    )
+    submitted = json.loads(response.body)
+
+    assert response.status_code == 202
+    assert submitted["status_url"] == f"/jobs/{submitted['job_id']}"
+
+    job = await main.get_job(submitted["job_id"], http_request, wait=1)
+    assert job["status"] == SUCCEEDED
+    assert job["kind"] == "xcom_links"
+    assert job["result"]["account"] == "fixture"
+    worker.stop()
+    await task
+
+
+async def test_unknown_job_is_404():
+    with pytest.raises(HTTPException) as error:
+        await main.get_job("missing", fake_http_request(), wait=0)
+
+    assert error.value.status_code == 404
+
+
+class FakeRedis:
+    """The Redis commands RedisJobQueue uses, on dicts; keys never expire"""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    async def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    async def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    async def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop(0 if src == "LEFT" else -1)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    async def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        return await self.lmove(source, destination, src, dest)
+
+    async def scan_iter(self, match):
+        for key in [key for key in self.lists if fnmatch.fnmatchcase(key, match)]:
+            yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*a, **kw) for name, a, kw in self.calls]
+
+
+def redis_queue(client, max_attempts=2):
+    queue = RedisJobQueue("redis://localhost", max_attempts=max_attempts)
+    queue._client = client
+    return queue
+
+
+async def test_jobs_of_a_dead_worker_are_requeued_then_failed():
+    client = FakeRedis()
+    dead, alive = redis_queue(client), redis_queue(client)
+    job = await alive.submit("xcom_links", {"account_name": "fixture"})
+
+    assert (await dead.claim()).id == job.id
+    # Still heartbeating: its job is left alone
+    assert await alive.requeue_stale() == 0
+
+    del client.values[dead._alive_key(dead.consumer)]
+    assert await alive.requeue_stale() == 1
+    requeued = await alive.get(job.id)
+    assert (requeued.status, requeued.attempts) == (QUEUED, 1)
+
+    claimed = await alive.claim()
+    assert (claimed.id, claimed.attempts) == (job.id, 2)
+    del client.values[alive._alive_key(alive.consumer)]
+    await redis_queue(client).requeue_stale()
+
+    failed = await alive.get(job.id)
+    assert (failed.status, failed.error_type) == (FAILED, "crashed")
+    assert not any(client.lists.values())
+
+
+async def test_finished_jobs_leave_the_processing_list():
+    client = FakeRedis()
+    queue = redis_queue(client)
+    await queue.submit("xcom_links", {"account_name": "fixture"})
+
+    job = await queue.claim()
+    assert client.lists[queue._processing_key(queue.consumer)] == [job.id]
+    await queue.complete(job, {"links": []})
+
+    assert client.lists[queue._processing_key(queue.consumer)] == []
+    assert (await queue.get(job.id)).status == SUCCEEDED
@@ -0,0 +1,112 @@
+"""
+Tests for scrape timing spans and the Prometheus metrics endpoint
+"""
+
+import pytest
+
+from pydoll_scraper.api import main
+from pydoll_scraper.api.main import XComScrapeRequest
+from pydoll_scraper.core.browser_pool import BrowserPool
+from pydoll_scraper.core.metrics import (
+    ARTICLES_PARSED,
+    BROWSERS_LIVE,
+    SCROLL_STEPS,
+    STAGE_FAILURES,
+    STAGE_SECONDS,
+    TABS_LEASED,
+    MetricsRegistry,
+    collect_timings,
+    span,
+)
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+from .test_api import fake_http_request
+from .test_browser_pool import FakeBrowser
+from .test_extraction import FakeTimelineTab, make_entry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("path",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+    requests.inc(path="/a")
+    requests.inc(2, path='/"b"')
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/a"} 1' in text
+    assert 'requests_total{path="/\\"b\\""} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    with pytest.raises(ValueError):
+        requests.inc(method="GET")
+
+
+def test_span_records_duration_failures_and_timings():
+    count = STAGE_SECONDS.count(operation="test", stage="parse")
+    failures = STAGE_FAILURES.value(operation="test", stage="parse")
+
+    with collect_timings() as timings:
+        with span("test", "parse"):
+            pass
+        with pytest.raises(RuntimeError):
+            with span("test", "parse"):
+                raise RuntimeError("detached node")
+
+    assert STAGE_SECONDS.count(operation="test", stage="parse") == count + 2
+    assert STAGE_FAILURES.value(operation="test", stage="parse") == failures + 1
+    assert timings.to_dict()["stages"]["test.parse"]["calls"] == 2
+
+
+async def test_scrape_counts_scroll_steps_and_articles():
+    tab = FakeTimelineTab([[make_entry(i) for i in range(3)], [make_entry(i) for i in range(6)]])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+    steps, parsed = SCROLL_STEPS.value(), ARTICLES_PARSED.value(extraction="script")
+
+    with collect_timings() as timings:
+        await scraper.scrape_tweets_content(5, tab=tab)
+
+    assert SCROLL_STEPS.value() == steps + 1
+    assert ARTICLES_PARSED.value(extraction="script") == parsed + 9
+    assert {"xcom.extract", "xcom.scroll"} <= set(timings.to_dict()["stages"])
+
+
+async def test_pool_tracks_live_browsers_and_leased_tabs():
+    browsers, leased = BROWSERS_LIVE.value(), TABS_LEASED.value()
+    pool = BrowserPool(browsers=2, tabs_per_browser=1, browser_factory=FakeBrowser)
+
+    await pool.start()
+    async with pool.lease():
+        assert TABS_LEASED.value() == leased + 1
+    assert BROWSERS_LIVE.value() == browsers + 2
+    await pool.close()
+
+    assert BROWSERS_LIVE.value() == browsers
+    assert TABS_LEASED.value() == leased
+
+
+async def test_links_timings_and_metrics_endpoint(monkeypatch):
+    async def scrape_tweet_links(self, total_tweets=25, tab=None, raise_on_error=False):
+        with span("xcom", "go_to"):
+            pass
+        return [f"https://x.com/{self.account_name}/status/1"]
+
+    monkeypatch.setattr(XComScraper, "scrape_tweet_links", scrape_tweet_links)
+    http_request = fake_http_request()
+
+    plain = await main.scrape_xcom_links(XComScrapeRequest(account_name="fixture"), http_request)
+    timed = await main.scrape_xcom_links(
+        XComScrapeRequest(account_name="fixture", timings=True), http_request
+    )
+
+    assert "timings" not in plain
+    assert timed["timings"]["stages"]["xcom.go_to"]["calls"] == 1
+
+    response = await main.metrics()
+    assert response.media_type.startswith("text/plain")
+    assert b'scraper_stage_seconds_count{operation="xcom",stage="go_to"}' in response.body
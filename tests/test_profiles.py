@@ -0,0 +1,107 @@
+"""
+Tests for persistent browser profiles, using in-memory fakes instead of Chrome
+"""
+
+import json
+
+import pytest
+
+from pydoll_scraper.core.browser_pool import BrowserPool
+from pydoll_scraper.core.profiles import ProfileManager
+
+from .test_browser_pool import FakeBrowser, FakeTab
+
+
+class CookieBrowser(FakeBrowser):
+    """Fake browser with a cookie jar and a start tab that records navigations"""
+
+    def __init__(self):
+        super().__init__()
+        self.cookies = []
+        self.start_tab = None
+
+    async def start(self, headless=False):
+        self.start_tab = NavigatingTab(self)
+        return self.start_tab
+
+    async def get_cookies(self):
+        return list(self.cookies)
+
+    async def set_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+
+class NavigatingTab(FakeTab):
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.urls = []
+
+    async def go_to(self, url, timeout=300):
+        self.urls.append(url)
+
+
+async def test_profiles_are_locked_and_handed_out_lowest_first(tmp_path):
+    manager = ProfileManager(tmp_path)
+    other_process = ProfileManager(tmp_path)
+
+    first = await manager.acquire()
+    second = await manager.acquire()
+    assert (first.name, second.name) == ("profile-0", "profile-1")
+    assert other_process.try_acquire("profile-0") is None
+
+    with pytest.raises(TimeoutError):
+        await other_process.acquire("profile-1", timeout=0.05)
+
+    first.release()
+    again = await other_process.acquire()
+    assert again.name == "profile-0"
+    assert again.path == first.path
+
+    with pytest.raises(ValueError):
+        manager.try_acquire("../elsewhere")
+
+
+async def test_cookies_survive_a_relaunch(tmp_path):
+    profile = await ProfileManager(tmp_path).acquire()
+    browser = CookieBrowser()
+    browser.cookies = [
+        {"name": "sid", "value": "1", "domain": ".x.com", "expires": -1, "session": True},
+        {"name": "ct0", "value": "2", "domain": ".x.com", "expires": 1900000000, "size": 5},
+    ]
+
+    assert await profile.save_cookies(browser) == 2
+    relaunched = CookieBrowser()
+    assert await profile.load_cookies(relaunched) == 2
+
+    assert relaunched.cookies == [
+        {"name": "sid", "value": "1", "domain": ".x.com"},
+        {"name": "ct0", "value": "2", "domain": ".x.com", "expires": 1900000000},
+    ]
+    assert json.loads(profile.cookies_path.read_text())[0]["name"] == "sid"
+
+
+async def test_pool_keeps_each_browser_on_its_own_warm_profile(tmp_path):
+    manager = ProfileManager(tmp_path)
+    pool = BrowserPool(
+        browsers=2,
+        browser_factory=CookieBrowser,
+        profiles=manager,
+        warm_urls=["https://x.com/"],
+    )
+    await pool.start()
+    slots = pool._slots
+    assert sorted(slot.profile.name for slot in slots) == ["pool-0", "pool-1"]
+    assert all(slot.browser.start_tab.urls == ["https://x.com/", "about:blank"] for slot in slots)
+
+    slots[0].browser.cookies = [{"name": "sid", "value": "1", "domain": ".x.com"}]
+    profile = slots[0].profile
+    slots[0].browser.crashed = True
+    async with pool.lease():
+        pass
+
+    assert slots[0].profile is profile
+    assert slots[0].browser.cookies == [{"name": "sid", "value": "1", "domain": ".x.com"}]
+    assert slots[0].browser.start_tab.urls == []
+
+    await pool.close()
+    assert manager.try_acquire("pool-0") is not None
@@ -0,0 +1,187 @@
+"""
+Tests for per-host rate limiting, adaptive backoff and typed throttling errors
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from pydoll_scraper.api import main
+from pydoll_scraper.api.main import XComScrapeRequest
+from pydoll_scraper.config import Settings
+from pydoll_scraper.core.errors import AccountUnavailableError, RateLimitedError
+from pydoll_scraper.core.ratelimit import (
+    HostRateLimiter,
+    MemoryRateLimitBackend,
+    create_rate_limiter,
+)
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.tasks import links_result, scrape_links
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+from .test_api import fake_http_request
+from .test_extraction import FakeTimelineTab, make_entry
+from .test_graphql import TIMELINE_URL, FakeApiTab
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class StateTab(FakeTimelineTab):
+    """Profile page that rendered no articles, only the given panels"""
+
+    def __init__(self, empty=None, error=None, login=False):
+        super().__init__([])
+        self.state = {"articles": 0, "empty": empty, "error": error, "login": login}
+
+    def timeline_state(self):
+        return self.state
+
+
+class ThrottledApiTab(FakeApiTab):
+    """Answers the timeline request with 429"""
+
+    async def _load_next_page(self):
+        response = {"url": TIMELINE_URL, "status": 429, "headers": {"retry-after": "42"}}
+        await self._emit("Network.responseReceived", {"requestId": "0", "response": response})
+
+
+class FakePool:
+    """Leases the given tabs one after the other"""
+
+    headless = True
+
+    def __init__(self, tabs):
+        self.tabs = list(tabs)
+        self.leases = 0
+
+    @asynccontextmanager
+    async def lease(self):
+        self.leases += 1
+        yield self.tabs.pop(0)
+
+
+async def test_bucket_allows_burst_then_paces():
+    clock = Clock()
+    backend = MemoryRateLimitBackend(clock)
+
+    assert [await backend.take("x.com", rate=0.5, burst=2) for _ in range(2)] == [0, 0]
+    assert await backend.take("x.com", rate=0.5, burst=2) == pytest.approx(2.0)
+    assert await backend.take("example.com", rate=0.5, burst=2) == 0
+
+    clock.now += 2
+    assert await backend.take("x.com", rate=0.5, burst=2) == 0
+
+    await backend.block("x.com", 30)
+    clock.now += 10
+    assert await backend.take("x.com", rate=0.5, burst=2) == pytest.approx(20.0)
+
+
+async def test_throttling_halves_rate_and_backs_off_with_jitter():
+    limiter = HostRateLimiter(rate_per_minute=60, backoff=10, max_backoff=15)
+
+    first = await limiter.throttled("x.com")
+    second = await limiter.throttled("x.com")
+
+    assert 5 <= first <= 10
+    assert 7.5 <= second <= 15
+    assert limiter.rate_per_minute("x.com") == pytest.approx(15)
+    assert await limiter.throttled("x.com", retry_after=3) == 3
+    assert limiter.rate_per_minute("x.com") == pytest.approx(7.5)
+
+    limiter.succeeded("x.com")
+    assert limiter.rate_per_minute("x.com") == pytest.approx(13.5)
+    assert limiter.rate_per_minute("example.com") == 60
+
+
+def test_worker_processes_share_the_in_memory_rate():
+    settings = Settings(host_rate_per_minute=30, host_burst=5)
+
+    single = create_rate_limiter(settings)
+    shared = create_rate_limiter(settings, processes=4)
+
+    assert (single.rate_per_minute("x.com"), single.burst) == (30, 5)
+    assert (shared.rate_per_minute("x.com"), shared.burst) == (7.5, 1)
+
+
+async def test_page_state_is_typed():
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    with pytest.raises(RateLimitedError, match="Something went wrong"):
+        await scraper.scrape_tweet_links(
+            tab=StateTab(error="Something went wrong. Try reloading."), raise_on_error=True
+        )
+    with pytest.raises(RateLimitedError, match="did not render"):
+        await scraper.scrape_tweet_links(tab=StateTab(), raise_on_error=True)
+    with pytest.raises(AccountUnavailableError):
+        await scraper.scrape_tweet_links(
+            tab=StateTab(empty="This account doesn’t exist\nTry searching for another."),
+            raise_on_error=True,
+        )
+
+    no_tweets = StateTab(empty="@fixture hasn’t posted")
+    assert await scraper.scrape_tweet_links(tab=no_tweets, raise_on_error=True) == []
+    assert no_tweets.evaluations == 0
+
+
+async def test_intercepted_429_is_rate_limited():
+    scraper = XComScraper("fixture", extraction="graphql", resource_policy=ResourcePolicy.off())
+
+    with pytest.raises(RateLimitedError) as raised:
+        await scraper.scrape_tweet_links(5, tab=ThrottledApiTab([]), raise_on_error=True)
+
+    assert raised.value.retry_after == 42
+
+
+async def test_throttled_scrape_is_retried_on_a_fresh_lease():
+    limiter = HostRateLimiter(backoff=0.01, max_retries=2)
+    pool = FakePool([StateTab(error="Rate limit exceeded"), FakeTimelineTab([[make_entry(1)]])])
+
+    links = await scrape_links(
+        pool, "fixture", 1, resource_policy=ResourcePolicy.off(), rate_limiter=limiter
+    )
+
+    assert links == ["https://x.com/fixture/status/1"]
+    assert pool.leases == 2
+    assert limiter.rate_per_minute("x.com") == pytest.approx(18)
+
+
+async def test_throttled_task_is_retried_in_one_layer(monkeypatch):
+    attempts = []
+
+    async def iter_tweet_links(self, total_tweets=25, tab=None, since_id=None):
+        attempts.append(self.tabs)
+        raise RateLimitedError("Timeline API rate limited")
+        yield
+
+    monkeypatch.setattr(XComScraper, "iter_tweet_links", iter_tweet_links)
+    limiter = HostRateLimiter(backoff=0.01, max_retries=2)
+
+    with pytest.raises(RateLimitedError):
+        await links_result(None, "nasa", 5, rate_limiter=limiter)
+
+    assert attempts == [None, None, None]
+
+
+async def test_api_tells_throttled_from_unavailable(monkeypatch):
+    async def scrape_tweet_links(self, total_tweets=25, tab=None, raise_on_error=False):
+        if self.account_name == "gone":
+            raise AccountUnavailableError("@gone: Account suspended")
+        raise RateLimitedError("Timeline API rate limited", retry_after=12.2)
+
+    monkeypatch.setattr(XComScraper, "scrape_tweet_links", scrape_tweet_links)
+
+    with pytest.raises(HTTPException) as throttled:
+        await main.scrape_xcom_links(XComScrapeRequest(account_name="busy"), fake_http_request())
+    with pytest.raises(HTTPException) as gone:
+        await main.scrape_xcom_links(XComScrapeRequest(account_name="gone"), fake_http_request())
+
+    assert throttled.value.status_code == 429
+    assert throttled.value.headers == {"Retry-After": "13"}
+    assert gone.value.status_code == 404
@@ -0,0 +1,121 @@
+"""
+Tests for resource blocking, using a fake tab that records CDP commands
+"""
+
+from types import SimpleNamespace
+
+from pydoll.browser.options import ChromiumOptions
+
+from pydoll_scraper.config import Settings
+from pydoll_scraper.core.resources import (
+    LIGHTWEIGHT_CHROME_ARGS,
+    ResourcePolicy,
+    add_lightweight_arguments,
+    blocking_resources,
+)
+
+
+class FakeNetworkTab:
+    def __init__(self):
+        self.commands = []
+        self.callbacks = {}
+        self.network_enabled = False
+        self._connection_handler = SimpleNamespace(remove_callback=self._remove_callback)
+
+    async def on(self, event_name, callback, temporary=False):
+        callback_id = len(self.callbacks) + 1
+        self.callbacks[callback_id] = (event_name, callback)
+        return callback_id
+
+    async def _remove_callback(self, callback_id):
+        return self.callbacks.pop(callback_id, None) is not None
+
+    async def _execute_command(self, command):
+        self.commands.append(command)
+        return {}
+
+    async def enable_network_events(self):
+        self.network_enabled = True
+
+    async def disable_network_events(self):
+        self.network_enabled = False
+
+    async def disable_fetch_events(self):
+        self.commands.append({"method": "Fetch.disable"})
+
+    async def emit(self, event_name, params):
+        for name, callback in list(self.callbacks.values()):
+            if name == event_name:
+                result = callback({"method": event_name, "params": params})
+                if result is not None:
+                    await result
+
+
+async def test_blocklist_is_applied_and_reset():
+    tab = FakeNetworkTab()
+    policy = ResourcePolicy(block_url_patterns=("*.png",))
+
+    async with blocking_resources(tab, policy) as stats:
+        assert tab.network_enabled
+        await tab.emit("Network.loadingFinished", {"requestId": "1", "encodedDataLength": 2048})
+        await tab.emit(
+            "Network.loadingFailed",
+            {"requestId": "2", "type": "Image", "blockedReason": "inspector"},
+        )
+        await tab.emit("Network.loadingFailed", {"requestId": "3", "errorText": "net::ERR_FAILED"})
+
+    blocked_urls = [
+        c["params"]["urls"] for c in tab.commands if c["method"].endswith("BlockedURLs")
+    ]
+    assert blocked_urls == [["*.png"], []]
+    assert not tab.network_enabled
+    assert tab.callbacks == {}
+    assert stats.loaded_requests == 1
+    assert stats.transferred_bytes == 2048
+    assert stats.blocked_requests == {"Image": 1}
+    assert stats.estimated_saved_bytes > 0
+
+
+async def test_interception_fails_paused_requests():
+    tab = FakeNetworkTab()
+    policy = ResourcePolicy(block_url_patterns=(), block_types=("Image", "Font"), intercept=True)
+
+    async with blocking_resources(tab, policy):
+        enable = next(c for c in tab.commands if c["method"] == "Fetch.enable")
+        assert [p["resourceType"] for p in enable["params"]["patterns"]] == ["Image", "Font"]
+        await tab.emit("Fetch.requestPaused", {"requestId": "interception-1"})
+
+    failed = [c for c in tab.commands if c["method"] == "Fetch.failRequest"]
+    assert failed[0]["params"] == {
+        "requestId": "interception-1",
+        "errorReason": "BlockedByClient",
+    }
+    assert tab.commands[-1]["method"] == "Fetch.disable"
+
+
+async def test_disabled_policy_leaves_tab_untouched():
+    tab = FakeNetworkTab()
+
+    async with blocking_resources(tab, ResourcePolicy.off()) as stats:
+        pass
+
+    assert tab.commands == []
+    assert not tab.network_enabled
+    assert stats.blocked_total == 0
+
+
+def test_lightweight_arguments():
+    options = ChromiumOptions()
+    add_lightweight_arguments(options, ResourcePolicy())
+
+    assert set(LIGHTWEIGHT_CHROME_ARGS) <= set(options.arguments)
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+
+    plain = ChromiumOptions()
+    add_lightweight_arguments(plain, ResourcePolicy.off())
+    assert plain.arguments == []
+
+
+def test_policy_from_settings():
+    assert not ResourcePolicy.from_settings(Settings(block_resources=False)).enabled
+    assert ResourcePolicy.from_settings(Settings(block_by_type=True)).intercept
@@ -0,0 +1,116 @@
+"""
+Tests for priority and deadline-aware scheduling of scrapes onto shared slots
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from pydoll_scraper.api import main
+from pydoll_scraper.api.main import XComScrapeRequest
+from pydoll_scraper.core.errors import OverloadedError
+from pydoll_scraper.core.metrics import QUEUE_WAIT_SECONDS, REQUESTS_SHED
+from pydoll_scraper.core.scheduler import CostModel, ScrapeScheduler
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+from .test_api import fake_http_request
+from .test_ratelimit import Clock
+
+
+def scheduler(slots, clock=None, **kwargs):
+    cost_model = CostModel(setup_seconds=5.0, seconds_per_tweet=0.1)
+    return ScrapeScheduler(slots, cost_model=cost_model, clock=clock or Clock(), **kwargs)
+
+
+async def test_interactive_requests_keep_a_slot_and_go_first():
+    slots = scheduler(2, reserved=1)
+    backfill = await slots.acquire("bulk", 1000)
+
+    # The last free slot is reserved, so a second bulk request queues...
+    queued_bulk = asyncio.create_task(slots.acquire("bulk", 10))
+    await asyncio.sleep(0)
+    assert slots.stats()["queued"] == {"interactive": 0, "bulk": 1}
+
+    # ...while an interactive one starts right away, and the next one queues ahead of it
+    dashboard = await slots.acquire("interactive", 25)
+    queued_interactive = asyncio.create_task(slots.acquire("interactive", 25))
+    await asyncio.sleep(0)
+
+    slots.release(backfill)
+    assert slots.stats()["running"] == {"interactive": 2, "bulk": 0}
+    second = await queued_interactive
+
+    slots.release(dashboard)
+    assert not queued_bulk.done()
+    slots.release(second)
+    assert (await queued_bulk).priority == "bulk"
+    assert QUEUE_WAIT_SECONDS.count(priority="bulk") >= 2
+
+
+async def test_requests_that_cannot_meet_their_deadline_are_shed_early():
+    clock = Clock()
+    slots = scheduler(1, clock=clock, max_queue=1)
+    running = await slots.acquire("interactive", 100)  # estimated 15s
+
+    # Starts right away: admitted even though its estimate exceeds the deadline
+    assert slots.estimate(100) == 15.0
+    with pytest.raises(OverloadedError) as shed:
+        await slots.acquire("interactive", 100, deadline=20)
+    assert shed.value.retry_after == 15.0
+    assert REQUESTS_SHED.value(priority="interactive", reason="deadline") >= 1
+
+    waiting = asyncio.create_task(slots.acquire("interactive", 0, deadline=30))
+    await asyncio.sleep(0)
+    with pytest.raises(OverloadedError, match="queued"):
+        await slots.acquire("interactive", 0)
+
+    slots.release(running)
+    assert (await waiting).tweets == 0
+
+
+async def test_queued_request_gives_up_once_its_deadline_is_out_of_reach():
+    slots = scheduler(1)
+    slots.cost_model.setup_seconds = 0.05
+    running = await slots.acquire("bulk", 0)
+
+    # Fits when admitted, but the running scrape overruns its estimate
+    with pytest.raises(OverloadedError, match="no slot in time"):
+        await slots.acquire("interactive", 0, deadline=0.2)
+
+    assert slots.stats()["queued"]["interactive"] == 0
+    slots.release(running)
+
+
+def test_cost_model_learns_from_finished_scrapes():
+    model = CostModel(setup_seconds=5.0, seconds_per_tweet=0.2, smoothing=0.5)
+
+    model.observe(100, 5.0 + 100 * 0.6)
+
+    assert model.seconds_per_tweet == pytest.approx(0.4)
+    assert model.estimate(50) == pytest.approx(25.0)
+
+
+async def test_shed_request_fails_with_429_and_retry_after(monkeypatch):
+    async def scrape_tweet_links(self, total_tweets=25, tab=None, raise_on_error=False):
+        return []
+
+    monkeypatch.setattr(XComScraper, "scrape_tweet_links", scrape_tweet_links)
+    slots = scheduler(1)
+    backfill = await slots.acquire("bulk", 1000)  # estimated 105s
+    http_request = fake_http_request(scheduler=slots)
+
+    with pytest.raises(HTTPException) as failed:
+        await main.scrape_xcom_links(
+            XComScrapeRequest(account_name="fixture", deadline=30), http_request
+        )
+
+    assert failed.value.status_code == 429
+    assert failed.value.headers == {"Retry-After": "105"}
+
+    slots.release(backfill)
+    response = await main.scrape_xcom_links(
+        XComScrapeRequest(account_name="fixture", deadline=30), http_request
+    )
+    assert response["success"]
+    assert slots.stats()["running"] == {"interactive": 0, "bulk": 0}
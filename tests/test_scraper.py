@@ -0,0 +1,71 @@
+"""
+Tests for the single-snapshot page extraction of WebScraper, using a fake tab
+"""
+
+import json
+
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.scraper import WebScraper
+
+
+class FakePageTab:
+    """Answers the snapshot script with a canned page"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.navigations = []
+        self.commands = []
+
+    async def go_to(self, url, timeout=300):
+        self.navigations.append((url, timeout))
+
+    async def _execute_command(self, command):
+        self.commands.append(command)
+        value = json.dumps(self.snapshot)
+        return {"result": {"result": {"type": "string", "value": value}}}
+
+
+def make_snapshot(**selected):
+    return {
+        "title": "Fixture article",
+        "ready_state": "complete",
+        "waited_ms": 512.0,
+        "meta": {"description": "Synthetic", "og:title": "Fixture", "keywords": "a,b"},
+        "selected": {"title": ["Fixture article"], "content": ["  Body text  "], **selected},
+    }
+
+
+async def test_page_is_read_in_one_snapshot_with_custom_selectors():
+    tab = FakePageTab(make_snapshot(headings=["First", "Second"], broken=None))
+    scraper = WebScraper(timeout=15, resource_policy=ResourcePolicy.off())
+
+    page = await scraper.scrape_url(
+        "http://localhost/articles/1", {"headings": "h2", "broken": "!!"}, tab=tab
+    )
+
+    assert tab.navigations == [("http://localhost/articles/1", 15)]
+    assert len(tab.commands) == 1
+    params = tab.commands[0]["params"]
+    assert params["awaitPromise"] is True
+    assert '"headings": "h2"' in params["expression"]
+    assert '"content": "body"' in params["expression"]
+
+    assert page.title == "Fixture article"
+    assert page.content == "Body text"
+    assert page.metadata["og:title"] == "Fixture"
+    assert page.selected == {"headings": ["First", "Second"], "broken": None}
+    assert "http://localhost/articles/1" in scraper.scraped_data
+
+
+async def test_title_and_content_selectors_fall_back():
+    snapshot = make_snapshot()
+    snapshot["selected"] = {"title": [], "content": []}
+    scraper = WebScraper(resource_policy=ResourcePolicy.off())
+
+    page = await scraper.scrape_url(
+        "http://localhost/", {"title": "h1", "content": "main"}, tab=FakePageTab(snapshot)
+    )
+
+    assert page.title == "Fixture article"
+    assert page.content == "No content found"
+    assert page.selected == {}
@@ -0,0 +1,103 @@
+"""
+Tests for the SQLite and rotating JSONL writers and the batched output sink
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.sinks import OutputSink, open_sink
+from pydoll_scraper.core.writers import JsonlWriter, open_writer
+from pydoll_scraper.core.xcom_scraper import XComScraper
+
+from .test_extraction import FakeTimelineTab, make_entry
+
+
+def stored_rows(path):
+    with sqlite3.connect(path) as connection:
+        mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        rows = connection.execute("SELECT key, data FROM records ORDER BY key").fetchall()
+    return mode, {key: json.loads(data) for key, data in rows}
+
+
+def test_sqlite_upserts_on_status_id(tmp_path):
+    path = tmp_path / "tweets.sqlite"
+
+    with open_writer(path) as writer:
+        writer.write({"account": "fixture", "link": "/fixture/status/1"})
+        writer.write_all(
+            [
+                {"account": "fixture", "link": "/fixture/status/1", "content": "first"},
+                {"account": "fixture", "link": "/fixture/status/2", "content": "second"},
+                {"url": "https://example.com/", "title": "Example"},
+            ]
+        )
+    with open_writer(path, append=True) as writer:
+        writer.write({"link": "/fixture/status/2", "content": "edited"})
+
+    mode, rows = stored_rows(path)
+    assert mode == "wal"
+    assert rows == {
+        "1": {"account": "fixture", "link": "/fixture/status/1", "content": "first"},
+        "2": {"account": "fixture", "link": "/fixture/status/2", "content": "edited"},
+        "https://example.com/": {"url": "https://example.com/", "title": "Example"},
+    }
+
+
+def test_jsonl_rotates_and_appends_after_the_last_file(tmp_path):
+    path = tmp_path / "links.jsonl"
+    row = {"link": "/fixture/status/1234567890"}
+    line_bytes = len(json.dumps(row)) + 1
+
+    with open_writer(path, rotate_bytes=line_bytes * 2) as writer:
+        writer.write_all([row] * 5)
+        assert [p.name for p in writer.rotated_files()] == [
+            "links.00000.jsonl",
+            "links.00001.jsonl",
+        ]
+    with open_writer(path, append=True, rotate_bytes=line_bytes * 2) as writer:
+        writer.write(row)
+
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["links.00000.jsonl", "links.00001.jsonl", "links.00002.jsonl", "links.jsonl"]
+    assert sum(len(p.read_text().splitlines()) for p in tmp_path.iterdir()) == 6
+
+
+class ThreadRecordingWriter(JsonlWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = set()
+
+    def write_all(self, records):
+        self.threads.add(threading.current_thread())
+        return super().write_all(records)
+
+
+async def test_sink_writes_batches_off_the_event_loop(tmp_path):
+    writer = ThreadRecordingWriter(tmp_path / "rows.jsonl")
+
+    async with OutputSink(writer, batch_size=3, flush_interval=0.05) as sink:
+        for i in range(4):
+            await sink.write({"link": f"/fixture/status/{i}"})
+        await asyncio.sleep(0.2)
+        assert sink.count == 4
+        await sink.write({"link": "/fixture/status/4"})
+
+    assert len(writer.path.read_text().splitlines()) == 5
+    assert threading.main_thread() not in writer.threads
+
+
+async def test_scraper_writes_tweets_to_its_sink(tmp_path):
+    path = tmp_path / "tweets.sqlite"
+    tab = FakeTimelineTab([[make_entry(2), make_entry(1)]])
+
+    async with open_sink(path, append=False) as sink:
+        scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off(), sink=sink)
+        tweets = [tweet async for tweet in scraper.iter_tweets(2, tab=tab)]
+
+    _, rows = stored_rows(path)
+    assert len(tweets) == 2
+    assert sorted(rows) == ["1", "2"]
+    assert rows["2"]["account"] == "fixture"
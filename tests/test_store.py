@@ -0,0 +1,92 @@
+"""
+Tests for the ordered result store and the streaming record writers
+"""
+
+import json
+
+import pytest
+
+from pydoll_scraper.core.resources import ResourcePolicy
+from pydoll_scraper.core.scraper import ScrapedData, WebScraper
+from pydoll_scraper.core.writers import open_writer
+from pydoll_scraper.core.xcom_scraper import TweetData, XComScraper, tweet_store
+
+from .test_extraction import FakeTimelineTab, make_entry
+
+
+def make_tweet(status_id):
+    return TweetData("2025-01-10", None, None, f"tweet {status_id}", f"/fixture/status/{status_id}")
+
+
+def test_store_keeps_order_and_drops_repeats_across_spills(tmp_path):
+    store = tweet_store(max_in_memory=3, spill_dir=str(tmp_path))
+
+    added = store.extend(make_tweet(i) for i in [5, 4, 3, 4, 2, 1, 5, 0])
+
+    assert added == 6
+    assert len(store) == 6
+    assert store.spilled == 3
+    assert [tweet.status_id for tweet in store] == [5, 4, 3, 2, 1, 0]
+    assert 3 in store and 9 not in store
+
+    store.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_records_are_slotted():
+    with pytest.raises(AttributeError):
+        make_tweet(1).extra = True
+
+
+def test_jsonl_writer_streams_store(tmp_path):
+    store = tweet_store(max_in_memory=2, spill_dir=str(tmp_path))
+    store.extend(make_tweet(i) for i in range(5))
+
+    with open_writer(tmp_path / "tweets.jsonl") as writer:
+        assert store.write_to(writer) == 5
+
+    lines = (tmp_path / "tweets.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["content"] for line in lines] == [f"tweet {i}" for i in range(5)]
+    with pytest.raises(ValueError):
+        open_writer(tmp_path / "tweets.csv")
+
+
+def test_msgpack_writer(tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+
+    with open_writer(tmp_path / "tweets.msgpack") as writer:
+        writer.write_all([make_tweet(1), {"link": "/fixture/status/2"}])
+
+    with open(tmp_path / "tweets.msgpack", "rb") as f:
+        records = list(msgpack.Unpacker(f))
+    assert [record["link"] for record in records] == ["/fixture/status/1", "/fixture/status/2"]
+
+
+def test_web_scraper_results_are_bounded_and_saved_as_before(tmp_path):
+    scraper = WebScraper(max_results_in_memory=2)
+    pages = [
+        ScrapedData(f"https://example.com/{i}", f"Page {i}", "Body", "2025-01-01", {"k": "v"})
+        for i in range(4)
+    ]
+    for page in pages + pages[:1]:
+        scraper.scraped_data.add(page)
+
+    scraper.save_to_json(str(tmp_path / "pages.json"))
+
+    saved = (tmp_path / "pages.json").read_text(encoding="utf-8")
+    expected = scraper.get_scraped_data()
+    assert saved == json.dumps(expected, indent=2, ensure_ascii=False)
+    assert [page["url"] for page in expected] == [page.url for page in pages]
+    assert scraper.scraped_data.spilled == 2
+    assert scraper.save_results(tmp_path / "pages.jsonl") == 4
+
+
+async def test_export_tweets_streams_in_timeline_order(tmp_path):
+    tab = FakeTimelineTab([[make_entry(i) for i in range(3)], [make_entry(i) for i in range(6)]])
+    scraper = XComScraper("fixture", resource_policy=ResourcePolicy.off())
+
+    written = await scraper.export_tweets(tmp_path / "tweets.jsonl", total_tweets=5, tab=tab)
+
+    lines = (tmp_path / "tweets.jsonl").read_text(encoding="utf-8").splitlines()
+    assert written == 5
+    assert [json.loads(line)["content"] for line in lines] == [f"tweet {i}" for i in range(5)]
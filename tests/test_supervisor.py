@@ -0,0 +1,99 @@
+"""
+Tests for routing scrapes to worker processes and restarting the ones that die
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from pydoll_scraper.config import Settings
+from pydoll_scraper.core.errors import RateLimitedError, WorkerCrashedError
+from pydoll_scraper.core.metrics import collect_timings, span
+from pydoll_scraper.core.supervisor import ProcessSupervisor
+
+
+async def fake_run_task(
+    kind, payload, pool, cursor_store, resource_policy, rate_limiter, cache=None
+):
+    if kind == "throttled":
+        raise RateLimitedError("Timeline API rate limited", retry_after=12)
+    if kind == "crash":
+        os._exit(1)
+    if kind == "hang":
+        # Blocks the worker's event loop, so its heartbeats stop
+        time.sleep(60)
+    with span(kind, "sleep"):
+        await asyncio.sleep(payload.get("sleep", 0))
+    return {"pid": os.getpid(), "pool": pool is not None, **payload}
+
+
+async def fake_iter_task(kind, payload, pool, cursor_store, resource_policy, rate_limiter):
+    for i in range(payload["total_tweets"]):
+        yield {"content": f"tweet {i}"}
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    settings = Settings(
+        pool_browsers=0, cursor_db_path=str(tmp_path / "cursors.sqlite3"), worker_processes=2
+    )
+    return ProcessSupervisor(
+        settings,
+        processes=2,
+        heartbeat_timeout=1.0,
+        start_timeout=30.0,
+        heartbeat_interval=0.1,
+        task_runner=fake_run_task,
+        stream_runner=fake_iter_task,
+    )
+
+
+async def test_tasks_are_spread_over_processes(supervisor):
+    async with supervisor:
+        results = await asyncio.gather(
+            *(supervisor.run_task("xcom_links", {"n": n, "sleep": 0.2}) for n in range(4))
+        )
+        tweets = [
+            tweet async for tweet in supervisor.iter_task("xcom_content", {"total_tweets": 3})
+        ]
+        with pytest.raises(RateLimitedError) as throttled:
+            await supervisor.run_task("throttled", {})
+        health = supervisor.health()
+
+    assert [result["n"] for result in results] == [0, 1, 2, 3]
+    assert len({result["pid"] for result in results}) == 2
+    assert os.getpid() not in {result["pid"] for result in results}
+    assert [tweet["content"] for tweet in tweets] == ["tweet 0", "tweet 1", "tweet 2"]
+    assert throttled.value.retry_after == 12
+    assert health["ready"] == 2
+    assert all(worker["tasks"] == 0 for worker in health["workers"])
+
+
+async def test_dead_and_hung_workers_are_replaced(supervisor):
+    async with supervisor:
+        with pytest.raises(WorkerCrashedError, match="exited"):
+            await supervisor.run_task("crash", {})
+        with pytest.raises(WorkerCrashedError, match="heartbeat"):
+            await supervisor.run_task("hang", {})
+
+        result = await asyncio.wait_for(supervisor.run_task("xcom_links", {"n": 1}), 30)
+        while supervisor.health()["ready"] < 2:
+            await asyncio.sleep(0.05)
+        health = supervisor.health()
+
+    assert result["n"] == 1
+    assert health["restarts"] == 2
+    assert all(worker["alive"] for worker in health["workers"])
+
+
+async def test_worker_timings_reach_the_caller(supervisor):
+    async with supervisor:
+        with collect_timings() as timings:
+            result = await supervisor.run_task("xcom_links", {"n": 1, "sleep": 0.2})
+        outside = await supervisor.run_task("xcom_links", {"n": 2})
+
+    assert result["n"] == 1 and outside["n"] == 2
+    assert timings.calls == {"xcom_links.sleep": 1}
+    assert timings.stages["xcom_links.sleep"] >= 0.2